@@ -0,0 +1 @@
+# Throughput benchmarks of the analyzer on synthetic corpora; run with ``python -m benchmarks``.
@@ -0,0 +1,219 @@
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+# Docstring conventions the generator can write
+STYLES = ("rest", "google", "numpy", "epytext")
+MIXED = "mixed"
+
+# Vocabulary modelled on data/samples (numerical methods and data structures)
+TOPICS = ["matrix", "vector", "tree", "node", "sequence", "graph", "solver", "decomposition", "iteration", "series"]
+PARAMS = [("matrix", "list[list[float]]"), ("vector", "list[float]"), ("n", "int"), ("k", "int"),
+          ("value", "int"), ("tolerance", "float"), ("iterations", "int"), ("node", "Node | None"),
+          ("values", "list[int]"), ("pivot", "float")]
+RETURNS = ["float", "int", "list[float]", "list[list[float]]", "bool", "tuple[int, int]"]
+VERBS = ["Compute", "Return", "Solve", "Insert", "Find", "Decompose", "Invert", "Update", "Check", "Build"]
+SENTENCES = [
+    "The input is not modified; a new object is returned instead.",
+    "Runs in O(n log n) time and uses O(n) additional memory.",
+    "Rows are processed in order and the pivot is chosen by magnitude.",
+    "The iteration stops once the residual drops below the tolerance.",
+    "Raises an error if the input is empty or not square.",
+    "Values are compared with the usual ordering of the element type.",
+    "This mirrors the textbook algorithm but avoids repeated allocation.",
+    "Intermediate results are cached so repeated calls are cheap.",
+    "The recursion depth is bounded by the height of the structure.",
+    "Floating point errors accumulate for ill-conditioned inputs.",
+]
+COMMENTS = ["# Swap rows to move the largest pivot up", "# Base case", "# Accumulate the partial sum",
+            "# Normalize by the diagonal element", "# Recursive call", "# Early exit once converged",
+            "# Update the running estimate"]
+STATEMENTS = ["total += {p} * 2", "result.append({p})", "total = max(total, {p})",
+              "residual = abs(total - {p})", "count += 1", "total -= {p} / (count + 1)"]
+CONDITIONS = ["count < {n}", "total > {n}", "residual > 1e-9", "{p} is not None", "count % 2 == 0"]
+
+
+class CorpusGenerator:
+    """
+    Deterministic generator of synthetic Python projects for benchmarking.
+
+    Files follow the shapes of the bundled samples: a module docstring, typed functions
+    (some grouped into a class, some with a nested helper like fast_fibonacci's fib_helper),
+    inline comments and a ``__main__`` block. The same parameters and seed always produce
+    byte-identical files.
+    """
+
+    @staticmethod
+    def _description(rng: random.Random, lines: int) -> List[str]:
+        return [rng.choice(SENTENCES) for _ in range(lines)]
+
+    @staticmethod
+    def docstring(style: str, summary: str, description: List[str], params: List[tuple], returns: str,
+                  raises: str | None, indent: str) -> List[str]:
+        """
+        :param style: One of STYLES.
+        :param summary: First line.
+        :param description: Further description lines.
+        :param params: (name, type) pairs.
+        :param returns: Return type.
+        :param raises: Exception name, or None.
+        :param indent: Indentation of the docstring.
+        :return: Docstring lines, including the quotes.
+        """
+        body = [summary]
+        if description:
+            body += [""] + description
+        body.append("")
+        if style == "rest":
+            body += [f":param {name}: The {name} to use." for name, _ in params]
+            body.append(f":return: The resulting {returns}.")
+            if raises: body.append(f":raises {raises}: If the input is invalid.")
+        elif style == "google":
+            body.append("Args:")
+            body += [f"    {name} ({kind}): The {name} to use." for name, kind in params]
+            body += ["", "Returns:", f"    {returns}: The result."]
+            if raises: body += ["", "Raises:", f"    {raises}: If the input is invalid."]
+        elif style == "numpy":
+            body += ["Parameters", "----------"]
+            for name, kind in params:
+                body += [f"{name} : {kind}", f"    The {name} to use."]
+            body += ["", "Returns", "-------", returns, "    The result."]
+            if raises: body += ["", "Raises", "------", raises, "    If the input is invalid."]
+        elif style == "epytext":
+            for name, kind in params:
+                body += [f"@param {name}: The {name} to use.", f"@type {name}: {kind}"]
+            body += [f"@return: The resulting {returns}.", f"@rtype: {returns}"]
+            if raises: body.append(f"@raise {raises}: If the input is invalid.")
+        else:
+            raise ValueError(f"Unknown docstring style {style!r}, expected one of {STYLES}.")
+        return [f'{indent}"""'] + [f"{indent}{line}" if line else "" for line in body] + [f'{indent}"""']
+
+    @staticmethod
+    def _block(rng: random.Random, depth: int, names: List[str], indent: str) -> List[str]:
+        """Body statements with control flow nested ``depth`` levels deep."""
+        lines = []
+        for _ in range(rng.randint(1, 2)):
+            if rng.random() < 0.35: lines.append(indent + rng.choice(COMMENTS))
+            lines.append(indent + rng.choice(STATEMENTS).format(p=rng.choice(names)))
+        if depth > 0:
+            condition = rng.choice(CONDITIONS).format(p=rng.choice(names), n=rng.randint(2, 50))
+            header = rng.choice([f"for _ in range({rng.randint(2, 9)}):", f"if {condition}:", f"while {condition}:"])
+            lines.append(indent + header)
+            inner = CorpusGenerator._block(rng, depth - 1, names, indent + "    ")
+            if header.startswith("while"):
+                inner.append(indent + "    break")
+            lines += inner
+        return lines
+
+    @staticmethod
+    def function(rng: random.Random, name: str, style: str, docstring_lines: int, depth: int,
+                 indent: str = "", method: bool = False) -> List[str]:
+        """
+        :param rng: Random source.
+        :param name: Function name.
+        :param style: Docstring style, see STYLES.
+        :param docstring_lines: Description lines below the summary.
+        :param depth: Control-flow nesting depth of the body.
+        :param indent: Indentation of the ``def``.
+        :param method: If True, add ``self`` as the first parameter.
+        :return: Source lines of the function.
+        """
+        params = rng.sample(PARAMS, rng.randint(1, 3))
+        returns = rng.choice(RETURNS)
+        raises = "ValueError" if rng.random() < 0.3 else None
+        signature = ", ".join((["self"] if method else []) + [f"{p}: {kind}" for p, kind in params])
+        inner = indent + "    "
+        names = [p for p, _ in params]
+        lines = [f"{indent}def {name}({signature}) -> {returns}:"]
+        lines += CorpusGenerator.docstring(style, f"{rng.choice(VERBS)} the {rng.choice(TOPICS)}.",
+                                           CorpusGenerator._description(rng, docstring_lines),
+                                           params, returns, raises, inner)
+        if raises:
+            lines += [f"{inner}if not {names[0]}:", f'{inner}    raise ValueError("{names[0]} must not be empty")']
+        lines += [f"{inner}total = 0", f"{inner}count = 0", f"{inner}residual = 0.0", f"{inner}result = []"]
+        if depth > 1 and rng.random() < 0.3:
+            # Nested helper, as in the samples' recursive implementations
+            lines.append("")
+            lines += CorpusGenerator.function(rng, "helper", style, docstring_lines // 2, depth - 1, inner)
+            lines.append("")
+        lines += CorpusGenerator._block(rng, depth, names, inner)
+        lines.append(f"{inner}return {'result' if returns.startswith('list') else 'total'}")
+        return lines
+
+    @staticmethod
+    def module(rng: random.Random, index: int, functions: int, style: str, docstring_lines: int,
+               depth: int) -> str:
+        """
+        :param rng: Random source.
+        :param index: File number, used in names.
+        :param functions: Number of functions and methods in the file.
+        :param style: Docstring style, see STYLES.
+        :param docstring_lines: Description lines below each docstring's summary.
+        :param depth: Control-flow nesting depth of the function bodies.
+        :return: Source of the module.
+        """
+        topic = rng.choice(TOPICS)
+        lines = ['"""', f"Synthetic {topic} utilities #{index}.", ""]
+        lines += CorpusGenerator._description(rng, max(docstring_lines, 1))
+        lines += ['"""', "", "from __future__ import annotations", "", ""]
+        # Like binary_search_tree.py, some files keep part of their functions in a class
+        in_class = functions // 2 if rng.random() < 0.4 else 0
+        if in_class:
+            lines += [f"class {topic.capitalize()}{index}:", f'    """A {topic} with {in_class} operations."""', ""]
+            for i in range(in_class):
+                lines += CorpusGenerator.function(rng, f"op_{i}", style, docstring_lines, depth, "    ", method=True)
+                lines.append("")
+            lines.append("")
+        for i in range(in_class, functions):
+            lines += CorpusGenerator.function(rng, f"{topic}_{index}_{i}", style, docstring_lines, depth)
+            lines += ["", ""]
+        lines += ['if __name__ == "__main__":', f'    print("{topic} module {index}")', ""]
+        return "\n".join(lines)
+
+    @staticmethod
+    def generate(root: str, files: int = 100, functions_per_file: int = 3, style: str = MIXED,
+                 docstring_lines: int = 1, nesting_depth: int = 2, files_per_directory: int = 25,
+                 seed: int = 0) -> Dict[str, Any]:
+        """
+        Write a synthetic project below ``root`` along with a ``corpus.json`` manifest.
+
+        The defaults approximate the samples (about 105 lines per file): three functions and
+        roughly 120 lines per file.
+
+        :param root: Destination directory; created if needed, existing generated files are overwritten.
+        :param files: Number of files.
+        :param functions_per_file: Functions (and methods) per file.
+        :param style: One of STYLES, or "mixed" to rotate through them file by file.
+        :param docstring_lines: Description lines below each docstring's summary.
+        :param nesting_depth: Control-flow nesting depth of function bodies.
+        :param files_per_directory: Files per package directory.
+        :param seed: Random seed; identical parameters and seed give identical corpora.
+        :return: The manifest: the parameters plus file, line and byte totals.
+        :raises ValueError: If the style is unknown or files_per_directory is below 1.
+        """
+        if style != MIXED and style not in STYLES:
+            raise ValueError(f"Unknown docstring style {style!r}, expected one of {STYLES + (MIXED,)}.")
+        if files_per_directory < 1:
+            raise ValueError(f"files_per_directory must be at least 1, got {files_per_directory}.")
+        manifest = {"files": files, "functions_per_file": functions_per_file, "style": style,
+                    "docstring_lines": docstring_lines, "nesting_depth": nesting_depth,
+                    "files_per_directory": files_per_directory, "seed": seed}
+        rng = random.Random(seed)
+        total_lines = total_bytes = 0
+        for index in range(files):
+            package = os.path.join(root, f"pkg_{index // files_per_directory:03d}")
+            if index % files_per_directory == 0:
+                os.makedirs(package, exist_ok=True)
+                with open(os.path.join(package, "__init__.py"), "w", encoding="utf-8") as f:
+                    f.write('"""Synthetic benchmark package."""\n')
+            file_style = STYLES[index % len(STYLES)] if style == MIXED else style
+            source = CorpusGenerator.module(rng, index, functions_per_file, file_style, docstring_lines, nesting_depth)
+            with open(os.path.join(package, f"module_{index:05d}.py"), "w", encoding="utf-8", newline="\n") as f:
+                f.write(source)
+            total_lines += source.count("\n")
+            total_bytes += len(source.encode())
+        manifest.update({"total_lines": total_lines, "total_bytes": total_bytes})
+        with open(os.path.join(root, "corpus.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
@@ -0,0 +1,237 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.runner import BenchmarkRunner
+from documetrics.ResourceManager import ResourceManager
+
+# Baseline committed with the repository; recorded with --update-baseline on the reference machine
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Fixed corpus and resources, so that runs are comparable with the baseline
+HARNESS_SETTINGS = {
+    "files": 200,
+    "functions_per_file": 3,
+    "style": "mixed",
+    "docstring_lines": 1,
+    "nesting_depth": 2,
+    "files_per_directory": 25,
+    "seed": 0,
+    "cores": 4,
+}
+
+# Direction of each benchmark metric: +1 if higher is better, -1 if lower is better
+THROUGHPUT_METRICS = {
+    "files_per_second": 1,
+    "lines_per_second": 1,
+    "latency_p50_ms": -1,
+    "latency_p95_ms": -1,
+}
+
+# Scores computed without the language models or tokenizer data, hence equal on every machine
+PORTABLE_SCORES = ["comment_density", "completeness"]
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 2
+
+
+class RegressionHarness:
+    """
+    Runs the benchmark corpus with HARNESS_SETTINGS and checks the result against a baseline:
+
+    - throughput and latency may be at most ``tolerance`` (relative) worse;
+    - stage times (mean per call) may be at most ``tolerance`` slower, for the stages that
+      took at least ``min_stage_share`` of the baseline's file time;
+    - peak RSS may be at most ``memory_tolerance`` higher;
+    - project and mean file scores must stay within ``metric_tolerance`` (absolute), since any
+      drift there means the analysis itself changed.
+
+    A portable baseline (see portable) only holds the model-free scores; checks missing from
+    the baseline are skipped.
+    """
+
+    @staticmethod
+    def measure(settings: Dict[str, Any] = HARNESS_SETTINGS) -> Dict[str, Any]:
+        """
+        Generate the corpus and benchmark it with stage timings.
+
+        :param settings: Corpus parameters (see CorpusGenerator.generate) plus ``cores``.
+        :return: Benchmark report, see BenchmarkRunner.report, with ``settings``.
+        """
+        corpus_settings = {key: value for key, value in settings.items() if key != "cores"}
+        ResourceManager.configure(cores=settings["cores"], jobs=1)
+        with tempfile.TemporaryDirectory(prefix="documetrics-regression-") as tmp:
+            manifest = CorpusGenerator.generate(tmp, **corpus_settings)
+            measurements = BenchmarkRunner.run(tmp, warm_up=True, timing=True)
+        return {**BenchmarkRunner.report(manifest, measurements), "settings": settings}
+
+    @staticmethod
+    def portable(report: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param report: Report of measure.
+        :return: The report without timings, memory and model-dependent scores, so it can serve as
+            a baseline recorded on any machine until the reference machine records a full one.
+        """
+        scores = {level: {metric: values[metric] for metric in PORTABLE_SCORES if metric in values}
+                  for level, values in report["scores"].items()}
+        return {"settings": report["settings"], "documetrics_version": report.get("documetrics_version"),
+                "created_at": report.get("created_at"), "portable": True, "metrics": {}, "stages": {},
+                "scores": scores}
+
+    @staticmethod
+    def _check(name: str, baseline: float | None, current: float | None, limit: float, kind: str) -> Dict[str, Any]:
+        """
+        :param name: Check name.
+        :param baseline: Baseline value.
+        :param current: Current value.
+        :param limit: Allowed deviation; relative for "higher"/"lower", absolute for "equal".
+        :param kind: "higher" (higher is better), "lower" (lower is better) or "equal".
+        :return: ``{"check", "baseline", "current", "change", "limit", "ok"}``; "change" is
+            relative (absolute for "equal"); checks without both values pass.
+        """
+        if baseline is None or current is None:
+            return {"check": name, "baseline": baseline, "current": current, "change": None, "limit": limit,
+                    "ok": True}
+        if kind == "equal":
+            change = current - baseline
+            ok = abs(change) <= limit
+        else:
+            change = (current - baseline) / baseline if baseline else 0.0
+            ok = change >= -limit if kind == "higher" else change <= limit
+        return {"check": name, "baseline": baseline, "current": current, "change": change, "limit": limit, "ok": ok}
+
+    @staticmethod
+    def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.10,
+                memory_tolerance: float = 0.10, metric_tolerance: float = 1e-4,
+                min_stage_share: float = 0.02) -> List[Dict[str, Any]]:
+        """
+        :param baseline: Baseline report.
+        :param current: Current report, see measure.
+        :param tolerance: Allowed relative slowdown of throughput, latency and stage times.
+        :param memory_tolerance: Allowed relative growth of peak RSS.
+        :param metric_tolerance: Allowed absolute change of any score.
+        :param min_stage_share: Stages below this share of the baseline file time are not checked.
+        :return: One result per check, see _check.
+        """
+        checks = []
+        for metric, direction in THROUGHPUT_METRICS.items():
+            checks.append(RegressionHarness._check(metric, baseline["metrics"].get(metric),
+                                                   current["metrics"].get(metric), tolerance,
+                                                   "higher" if direction > 0 else "lower"))
+        checks.append(RegressionHarness._check("peak_rss_mb", baseline["metrics"].get("peak_rss_mb"),
+                                               current["metrics"].get("peak_rss_mb"), memory_tolerance, "lower"))
+
+        current_stages = current.get("stages", {})
+        for stage, entry in baseline.get("stages", {}).items():
+            if stage == "total" or (entry.get("share") or 0) < min_stage_share:
+                continue
+            checks.append(RegressionHarness._check(f"stage {stage} mean_ms", entry["mean_ms"],
+                                                   current_stages.get(stage, {}).get("mean_ms"), tolerance, "lower"))
+
+        for level in ("project", "file_mean"):
+            for metric, value in baseline["scores"][level].items():
+                checks.append(RegressionHarness._check(f"{level} {metric}", value,
+                                                       current["scores"][level].get(metric), metric_tolerance, "equal"))
+        return checks
+
+    @staticmethod
+    def format_checks(checks: List[Dict[str, Any]]) -> str:
+        """
+        :param checks: Output of compare.
+        :return: Human-readable table, failed checks marked.
+        """
+        lines = [f"  {'check':<48}{'baseline':>14}{'current':>14}{'change':>10}"]
+        for check in checks:
+            baseline = "-" if check["baseline"] is None else f"{check['baseline']:.6g}"
+            current = "-" if check["current"] is None else f"{check['current']:.6g}"
+            change = "-" if check["change"] is None else (
+                f"{check['change']:+.2e}" if check["check"].startswith(("project", "file_mean"))
+                else f"{check['change']:+.1%}")
+            marker = "" if check["ok"] else "  REGRESSION"
+            lines.append(f"  {check['check']:<48}{baseline:>14}{current:>14}{change:>10}{marker}")
+        return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of ``python -m benchmarks.regression``.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.regression",
+        description="Benchmark the fixed regression corpus and compare it with the stored baseline.",
+    )
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON (default: benchmarks/baseline.json).")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record this run as the new baseline instead of comparing.")
+    parser.add_argument("--portable", action="store_true",
+                        help="With --update-baseline, only record the model-free scores, which do not depend "
+                             "on the machine; timings are not checked against such a baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative slowdown of throughput, latency and stage times (default: 0.10).")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                        help="Allowed relative growth of peak RSS (default: 0.10).")
+    parser.add_argument("--metric-tolerance", type=float, default=1e-4,
+                        help="Allowed absolute change of project and mean file scores (default: 1e-4).")
+    parser.add_argument("--min-stage-share", type=float, default=0.02,
+                        help="Only check stages taking at least this share of the file time (default: 0.02).")
+    parser.add_argument("-o", "--output", default=None, help="Also write the current report and checks as JSON.")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Run the regression harness.
+
+    :param argv: Command-line arguments; defaults to sys.argv[1:].
+    :return: 0 if there is no regression, 1 on a regression, 2 if the baseline is missing or
+        was recorded with different settings.
+    """
+    args = build_parser().parse_args(argv)
+    baseline = None
+    if not args.update_baseline:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; record one on the reference machine with --update-baseline.",
+                  file=sys.stderr)
+            return EXIT_NO_BASELINE
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != HARNESS_SETTINGS:
+            print("The baseline was recorded with different harness settings; update it with --update-baseline.",
+                  file=sys.stderr)
+            return EXIT_NO_BASELINE
+
+    with contextlib.redirect_stdout(sys.stderr):
+        current = RegressionHarness.measure()
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(RegressionHarness.portable(current) if args.portable else current, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return EXIT_OK
+
+    checks = RegressionHarness.compare(baseline, current, args.tolerance, args.memory_tolerance,
+                                       args.metric_tolerance, args.min_stage_share)
+    print(RegressionHarness.format_checks(checks))
+    if baseline.get("portable"):
+        print("The baseline is portable: only model-free scores were checked. Record a full baseline on the "
+              "reference machine with --update-baseline.", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"report": current, "checks": checks}, f, indent=2)
+    failed = [check["check"] for check in checks if not check["ok"]]
+    if failed:
+        print(f"{len(failed)} regression(s): {', '.join(failed)}", file=sys.stderr)
+        return EXIT_REGRESSION
+    print(f"No regressions in {len(checks)} checks.", file=sys.stderr)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.corpus import CorpusGenerator, MIXED, STYLES
+from documetrics import __version__
+from documetrics.DocuMetrics import ProjectAnalyzer
+from documetrics.StageTimer import StageTimer
+from documetrics.globals import METRICS_LIST
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class BenchmarkRunner:
+    """
+    Runs ProjectAnalyzer end to end over a corpus and reports throughput, per-file latency and
+    peak memory as a flat JSON document, so reports of different runs can be compared key by key.
+    """
+
+    @staticmethod
+    def peak_rss_mb() -> float | None:
+        """
+        :return: Peak resident set size of this process in MiB, or None where unsupported.
+        """
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    @staticmethod
+    def scores(results_file: str) -> Dict[str, Dict[str, float]]:
+        """
+        :param results_file: CSV written by the analysis.
+        :return: ``{"project": {metric: value}, "file_mean": {metric: value}}``, to detect
+            drifting metric values between runs.
+        """
+        results = pd.read_csv(results_file)
+        project = results[results["level"] == "project"].iloc[0]
+        files = results[results["level"] == "file"]
+        return {"project": {metric: float(project[metric]) for metric in METRICS_LIST},
+                "file_mean": {metric: float(files[metric].mean()) for metric in METRICS_LIST}}
+
+    @staticmethod
+    def run(corpus_dir: str, warm_up: bool = True, timing: bool = False) -> Dict[str, Any]:
+        """
+        Analyze a corpus once and measure it.
+
+        Per-file latency is the time between consecutive progress callbacks, i.e. the full cost
+        of loading, parsing and scoring each file.
+
+        :param corpus_dir: Directory to analyze.
+        :param warm_up: If True, load the models and warm up before timing, see ProjectAnalyzer.warm_up.
+        :param timing: If True, also record per-stage timings (see StageTimer) into ``stages``.
+        :return: Measurements: files, lines, wall_seconds, warm_up_seconds, the metrics, the
+            scores (see scores) and, with timing, the stages.
+        :raises RuntimeError: If the analysis fails.
+        """
+        warm_up_seconds = 0.0
+        if warm_up:
+            start = time.perf_counter()
+            ProjectAnalyzer.warm_up()
+            warm_up_seconds = time.perf_counter() - start
+
+        progress: List[Dict[str, Any]] = []
+        with tempfile.TemporaryDirectory(prefix="documetrics-bench-") as tmp:
+            start = time.perf_counter()
+            results_file = os.path.join(tmp, "results.csv")
+            result = ProjectAnalyzer.main(corpus_dir, results_file, progress_callback=progress.append,
+                                          keep_warm=True, timing=timing)
+            wall_seconds = time.perf_counter() - start
+            if result["code"] != 0:
+                raise RuntimeError(f"Analysis failed: {result['message']}")
+            scores = BenchmarkRunner.scores(results_file)
+            stages = None
+            if timing:
+                with open(StageTimer.timings_file(results_file), encoding="utf-8") as f:
+                    stages = json.load(f)["summary"]["stages"]
+
+        files = progress[-1]["files_done"]
+        lines = progress[-1]["lines_total"]
+        latencies = np.diff([p["elapsed_seconds"] for p in progress]) * 1000
+        measurements = {
+            "files": files,
+            "lines": lines,
+            "wall_seconds": wall_seconds,
+            "warm_up_seconds": warm_up_seconds,
+            "metrics": {
+                "files_per_second": files / wall_seconds,
+                "lines_per_second": lines / wall_seconds,
+                "latency_p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "latency_p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else None,
+                "peak_rss_mb": BenchmarkRunner.peak_rss_mb(),
+            },
+            "scores": scores,
+        }
+        if stages is not None:
+            measurements["stages"] = stages
+        return measurements
+
+    @staticmethod
+    def report(manifest: Dict[str, Any], measurements: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param manifest: Corpus manifest, see CorpusGenerator.generate.
+        :param measurements: Output of run.
+        :return: The JSON report.
+        """
+        return {
+            "documetrics_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "corpus": manifest,
+            **measurements,
+        }
+
+
+def positive_int(value: str) -> int:
+    """
+    :param value: Command-line value.
+    :return: The value as an integer of at least 1.
+    :raises argparse.ArgumentTypeError: Otherwise.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of ``python -m benchmarks``.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Measure analyzer throughput on a generated synthetic corpus.",
+    )
+    parser.add_argument("--files", type=int, default=100, help="Number of generated files.")
+    parser.add_argument("--functions-per-file", type=int, default=3)
+    parser.add_argument("--style", choices=STYLES + (MIXED,), default=MIXED, help="Docstring style.")
+    parser.add_argument("--docstring-lines", type=int, default=1, help="Description lines per docstring.")
+    parser.add_argument("--nesting-depth", type=int, default=2, help="Control-flow nesting depth.")
+    parser.add_argument("--files-per-directory", type=positive_int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", default=None,
+                        help="Generate the corpus here and keep it (default: a temporary directory).")
+    parser.add_argument("--cold", action="store_true", help="Include model loading in the measurement.")
+    parser.add_argument("-o", "--output", default=None, help="Report file (default: stdout).")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Generate a corpus, benchmark it and print or write the JSON report.
+
+    :param argv: Command-line arguments; defaults to sys.argv[1:].
+    :return: Process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="documetrics-corpus-") as tmp:
+        corpus_dir = args.corpus_dir or tmp
+        manifest = CorpusGenerator.generate(corpus_dir, args.files, args.functions_per_file, args.style,
+                                            args.docstring_lines, args.nesting_depth,
+                                            args.files_per_directory, args.seed)
+        print(f"Generated {manifest['files']} files ({manifest['total_lines']} lines) in {corpus_dir}",
+              file=sys.stderr)
+        # Keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            measurements = BenchmarkRunner.run(corpus_dir, warm_up=not args.cold)
+
+    report = json.dumps(BenchmarkRunner.report(manifest, measurements), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
@@ -1,10 +1,15 @@
+import hashlib
+import json
 import os
+import queue
+import shutil
 import sys
 import threading
+import time
 import tkinter as tk
 from tkinter import filedialog
 
-from flask import Flask, request, jsonify, send_file, redirect
+from flask import Flask, Response, request, jsonify, redirect, stream_with_context
 
 # Add the parent directory to the path so we can import
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,29 +17,82 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
+from documetrics.CodeAnalyzer import CodeAnalyzer
+from documetrics.CodeMetrics import EmbeddingBatcher
 from documetrics.DocuMetrics import ProjectAnalyzer
+from documetrics.FunctionTable import FunctionTable
+from documetrics.Profiler import RunProfiler
+from documetrics.ResourceManager import ResourceManager
+from documetrics.RunStore import RunStore
+from documetrics.ScoreAggregator import ScoreAggregator
+from dashboard.job_queue import JobQueue, QueueFullError, FINISHED, CANCELLED, ACTIVE_STATES
+from dashboard.metrics_store import MetricsTableCache, MetricsQueryError, FunctionTableCache, read_results_csv
+from dashboard.compression import PrecompressedFileCache, send_precompressed, send_compressed
+from dashboard.latency import LatencyTracker
+from dashboard.result_cache import ResultCache
+from dashboard.watch_sessions import WatchRegistry, WatchLimitError, ACTIVE_WATCH_STATES
 
 app = Flask(__name__,
             static_url_path='',
             static_folder='static')
 
-# Define path to output CSV
-OUTPUT_CSV = os.path.join(os.path.dirname(__file__), '..', 'documetrics', 'outputs', 'all_metrics_combined.csv')
+# Indexed copies of recently queried metrics CSVs
+metrics_tables = MetricsTableCache()
 
-# Create outputs directory if it doesn't exist
-os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
+# Function-level tables of recently viewed runs
+function_tables = FunctionTableCache()
 
-# Analysis status tracking
-analysis_status = {
-    'in_progress': False,
-    'progress': 0,  # 0-100%
-    'status_message': '',
-    'result': None,
-    'error': None
+# ETags and gzip/brotli encodings of recently served metrics, as CSV whatever format the run wrote
+compressed_files = PrecompressedFileCache(reader=read_results_csv)
+
+# Past runs keyed by the fingerprint of the analyzed tree and the metric configuration
+result_cache = ResultCache(max_entries=16)
+
+# Run directories written by this server's jobs; see collect_runs
+owned_runs = set()
+owned_runs_lock = threading.Lock()
+
+# Watch sessions re-scoring projects as they are edited, see /api/watch
+watch_registry = WatchRegistry(max_sessions=4)
+
+# Snippet requests arriving within a few milliseconds share one embedding batch
+snippet_batcher = EmbeddingBatcher(window_ms=5.0)
+snippet_latency = LatencyTracker()
+
+# Largest accepted snippet, in characters
+MAX_SNIPPET_SIZE = 200_000
+
+# Start-up phase tracking for the health and readiness probes
+server_state = {
+    'ready': False,
+    'phase': 'starting',
+    'error': None,
+    'started_at': time.time(),
+    'ready_at': None,
 }
+server_state_lock = threading.Lock()
+
+
+def warm_start():
+    """Load the models and run a warm-up analysis, then mark the server ready."""
+    try:
+        with server_state_lock:
+            server_state['phase'] = 'loading models'
+        print("[Startup] Loading models and warming up")
+        ProjectAnalyzer.warm_up()
+        with server_state_lock:
+            server_state.update(ready=True, phase='ready', ready_at=time.time())
+        print(f"[Startup] Ready after {server_state['ready_at'] - server_state['started_at']:.1f}s")
+    except Exception as e:
+        print("[Startup] Warm-up failed:", e)
+        with server_state_lock:
+            server_state.update(phase='failed', error=str(e))
+
+
+def start_warm_start():
+    """Run warm_start on a background thread so the health probe answers immediately."""
+    threading.Thread(target=warm_start, name='warm-start', daemon=True).start()
 
-# Add a lock for thread safety
-status_lock = threading.Lock()
 
 # Flag to track if a dialog is currently open
 dialog_open = False
@@ -47,18 +105,12 @@ def select_folder_dialog():
     """
     global dialog_open
 
-    # Check if dialog is already open or analysis is in progress
+    # Check if dialog is already open
     with dialog_lock:
         if dialog_open:
             return None
         dialog_open = True
 
-    with status_lock:
-        if analysis_status['in_progress']:
-            with dialog_lock:
-                dialog_open = False
-            return None
-
     root = tk.Tk()
     root.withdraw()
     # Make sure the dialog appears on top
@@ -74,103 +126,342 @@ def select_folder_dialog():
             dialog_open = False
 
 
+def resolve_metrics_csv(job_id=None):
+    """
+    Return the CSV path for a job or watch, or for the most recent finished job if no id is given.
+    Cancelled jobs only have a CSV if partial results were exported.
+    Falls back to the latest run in the RunStore, which may come from a command-line run and
+    then be Arrow, Parquet or JSON Lines; the readers below load any of these formats.
+    """
+    if job_id:
+        watch = watch_registry.get(job_id)
+        if watch is not None:
+            return watch['output_csv']
+        job = job_queue.get(job_id)
+        if job and (job['state'] == FINISHED or (job['state'] == CANCELLED and job['partial'])):
+            return job['output_csv']
+        return None
+    latest = job_queue.latest(state=FINISHED)
+    if latest and latest['output_csv']:
+        return latest['output_csv']
+    return RunStore.latest_results()
+
+
+def compressed_results(csv_path, job_id=None):
+    """Precompressed results; a watch rewrites its results on every change, so they get moderate levels."""
+    return compressed_files.get(csv_path, live=bool(job_id) and watch_registry.get(job_id) is not None)
+
+
+def metrics_available(path):
+    """Check that a metrics CSV exists and is not empty."""
+    return path is not None and os.path.exists(path) and os.path.getsize(path) > 0
+
+
+@app.route('/api/health')
+def health():
+    """Liveness probe: the process is up and serving requests."""
+    with server_state_lock:
+        state = dict(server_state)
+    return jsonify({"status": "ok", "phase": state['phase'], "uptime": time.time() - state['started_at']})
+
+
+@app.route('/api/ready')
+def ready():
+    """Readiness probe: 200 once the models are loaded and warmed up, 503 before (or if warm-up failed)."""
+    with server_state_lock:
+        state = dict(server_state)
+    state['active_jobs'] = job_queue.active_count()
+    return jsonify(state), 200 if state['ready'] else 503
+
+
 @app.route('/api/metrics')
 def get_metrics():
-    """Return metrics data from CSV file."""
-    if not os.path.exists(OUTPUT_CSV) or os.path.getsize(OUTPUT_CSV) == 0:
+    """Return metrics data from CSV file, for the given job or the latest finished one."""
+    csv_path = resolve_metrics_csv(request.args.get('job'))
+    if not metrics_available(csv_path):
         return jsonify({"error": "No metrics data available. Please analyze a folder first."}), 404
 
-    return send_file(OUTPUT_CSV, mimetype='text/csv')
+    return send_precompressed(request, compressed_results(csv_path, request.args.get('job')), 'text/csv')
+
+
+def make_progress_reporter(job_id):
+    """Build a FileLoader progress callback that maps per-file progress onto a job record."""
+    def report(event):
+        fraction = event['lines_done'] / event['lines_total'] if event['lines_total'] else 0.0
+        if event['current_file'] is None:
+            message = 'Aggregating results...'
+        else:
+            message = f"Analyzing {os.path.basename(event['current_file'])} " \
+                      f"({event['files_done'] + 1}/{event['files_total']} files)"
+            if event['eta_seconds'] is not None:
+                message += f", about {int(event['eta_seconds']) + 1}s left"
+        # Reserve the first and last 5% for validation and export
+        job_queue.update(job_id, progress=int(5 + 90 * fraction), status_message=message, **event)
+    return report
+
+
+def optional_float(name):
+    """Read an optional float query parameter."""
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise MetricsQueryError(f"Parameter {name!r} must be a number.")
+
+
+def optional_weights():
+    """Read the optional weights query parameter ("comment_density=0.3,completeness=0.4,...")."""
+    value = request.args.get('weights')
+    if not value:
+        return None
+    try:
+        return ScoreAggregator.parse_weights(value)
+    except ValueError as e:
+        raise MetricsQueryError(str(e))
 
 
-def run_analysis_task(file_path):
-    """Run analysis in a separate thread with progress updates."""
-    global analysis_status
+@app.route('/api/weights')
+def get_weights():
+    """Return the weights overall scores are computed with at analysis time."""
+    return jsonify({"weights": ScoreAggregator.WEIGHTS})
+
+
+@app.route('/api/metrics/query')
+def query_metrics():
+    """
+    Return one page of metrics rows as JSON.
+
+    Query parameters: job, level (default "file"), prefix, doc_type, metric (default
+    "overall_score"), min, max, sort (default "identifier"), order ("asc"/"desc"),
+    limit (default 100), cursor (next_cursor of the previous page) and weights, which
+    re-scores overall_score of every row for a new weight vector without re-analysis.
+    """
+    csv_path = resolve_metrics_csv(request.args.get('job'))
+    if not metrics_available(csv_path):
+        return jsonify({"error": "No metrics data available. Please analyze a folder first."}), 404
 
     try:
-        print("[Analysis] Starting analysis thread")
-        with status_lock:
-            analysis_status['in_progress'] = True
-            analysis_status['progress'] = 10
-            analysis_status['status_message'] = 'Validating path...'
-            analysis_status['error'] = None  # Clear previous error
-
-        # Path validation
-        with status_lock:
-            analysis_status['progress'] = 20
-            analysis_status['status_message'] = 'Beginning analysis...'
-        print("[Analysis] Path validated")
-
-        # Run analysis
-        with status_lock:
-            analysis_status['progress'] = 40
-            analysis_status['status_message'] = 'Processing files...'
-        print("[Analysis] Calling ProjectAnalyzer.main")
-        result = ProjectAnalyzer.main(file_path)
-        print("[Analysis] ProjectAnalyzer.main returned")
-
-        with status_lock:
-            analysis_status['progress'] = 90
-            analysis_status['status_message'] = 'Finalizing results...'
-            analysis_status['result'] = result
-
-        with status_lock:
-            analysis_status['progress'] = 100
-            analysis_status['status_message'] = 'Analysis complete'
-            analysis_status['in_progress'] = False
-        print("[Analysis] Analysis complete")
+        page = metrics_tables.get(csv_path).query(
+            level=request.args.get('level', 'file'),
+            path_prefix=request.args.get('prefix'),
+            doc_type=request.args.get('doc_type'),
+            score_metric=request.args.get('metric', 'overall_score'),
+            min_score=optional_float('min'),
+            max_score=optional_float('max'),
+            sort=request.args.get('sort', 'identifier'),
+            order=request.args.get('order', 'asc'),
+            limit=request.args.get('limit', 100, type=int),
+            cursor=request.args.get('cursor'),
+            weights=optional_weights(),
+        )
+    except MetricsQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # The page only changes with the result set (the CSV contents) and the query itself
+    version = compressed_results(csv_path, request.args.get('job')).etag
+    etag = hashlib.sha1(f'{version}?{request.query_string.decode()}'.encode()).hexdigest()
+    return send_compressed(request, json.dumps(page).encode(), 'application/json', etag)
+
+
+
+@app.route('/api/metrics/summary')
+def summarize_metrics():
+    """
+    Return per-group averages of the metrics over all rows of one level as JSON, so charts
+    never aggregate a single page of /api/metrics/query.
+
+    Query parameters: job, level (default "file"), group_by (default "doc_type") and weights.
+    """
+    csv_path = resolve_metrics_csv(request.args.get('job'))
+    if not metrics_available(csv_path):
+        return jsonify({"error": "No metrics data available. Please analyze a folder first."}), 404
+
+    try:
+        groups = metrics_tables.get(csv_path).averages(
+            level=request.args.get('level', 'file'),
+            group_by=request.args.get('group_by', 'doc_type'),
+            weights=optional_weights(),
+        )
+    except MetricsQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+    version = compressed_results(csv_path, request.args.get('job')).etag
+    etag = hashlib.sha1(f'{version}?{request.query_string.decode()}'.encode()).hexdigest()
+    return send_compressed(request, json.dumps({'groups': groups}).encode(), 'application/json', etag)
+
+
+def collect_runs():
+    """
+    Delete the run directories of this server's jobs and watches that neither a job or watch
+    record, the result cache nor the LATEST pointer refers to any more, so disk use stays bounded
+    by the job and watch history and the cache size. Runs of other processes (e.g. the command
+    line) are never touched.
+    """
+    referenced = {job['output_csv'] for job in job_queue.list() if job.get('output_csv')}
+    referenced |= result_cache.output_files()
+    # A watch's run is referenced from its start, before it has results, until its record is evicted
+    referenced |= {os.path.join(watch['run_dir'], RunStore.RESULTS_FILE) for watch in watch_registry.list()}
+    latest = RunStore.latest_run()
+    with owned_runs_lock:
+        unreferenced = [run_dir for run_dir in owned_runs if run_dir != latest
+                        and not any(path.startswith(run_dir + os.sep) for path in referenced)]
+        owned_runs.difference_update(unreferenced)
+    for run_dir in unreferenced:
+        shutil.rmtree(run_dir, ignore_errors=True)
+        print(f"[Runs] Removed {run_dir}")
+
+
+def serve_cached(job_id, fingerprint):
+    """
+    Finish a job with the results of a cached run of the same fingerprint.
+
+    :return: True if the job was served from the cache.
+    """
+    cached = result_cache.get(fingerprint)
+    if cached is None:
+        return False
+    job_queue.update(job_id, output_csv=cached['output_csv'], cached=True, source_job=cached['job_id'])
+    job_queue.finish(job_id, result={**cached['result'], 'message': 'Analysis result served from cache.'})
+    print(f"[Analysis {job_id}] Served from the cached run of job {cached['job_id']}")
+    return True
+
+
+def run_analysis_task(job_id, file_path, cancel_token):
+    """Run one queued analysis on a worker thread, recording its status in the job queue."""
+    print(f"[Analysis {job_id}] Starting analysis of {file_path}")
+    job_queue.update(job_id, progress=0, status_message='Validating path...')
+
+    try:
+        # Hashing the tree reads every file, so it runs here rather than on the request thread
+        fingerprint = None
+        if os.path.exists(file_path):
+            job_queue.update(job_id, status_message='Checking for cached results...')
+            fingerprint = ProjectAnalyzer.fingerprint(file_path)
+            job_queue.update(job_id, fingerprint=fingerprint)
+            if job_queue.get(job_id).get('use_cache') and serve_cached(job_id, fingerprint):
+                return
+        # Each job publishes its results as its own run, named after the job
+        result = ProjectAnalyzer.main(file_path, None, make_progress_reporter(job_id), cancel_token,
+                                      keep_warm=True, run_id=job_id, profile=job_queue.get(job_id).get('profile'))
+        output_csv = result.get('output_file')
+        job_queue.update(job_id, status_message='Finalizing results...', output_csv=output_csv)
+        if output_csv:
+            compressed_files.get(output_csv)  # compress once now rather than on the first request
+            with owned_runs_lock:
+                owned_runs.add(os.path.dirname(output_csv))
+        # Cache before finishing so clients reacting to the end event already get a hit
+        if fingerprint and not cancel_token.cancelled and result.get('code', 0) == 0 and output_csv:
+            result_cache.put(fingerprint, job_id, file_path, output_csv, result)
+        job_queue.finish(job_id, result=result)
+        print(f"[Analysis {job_id}] Analysis complete")
     except Exception as e:
-        print("[Analysis] Exception occurred:", e)
-        with status_lock:
-            analysis_status['error'] = str(e)
-            analysis_status['result'] = None
-            analysis_status['progress'] = 100  # Ensure progress is set to 100 on error
-            analysis_status['in_progress'] = False
-            analysis_status['status_message'] = f'Error: {str(e)}'
+        print(f"[Analysis {job_id}] Exception occurred:", e)
+        job_queue.finish(job_id, error=str(e))
+    finally:
+        collect_runs()
+
+
+# Jobs share the models loaded at import; concurrency comes from the resource plan
+job_queue = JobQueue(run_analysis_task, max_workers=ResourceManager.settings()['pool_size'])
+
+
+@app.route('/api/functions')
+def get_functions():
+    """
+    Return the function-level records of one file, for the given job or the latest finished one.
+
+    Query parameters: ``file`` (identifier as in the metrics) and optional ``job``.
+    """
+    file_id = request.args.get('file')
+    if not file_id:
+        return jsonify({"error": "No file specified."}), 400
+    csv_path = resolve_metrics_csv(request.args.get('job'))
+    if not metrics_available(csv_path):
+        return jsonify({"error": "No metrics data available. Please analyze a folder first."}), 404
+    table_path = FunctionTable.table_file(csv_path)
+    if not os.path.exists(table_path):
+        return jsonify({"error": "No function-level results for this run."}), 404
+    functions = function_tables.get(table_path).rows(file_id)
+    if functions is None:
+        return jsonify({"error": f"Unknown file: {file_id}"}), 404
+    return jsonify({"file": file_id, "functions": functions})
 
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_path():
-    """Handle folder path analysis."""
-    global analysis_status
-
-    with status_lock:
-        # Reset status if not already in progress
-        if analysis_status['in_progress']:
-            return jsonify({"code": -2, "message": "Analysis already in progress."}), 409
+    """
+    Queue a folder path analysis and return its job id.
 
-        # Reset status for a new analysis
-        analysis_status['in_progress'] = False
-        analysis_status['progress'] = 0
-        analysis_status['status_message'] = ''
-        analysis_status['result'] = None
-        analysis_status['error'] = None
+    The job first fingerprints the tree; if the tree and metric configuration are unchanged
+    since a cached run, it finishes at once with that run's results (``"cached": true`` on the
+    job). Pass ``"force": true`` to re-analyze.
 
+    ``"profile": {"modes": ["cprofile", "torch", "memory"], "max_files": 10, "match": "pkg/*.py"}``
+    profiles the run (never served from cache); the artifacts go into the run directory.
+    """
     data = request.json
     file_path = data.get('path')
 
     if not file_path:
         return jsonify({"code": -1, "message": "No folder path provided."}), 400
 
-    # Check if analysis is already in progress
-    if analysis_status['in_progress']:
-        return jsonify({"code": -2, "message": "Analysis already in progress."}), 409
+    profile = data.get('profile')
+    if profile is not None:
+        try:
+            RunProfiler.validate_spec(profile)
+        except ValueError as e:
+            return jsonify({"code": -3, "message": f"Invalid profile: {e}"}), 400
+
+    try:
+        job = job_queue.submit(file_path, fingerprint=None, profile=profile,
+                               use_cache=not data.get('force') and not profile)
+    except QueueFullError as e:
+        return jsonify({"code": -2, "message": str(e)}), 429
+
+    return jsonify({"code": 0, "message": "Analysis queued.", "job_id": job['job_id']}), 202
+
 
-    # Start analysis in a separate thread
-    analysis_thread = threading.Thread(target=run_analysis_task, args=(file_path,))
-    analysis_thread.start()
+@app.route('/api/analyze-code', methods=['POST'])
+def analyze_code():
+    """
+    Synchronously analyze source text in memory, without touching any results file.
+
+    Expects ``{"code": "...", "identifier": "..."}``; returns the metrics and the request latency.
+    """
+    start = time.perf_counter()
+    data = request.get_json(silent=True) or {}
+    code = data.get('code')
+    identifier = data.get('identifier') or 'snippet'
+
+    if not isinstance(code, str) or not code.strip():
+        return jsonify({"code": -1, "message": "No source code provided."}), 400
+    if len(code) > MAX_SNIPPET_SIZE:
+        return jsonify({"code": -2, "message": f"Source code exceeds {MAX_SNIPPET_SIZE} characters."}), 413
+
+    try:
+        metrics = CodeAnalyzer.analyze_code(code, identifier=identifier, batcher=snippet_batcher)
+    except SyntaxError as e:
+        return jsonify({"code": -3, "message": f"Source code could not be parsed: {e}"}), 400
+    latency_ms = (time.perf_counter() - start) * 1000.0
+    snippet_latency.record(latency_ms)
 
-    return jsonify({"code": 0, "message": "Analysis started."})
+    if metrics is None:
+        return jsonify({"code": -4, "message": "Source code does not contain enough docstrings to be evaluated.",
+                        "latency_ms": latency_ms}), 422
+    return jsonify({"code": 0, "metrics": metrics, "latency_ms": latency_ms})
+
+
+@app.route('/api/analyze-code/stats')
+def analyze_code_stats():
+    """Report p50/p90/p99 latency of recent /api/analyze-code requests."""
+    return jsonify(snippet_latency.summary())
 
 
 @app.route('/api/file-dialog', methods=['GET'])
 def file_dialog():
     """Open a native folder dialog and return the selected path."""
-    # Check if analysis is already in progress
-    with status_lock:
-        if analysis_status['in_progress']:
-            return jsonify({"error": "Analysis is already in progress"}), 409
-
     path = select_folder_dialog()
     if path:
         return jsonify({"path": path})
@@ -179,10 +470,148 @@ def file_dialog():
 
 @app.route('/api/status')
 def get_analysis_status():
-    """Get the current status of analysis."""
-    with status_lock:
-        current_status = dict(analysis_status)
-    return jsonify(current_status)
+    """Get the status of a job, or of the most recently submitted job if no id is given."""
+    job_id = request.args.get('job')
+    job = job_queue.get(job_id) if job_id else job_queue.latest()
+    if job is None:
+        if job_id:
+            return jsonify({"error": f"Unknown job: {job_id}"}), 404
+        return jsonify({'in_progress': False, 'progress': 0, 'status_message': '', 'result': None, 'error': None})
+    return jsonify(job)
+
+
+@app.route('/api/jobs')
+def list_jobs():
+    """List queued, running and finished jobs, oldest first."""
+    return jsonify({"jobs": job_queue.list(), "workers": job_queue.max_workers})
+
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Get the status of a single job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job)
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job. Running jobs stop at the next file or embedding."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job), 202
+
+
+@app.route('/api/jobs/<job_id>/events')
+def stream_job_events(job_id):
+    """Stream job status snapshots as Server-Sent Events until the job completes."""
+    subscriber = job_queue.subscribe(job_id)
+    if subscriber is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+
+    def generate():
+        try:
+            while True:
+                try:
+                    job = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'  # stops proxies from closing an idle stream
+                    continue
+                yield f"data: {json.dumps(job)}\n\n"
+                if job['state'] not in ACTIVE_STATES:
+                    yield 'event: end\ndata: {}\n\n'
+                    return
+        finally:
+            job_queue.unsubscribe(job_id, subscriber)
+
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/watch', methods=['POST'])
+def start_watch():
+    """
+    Analyze a folder, then keep re-scoring the files that change until the watch is stopped.
+
+    Expects ``{"path": "...", "include": [globs], "exclude": [globs]}``. The results are served
+    like a job's, with the watch id in place of the job id; updates are pushed over
+    /api/watch/<watch_id>/events.
+    """
+    data = request.get_json(silent=True) or {}
+    file_path = data.get('path')
+    include, exclude = data.get('include'), data.get('exclude')
+    if not file_path:
+        return jsonify({"code": -1, "message": "No folder path provided."}), 400
+    for globs in (include, exclude):
+        if globs is not None and not (isinstance(globs, list) and all(isinstance(g, str) for g in globs)):
+            return jsonify({"code": -3, "message": "include and exclude must be lists of globs."}), 400
+
+    validation = ProjectAnalyzer.input_validation(file_path, include, exclude)
+    if validation['code'] != 0:
+        return jsonify(validation), 400
+    try:
+        watch = watch_registry.start(file_path, include, exclude)
+    except WatchLimitError as e:
+        return jsonify({"code": -2, "message": str(e)}), 429
+    with owned_runs_lock:
+        owned_runs.add(watch['run_dir'])
+    # Starting a watch may have evicted an old one from the history
+    collect_runs()
+    return jsonify({"code": 0, "message": "Watch started.", "watch_id": watch['watch_id']}), 202
+
+
+@app.route('/api/watch')
+def list_watches():
+    """List active and recently stopped watches, oldest first."""
+    return jsonify({"watches": watch_registry.list()})
+
+
+@app.route('/api/watch/<watch_id>')
+def get_watch(watch_id):
+    """Get the status of a single watch."""
+    watch = watch_registry.get(watch_id)
+    if watch is None:
+        return jsonify({"error": f"Unknown watch: {watch_id}"}), 404
+    return jsonify(watch)
+
+
+@app.route('/api/watch/<watch_id>/stop', methods=['POST'])
+def stop_watch(watch_id):
+    """Stop a watch; its results stay available."""
+    watch = watch_registry.stop(watch_id)
+    if watch is None:
+        return jsonify({"error": f"Unknown watch: {watch_id}"}), 404
+    return jsonify(watch), 202
+
+
+@app.route('/api/watch/<watch_id>/events')
+def stream_watch_events(watch_id):
+    """Stream watch snapshots as Server-Sent Events, one per re-scored batch, until the watch stops."""
+    subscriber = watch_registry.subscribe(watch_id)
+    if subscriber is None:
+        return jsonify({"error": f"Unknown watch: {watch_id}"}), 404
+
+    def generate():
+        try:
+            while True:
+                try:
+                    watch = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"data: {json.dumps(watch)}\n\n"
+                if watch['state'] not in ACTIVE_WATCH_STATES:
+                    yield 'event: end\ndata: {}\n\n'
+                    return
+        finally:
+            watch_registry.unsubscribe(watch_id, subscriber)
+
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route('/api/download')
@@ -193,15 +622,14 @@ def download_metrics():
     if not file_id:
         return jsonify({"error": "No file specified."}), 400
 
-    if not os.path.exists(OUTPUT_CSV) or os.path.getsize(OUTPUT_CSV) == 0:
+    csv_path = resolve_metrics_csv(request.args.get('job'))
+    if not metrics_available(csv_path):
         return jsonify({"error": "Metrics file not found or empty."}), 404
 
     # In a full implementation, we would filter the CSV for just this file
     # For now, return the full CSV
-    return send_file(OUTPUT_CSV,
-                     as_attachment=True,
-                     download_name=f"{os.path.basename(file_id)}_metrics.csv",
-                     mimetype='text/csv')
+    return send_precompressed(request, compressed_results(csv_path, request.args.get('job')), 'text/csv',
+                              download_name=f"{os.path.basename(file_id)}_metrics.csv")
 
 
 @app.route('/')
@@ -214,7 +642,7 @@ def index():
 def dashboard():
     """Serve the dashboard page."""
     # Check if there's analysis data available
-    if not os.path.exists(OUTPUT_CSV) or os.path.getsize(OUTPUT_CSV) == 0:
+    if not metrics_available(resolve_metrics_csv()):
         # Redirect to homepage if no data
         return redirect('/')
     return app.send_static_file('index.html')
@@ -231,4 +659,5 @@ def catch_all(path):
 
 
 if __name__ == '__main__':
+    start_warm_start()
     app.run(port=5000, threaded=True)
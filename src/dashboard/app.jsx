@@ -7,7 +7,7 @@ import ResultsView from './components/views/ResultsView';
 
 // Main app content component (wrapped with context providers in the exported App)
 const AppContent = () => {
-    const {metricsData, loadMetricsFromCSV, analyzePath} = useMetrics();
+    const {metricsData, loadMetrics, followWatch, analyzePath} = useMetrics();
     const [showWelcome, setShowWelcome] = useState(true);
 
     // Listen for new analysis events from the header component
@@ -31,7 +31,9 @@ const AppContent = () => {
     useEffect(() => {
         // If user navigates to /dashboard but there's no data, load welcome page
         if (isOnDashboardPage() && !metricsData) {
-            loadMetricsFromCSV().catch(() => {
+            // Follow a watch started from the welcome page, or show the latest results
+            const watchId = new URLSearchParams(window.location.search).get('watch');
+            (watchId ? followWatch(watchId) : loadMetrics()).catch(() => {
                 // If there's no data available, redirect to home
                 window.location.href = '/';
             });
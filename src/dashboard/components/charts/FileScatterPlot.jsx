@@ -3,7 +3,7 @@ import {useTheme} from '../../contexts/ThemeContext';
 import Chart from 'chart.js/auto';
 import {formatFileName} from '../../utils/utils';
 
-const FileScatterPlot = ({files, maxFiles = 8}) => {
+const FileScatterPlot = ({files, totalFiles = files.length, maxFiles = 8}) => {
     const chartRef = useRef(null);
     const chartInstance = useRef(null);
     const {theme} = useTheme();
@@ -15,7 +15,7 @@ const FileScatterPlot = ({files, maxFiles = 8}) => {
         .sort((a, b) => b.overall_score - a.overall_score)
         .slice(0, maxFiles);
 
-    const isTruncated = files.length > maxFiles;
+    const isTruncated = totalFiles > maxFiles;
 
     // Number labels for x-axis
     const numberLabels = limitedFiles.map((_, idx) => (idx + 1).toString());
@@ -208,7 +208,7 @@ const FileScatterPlot = ({files, maxFiles = 8}) => {
 
                 {isTruncated && (
                     <div className="mt-2 text-center text-sm text-muted-foreground">
-                        Note: Only showing top {maxFiles} files by overall score. {files.length - maxFiles} additional files
+                        Note: Only showing top {maxFiles} files by overall score. {totalFiles - maxFiles} additional files
                         are not displayed.
                     </div>
                 )}
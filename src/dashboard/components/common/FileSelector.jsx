@@ -4,7 +4,7 @@ import {useTheme} from '../../contexts/ThemeContext';
 import {formatFileName} from '../../utils/utils';
 
 const FileSelector = () => {
-    const {metricsData, selectedFile, setSelectedFile} = useMetrics();
+    const {metricsData, selectedFile, setSelectedFile, hasMoreFiles, loadMoreFiles} = useMetrics();
     const {theme} = useTheme();
     const [isOpen, setIsOpen] = useState(false);
     const dropdownRef = useRef(null);
@@ -145,6 +145,14 @@ const FileSelector = () => {
                 </span>
                             </li>
                         ))}
+                        {hasMoreFiles && (
+                            <li
+                                onClick={loadMoreFiles}
+                                className={`px-4 py-2 text-sm cursor-pointer text-center ${theme === 'neon' ? 'text-accent hover:bg-neon-muted' : 'text-primary hover:bg-aquatic-muted/30'}`}
+                            >
+                                Load more files...
+                            </li>
+                        )}
                     </ul>
                 </div>
             )}
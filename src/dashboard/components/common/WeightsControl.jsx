@@ -0,0 +1,91 @@
+import React, {useEffect, useState} from 'react';
+import {useMetrics} from '../../contexts/MetricsContext';
+import {fetchWeights} from '../../services/api';
+import {COMPONENT_METRICS} from '../../utils/utils';
+
+const WeightsControl = () => {
+    const {weights, applyWeights} = useMetrics();
+    const [defaults, setDefaults] = useState(null);
+    const [draft, setDraft] = useState(null);
+    const [isApplying, setIsApplying] = useState(false);
+
+    // Start from the weights the results were computed with
+    useEffect(() => {
+        fetchWeights()
+            .then(data => {
+                setDefaults(data.weights);
+                setDraft(weights || data.weights);
+            })
+            .catch(() => setDefaults(null));
+    }, []);
+
+    if (!draft) return null;
+
+    const total = COMPONENT_METRICS.reduce((sum, metric) => sum + draft[metric], 0);
+    const isValid = Math.abs(total - 1) < 1e-6;
+
+    const apply = async (newWeights) => {
+        setIsApplying(true);
+        await applyWeights(newWeights);
+        setIsApplying(false);
+    };
+
+    // Scale the weights so they sum to 1
+    const normalize = () => {
+        if (total === 0) return;
+        setDraft(Object.fromEntries(COMPONENT_METRICS.map(metric => [metric, draft[metric] / total])));
+    };
+
+    const reset = () => {
+        setDraft(defaults);
+        apply(null);
+    };
+
+    return (
+        <div className="card">
+            <h3 className="text-lg font-semibold mb-2">Score Weights</h3>
+            <p className="text-sm text-muted-foreground mb-4">
+                Overall scores are recomputed from the stored metrics; no re-analysis is needed.
+            </p>
+            <div className="space-y-3">
+                {COMPONENT_METRICS.map(metric => (
+                    <div key={metric} className="flex items-center justify-between gap-4">
+                        <label className="text-sm w-40" htmlFor={`weight-${metric}`}>
+                            {metric.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase())}
+                        </label>
+                        <input
+                            id={`weight-${metric}`}
+                            type="range"
+                            min="0"
+                            max="1"
+                            step="0.05"
+                            className="flex-1"
+                            value={draft[metric]}
+                            onChange={e => setDraft({...draft, [metric]: parseFloat(e.target.value)})}
+                        />
+                        <span className="text-sm font-medium w-12 text-right">{draft[metric].toFixed(2)}</span>
+                    </div>
+                ))}
+            </div>
+            <div className="flex items-center justify-between mt-4">
+                <span className={`text-sm ${isValid ? 'text-muted-foreground' : 'text-destructive'}`}>
+                    Sum: {total.toFixed(2)}
+                </span>
+                <div className="flex gap-2">
+                    <button className="btn-outline text-sm" onClick={normalize} disabled={isValid}>
+                        Normalize
+                    </button>
+                    <button className="btn-outline text-sm" onClick={reset} disabled={isApplying || !defaults}>
+                        Reset
+                    </button>
+                    <button className="btn-primary text-sm" onClick={() => apply(draft)}
+                            disabled={!isValid || isApplying}>
+                        {isApplying ? 'Applying...' : 'Apply'}
+                    </button>
+                </div>
+            </div>
+        </div>
+    );
+};
+
+export default WeightsControl;
\ No newline at end of file
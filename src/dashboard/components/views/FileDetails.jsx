@@ -5,11 +5,14 @@ import {useTheme} from '../../contexts/ThemeContext';
 import GaugeChart from '../charts/GaugeChart';
 import RadarChart from '../charts/RadarChart';
 import SummaryStats from '../charts/SummaryStats';
+import {fetchFunctions} from '../../services/api';
 
 const FileDetails = () => {
-    const {selectedFile, getFileMetrics} = useMetrics();
+    const {selectedFile, getFileMetrics, metricsJobId} = useMetrics();
     const {theme} = useTheme();
     const [showMetrics, setShowMetrics] = useState(false);
+    // Function-level records of the selected file (null: not available for this run)
+    const [functions, setFunctions] = useState(null);
 
     // Animation timing
     useEffect(() => {
@@ -21,6 +24,22 @@ const FileDetails = () => {
         return () => clearTimeout(timer);
     }, [selectedFile]);
 
+    useEffect(() => {
+        let cancelled = false;
+        setFunctions(null);
+        if (!selectedFile) return;
+        fetchFunctions(selectedFile, metricsJobId)
+            .then(rows => {
+                if (!cancelled) setFunctions(rows);
+            })
+            .catch(() => {
+                if (!cancelled) setFunctions(null);
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [selectedFile, metricsJobId]);
+
     const metrics = getFileMetrics(selectedFile);
 
     if (!metrics) {
@@ -112,6 +131,44 @@ const FileDetails = () => {
                     </div>
                 </div>
 
+                {/* Function breakdown */}
+                {functions && functions.length > 0 && (
+                    <div
+                        className={`mt-6 ${cardClasses} p-6 ${showMetrics ? 'opacity-100 translate-y-0' : 'opacity-0 translate-y-4'} transition-all duration-500 delay-300`}>
+                        <h3 className={`text-xl font-semibold mb-4 ${theme === 'neon' ? 'text-accent' : 'text-primary'}`}>Functions</h3>
+                        <div className="overflow-x-auto">
+                            <table className="w-full text-sm">
+                                <thead>
+                                <tr className="text-left text-muted-foreground border-b border-primary/10">
+                                    <th className="py-2 pr-4 font-medium">Function</th>
+                                    <th className="py-2 pr-4 font-medium">Lines</th>
+                                    <th className="py-2 pr-4 font-medium">Completeness</th>
+                                    <th className="py-2 pr-4 font-medium">Accuracy</th>
+                                    <th className="py-2 pr-4 font-medium">Sentences</th>
+                                    <th className="py-2 font-medium">Flags</th>
+                                </tr>
+                                </thead>
+                                <tbody>
+                                {functions.map(fn => (
+                                    <tr key={`${fn.name}:${fn.start_line}`} className="border-b border-primary/5">
+                                        <td className="py-2 pr-4 font-mono">{fn.name}</td>
+                                        <td className="py-2 pr-4">{fn.start_line}-{fn.end_line}</td>
+                                        <td className={`py-2 pr-4 ${scoreClass(fn.completeness)}`}>{fn.completeness.toFixed(2)}</td>
+                                        <td className={`py-2 pr-4 ${scoreClass(fn.accuracy)}`}>
+                                            {fn.accuracy === null ? '-' : fn.accuracy.toFixed(2)}
+                                        </td>
+                                        <td className="py-2 pr-4">
+                                            {fn.sentences}{fn.verbose_sentences > 0 ? ` (${fn.verbose_sentences} verbose)` : ''}
+                                        </td>
+                                        <td className="py-2 text-muted-foreground">{fn.flags.map(formatFlag).join(', ')}</td>
+                                    </tr>
+                                ))}
+                                </tbody>
+                            </table>
+                        </div>
+                    </div>
+                )}
+
                 {/* File code info */}
                 <div
                     className={`mt-6 ${cardClasses} p-6 ${showMetrics ? 'opacity-100 translate-y-0' : 'opacity-0 translate-y-4'} transition-all duration-500 delay-400`}>
@@ -176,6 +233,16 @@ const RatingStars = ({rating}) => {
     );
 };
 
+// Highlight the function scores that drag the file down
+const scoreClass = (value) => {
+    if (value === null || value === undefined) return 'text-muted-foreground';
+    if (value < 0.4) return 'text-red-500 font-semibold';
+    if (value < 0.7) return 'text-yellow-600';
+    return '';
+};
+
+const formatFlag = (flag) => flag.replace(/_/g, ' ');
+
 // Helper for metric descriptions
 const getMetricDescription = (metric) => {
     switch (metric) {
@@ -1,14 +1,54 @@
-import React, {useEffect, useRef} from 'react';
+import React, {useEffect, useRef, useState} from 'react';
 import {useMetrics} from '../../contexts/MetricsContext';
 import {useTheme} from '../../contexts/ThemeContext';
 import Chart from 'chart.js/auto';
 import FileScatterPlot from '../charts/FileScatterPlot';
+import WeightsControl from '../common/WeightsControl';
+import {fetchMetricsSummary, queryMetrics} from '../../services/api';
+import {formatWeights} from '../../utils/utils';
+
+// Number of files compared in the scatter plot
+const TOP_FILES = 8;
 
 const ProjectOverview = () => {
-    const {getProjectMetrics, metricsData} = useMetrics();
+    const {getProjectMetrics, metricsData, metricsJobId, weights} = useMetrics();
     const {theme} = useTheme();
     const barChartRef = useRef(null);
     const barChartInstance = useRef(null);
+    // Per-doc-type averages over all files and the best-scored files, both computed by the
+    // server: metricsData only holds the first page of files
+    const [docTypeAverages, setDocTypeAverages] = useState([]);
+    const [topFiles, setTopFiles] = useState({rows: [], total: 0});
+
+    useEffect(() => {
+        let cancelled = false;
+        if (!metricsData) return;
+        const weightsParam = formatWeights(weights);
+        Promise.all([
+            fetchMetricsSummary({job: metricsJobId, level: 'file', group_by: 'doc_type', weights: weightsParam}),
+            queryMetrics({
+                job: metricsJobId,
+                level: 'file',
+                sort: 'overall_score',
+                order: 'desc',
+                limit: TOP_FILES,
+                weights: weightsParam
+            }),
+        ])
+            .then(([summary, page]) => {
+                if (cancelled) return;
+                setDocTypeAverages(summary.groups);
+                setTopFiles(page);
+            })
+            .catch(() => {
+                if (cancelled) return;
+                setDocTypeAverages([]);
+                setTopFiles({rows: [], total: 0});
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [metricsData, metricsJobId, weights]);
 
     const projectMetrics = getProjectMetrics();
 
@@ -33,7 +73,7 @@ const ProjectOverview = () => {
 
     // Create bar chart for average metrics
     useEffect(() => {
-        if (!barChartRef.current || !metricsData.file.length) return;
+        if (!barChartRef.current || !docTypeAverages.length) return;
 
         // Destroy previous chart if it exists
         if (barChartInstance.current) {
@@ -43,29 +83,13 @@ const ProjectOverview = () => {
         const ctx = barChartRef.current.getContext('2d');
         const colors = getThemeColors();
 
-        // Group files by doc type
-        const docTypes = [...new Set(metricsData.file.map(file => file.doc_type))];
         const metricKeys = ['comment_density', 'completeness', 'conciseness', 'accuracy', 'overall_score'];
 
-        // Calculate average metrics by doc type
-        const docTypeMetrics = docTypes.map(type => {
-            const typedFiles = metricsData.file.filter(file => file.doc_type === type);
-
+        // Prepare data for the chart from the server-side averages by doc type
+        const datasets = docTypeAverages.map((typeData, index) => {
             return {
-                docType: type,
-                metrics: metricKeys.reduce((acc, metric) => {
-                    acc[metric] = typedFiles.reduce((sum, file) => sum + file[metric], 0) / typedFiles.length;
-                    return acc;
-                }, {})
-            };
-        });
-
-        // Prepare data for the chart
-        const datasets = docTypes.map((type, index) => {
-            const typeData = docTypeMetrics.find(data => data.docType === type);
-            return {
-                label: type,
-                data: metricKeys.map(key => typeData.metrics[key]),
+                label: typeData.doc_type,
+                data: metricKeys.map(key => typeData[key]),
                 backgroundColor: [colors.primary, colors.secondary, colors.accent][index % 3] + '80',
                 borderColor: [colors.primary, colors.secondary, colors.accent][index % 3],
                 borderWidth: 1
@@ -147,7 +171,7 @@ const ProjectOverview = () => {
                 barChartInstance.current.destroy();
             }
         };
-    }, [metricsData, theme]);
+    }, [docTypeAverages, theme]);
 
     return (
         <div className="p-6">
@@ -159,7 +183,7 @@ const ProjectOverview = () => {
                     <div className="grid grid-cols-2 gap-4 mt-4">
                         <div>
                             <p className="text-sm text-muted-foreground">Total Files</p>
-                            <p className="text-xl font-bold">{projectMetrics.num_files || metricsData.file.length}</p>
+                            <p className="text-xl font-bold">{projectMetrics.num_files || topFiles.total}</p>
                         </div>
                         <div>
                             <p className="text-sm text-muted-foreground">Total Lines</p>
@@ -206,11 +230,15 @@ const ProjectOverview = () => {
                 </div>
             </div>
 
+            <div className="mt-6">
+                <WeightsControl/>
+            </div>
+
             {/* Show scatter plot if there are multiple files */}
-            {metricsData.file.length > 1 && (
+            {topFiles.total > 1 && (
                 <div className="card mt-6">
                     <h3 className="text-lg font-semibold mb-4">Files Comparison</h3>
-                    <FileScatterPlot files={metricsData.file} maxFiles={8}/>
+                    <FileScatterPlot files={topFiles.rows} totalFiles={topFiles.total} maxFiles={TOP_FILES}/>
                 </div>
             )}
         </div>
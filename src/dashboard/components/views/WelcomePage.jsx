@@ -1,4 +1,4 @@
-import React, {useEffect, useState} from 'react';
+import React, {useState} from 'react';
 import {useMetrics} from '../../contexts/MetricsContext';
 import {useTheme} from '../../contexts/ThemeContext';
 import NativeDialogButton from '../common/NativeDialogButton';
@@ -126,46 +126,31 @@ const WaveAnimation = () => {
 };
 
 const WelcomePage = () => {
-    const {analyzePath, isLoading, error} = useMetrics();
-    const [analysisProgress, setAnalysisProgress] = useState(0);
-    const [progressMessage, setProgressMessage] = useState('');
+    const {analyzePath, watchPath, cancelAnalysis, isLoading, error, progress, statusMessage} = useMetrics();
     const {theme} = useTheme();
-
-    // Clear any errors and set up polling for analysis status
-    useEffect(() => {
-        let timer;
-
-        // If analysis is in progress, poll for status updates
-        if (isLoading) {
-            timer = setInterval(async () => {
-                try {
-                    const response = await fetch('/api/status');
-                    const status = await response.json();
-
-                    setAnalysisProgress(status.progress || 0);
-                    setProgressMessage(status.status_message || 'Processing...');
-
-                    // If analysis is complete and successful, redirect to dashboard
-                    if (!status.in_progress && status.result && status.result.code === 0) {
-                        console.log('Analysis complete, redirecting to dashboard...');
-                        // Force a small delay before redirect to ensure state is updated
-                        setTimeout(() => {
-                            window.location.href = '/dashboard';
-                        }, 500);
-                        clearInterval(timer); // Clear the interval to prevent multiple redirects
-                    }
-                } catch (err) {
-                    console.error('Error checking analysis status:', err);
-                }
-            }, 1000);
+    const [keepWatching, setKeepWatching] = useState(false);
+
+    const handleFileSelect = async (path) => {
+        // Watch the folder: the dashboard follows the watch and refreshes as files are saved
+        if (keepWatching) {
+            const watchId = await watchPath(path);
+            if (watchId) {
+                window.location.href = `/dashboard?watch=${encodeURIComponent(watchId)}`;
+            }
+            return;
         }
 
-        return () => clearInterval(timer);
-    }, [isLoading]);
+        // Analyze the selected path; progress arrives through the metrics context
+        const completed = await analyzePath(path);
 
-    const handleFileSelect = (path) => {
-        // Analyze the selected path
-        analyzePath(path);
+        // If analysis is complete and successful, redirect to dashboard
+        if (completed) {
+            console.log('Analysis complete, redirecting to dashboard...');
+            // Force a small delay before redirect to ensure state is updated
+            setTimeout(() => {
+                window.location.href = '/dashboard';
+            }, 500);
+        }
     };
 
     return (
@@ -213,6 +198,15 @@ const WelcomePage = () => {
                         isLoading={isLoading}
                         className="w-full"
                     />
+                    <label className="mt-3 flex items-center gap-2 text-sm text-muted-foreground cursor-pointer">
+                        <input
+                            type="checkbox"
+                            checked={keepWatching}
+                            onChange={(e) => setKeepWatching(e.target.checked)}
+                            disabled={isLoading}
+                        />
+                        Keep watching the folder and re-score files as they are saved
+                    </label>
                 </div>
 
                 {/* Only show error if there is one from the backend */}
@@ -229,12 +223,18 @@ const WelcomePage = () => {
                         <div className="h-2 bg-muted rounded-full mb-2 overflow-hidden">
                             <div
                                 className="h-full bg-primary rounded-full transition-all duration-300"
-                                style={{width: `${analysisProgress}%`}}
+                                style={{width: `${progress}%`}}
                             ></div>
                         </div>
                         <p className="text-sm text-muted-foreground">
-                            {progressMessage || "Please wait while we analyze your code documentation..."}
+                            {statusMessage || "Please wait while we analyze your code documentation..."}
                         </p>
+                        <button
+                            onClick={cancelAnalysis}
+                            className="mt-3 px-3 py-1 text-sm border border-destructive/40 text-destructive rounded-md hover:bg-destructive/10"
+                        >
+                            Cancel
+                        </button>
                     </div>
                 )}
 
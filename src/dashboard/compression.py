@@ -0,0 +1,165 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from flask import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip only without it
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# Compression levels: maximum for results written once, moderate for live results (e.g. of a
+# watch) that are rewritten and recompressed after every change
+COMMITTED_LEVELS = {'gzip': 9, 'br': 11}
+LIVE_LEVELS = {'gzip': 6, 'br': 5}
+
+
+class PrecompressedFile:
+    """
+    One version of a file with its strong ETag and gzip/brotli encodings computed once.
+    """
+
+    def __init__(self, path: str, reader: Optional[Callable[[str], bytes]] = None, live: bool = False):
+        """
+        :param path: File to load and compress.
+        :param reader: Optional function returning the body to serve for the file; defaults to its bytes.
+        :param live: Use LIVE_LEVELS instead of COMMITTED_LEVELS.
+        """
+        if reader is not None:
+            self.raw = reader(path)
+        else:
+            with open(path, 'rb') as f:
+                self.raw = f.read()
+        self.etag = hashlib.sha1(self.raw).hexdigest()
+        levels = LIVE_LEVELS if live else COMMITTED_LEVELS
+        self.encodings: Dict[str, bytes] = {'gzip': gzip.compress(self.raw, compresslevel=levels['gzip'])}
+        if brotli is not None:
+            self.encodings['br'] = brotli.compress(self.raw, quality=levels['br'])
+
+
+class PrecompressedFileCache:
+    """LRU of PrecompressedFile objects keyed by path and invalidated when the file changes."""
+
+    def __init__(self, max_files: int = 16, reader: Optional[Callable[[str], bytes]] = None):
+        """
+        :param max_files: Number of files to keep.
+        :param reader: Optional function returning the body to serve for a file, see PrecompressedFile.
+        """
+        self._max_files = max_files
+        self._reader = reader
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, live: bool = False) -> PrecompressedFile:
+        """
+        :param path: File path.
+        :param live: The file is rewritten frequently, see PrecompressedFile.
+        :return: Precompressed copy of the file's current contents.
+        """
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == version:
+                self._files.move_to_end(path)
+                return cached[1]
+        entry = PrecompressedFile(path, self._reader, live)
+        with self._lock:
+            self._files[path] = (version, entry)
+            self._files.move_to_end(path)
+            while len(self._files) > self._max_files:
+                self._files.popitem(last=False)
+        return entry
+
+
+def choose_encoding(request: Request, available) -> Optional[str]:
+    """
+    Pick the best content encoding accepted by the client, preferring brotli over gzip.
+
+    :param request: Incoming request.
+    :param available: Encodings the server can provide.
+    :return: "br", "gzip" or None for identity.
+    """
+    for encoding in ('br', 'gzip'):
+        if encoding in available and request.accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Answer a conditional request whose If-None-Match matches ``etag``.
+
+    :param request: Incoming request.
+    :param etag: Current entity tag (unquoted).
+    :return: A 304 response, or None if the client's copy is stale.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+    return None
+
+
+def send_precompressed(request: Request, entry: PrecompressedFile, mimetype: str,
+                       download_name: Optional[str] = None) -> Response:
+    """
+    Serve a precompressed file with ETag revalidation and content negotiation.
+
+    :param request: Incoming request.
+    :param entry: File to serve.
+    :param mimetype: Response MIME type.
+    :param download_name: If given, serve as an attachment with this file name.
+    :return: 304 if the client's copy is current, otherwise the (possibly compressed) body.
+    """
+    # Each encoding is a distinct representation and gets its own tag
+    encoding = choose_encoding(request, entry.encodings)
+    etag = f'{entry.etag}-{encoding or "identity"}'
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    body = entry.encodings[encoding] if encoding else entry.raw
+    response = Response(body, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if download_name:
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Let browsers and proxies keep the copy but revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def send_compressed(request: Request, body: bytes, mimetype: str, etag: str) -> Response:
+    """
+    Serve a dynamically generated body with an ETag and on-the-fly gzip compression.
+
+    :param request: Incoming request.
+    :param body: Uncompressed response body.
+    :param mimetype: Response MIME type.
+    :param etag: Entity tag derived from the result-set version and the request.
+    :return: 304 if the client's copy is current, otherwise the (possibly compressed) body.
+    """
+    encoding = choose_encoding(request, ('gzip',)) if len(body) >= MIN_COMPRESS_SIZE else None
+    etag = f'{etag}-{encoding or "identity"}'
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    response = Response(gzip.compress(body, compresslevel=6) if encoding else body, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -1,5 +1,14 @@
-import React, {createContext, useContext, useState} from 'react';
-import {groupMetricsByLevel, parseCSV} from '../utils/utils';
+import React, {createContext, useContext, useEffect, useRef, useState} from 'react';
+import {
+    cancelAnalysis as requestCancelAnalysis,
+    queryMetrics,
+    startWatch,
+    stopWatch as requestStopWatch
+} from '../services/api';
+import {formatWeights} from '../utils/utils';
+
+// Number of file rows fetched per page from /api/metrics/query
+const FILE_PAGE_SIZE = 200;
 
 const MetricsContext = createContext();
 
@@ -10,33 +19,45 @@ export const MetricsProvider = ({children}) => {
     const [error, setError] = useState(null);
     const [progress, setProgress] = useState(0);
     const [statusMessage, setStatusMessage] = useState('');
+    const [currentJobId, setCurrentJobId] = useState(null);
+    const [metricsJobId, setMetricsJobId] = useState(null);
+    const [nextFileCursor, setNextFileCursor] = useState(null);
+    // Custom score weights (null: the weights the results were computed with)
+    const [weights, setWeights] = useState(null);
+    // Status of the followed watch (null if none), and its event stream
+    const [watchStatus, setWatchStatus] = useState(null);
+    const watchSource = useRef(null);
 
-    // Load metrics from CSV
-    const loadMetricsFromCSV = async () => {
+    // Load project metrics and the first page of file metrics (for a job, or the latest finished one);
+    // background reloads keep the current view instead of showing the loading state
+    const loadMetrics = async (jobId = null, scoreWeights = weights, background = false) => {
         try {
-            setIsLoading(true);
+            if (!background) setIsLoading(true);
             setError(null);
 
-            const response = await fetch('/api/metrics');
-
-            if (!response.ok) {
-                throw new Error(`Failed to load metrics: ${response.statusText}`);
-            }
-
-            const csvText = await response.text();
-            const parsedData = parseCSV(csvText);
-            const groupedData = groupMetricsByLevel(parsedData);
+            const weightsParam = formatWeights(scoreWeights);
+            const [projectPage, filePage] = await Promise.all([
+                queryMetrics({job: jobId, level: 'project', limit: 1, weights: weightsParam}),
+                queryMetrics({job: jobId, level: 'file', limit: FILE_PAGE_SIZE, weights: weightsParam}),
+            ]);
+            const groupedData = {file: filePage.rows, project: projectPage.rows};
 
             setMetricsData(groupedData);
+            setMetricsJobId(jobId);
+            setNextFileCursor(filePage.next_cursor);
 
-            // Select the first file by default if available
-            if (groupedData.file.length > 0) {
+            // Select the first file by default, unless only the weights changed
+            const keepSelection = jobId === metricsJobId &&
+                [...groupedData.file, ...groupedData.project].some(row => row.identifier === selectedFile);
+            if (keepSelection) {
+                setSelectedFile(selectedFile);
+            } else if (groupedData.file.length > 0) {
                 setSelectedFile(groupedData.file[0].identifier);
             } else if (groupedData.project.length > 0) {
                 setSelectedFile(groupedData.project[0].identifier);
             }
 
-            setIsLoading(false);
+            if (!background) setIsLoading(false);
         } catch (err) {
             console.error('Error loading metrics:', err);
             setError(err.message);
@@ -44,7 +65,32 @@ export const MetricsProvider = ({children}) => {
         }
     };
 
-    // Analyze a file or directory path
+    // Append the next page of file metrics
+    const loadMoreFiles = async () => {
+        if (!nextFileCursor) return;
+        try {
+            const page = await queryMetrics({
+                job: metricsJobId,
+                level: 'file',
+                limit: FILE_PAGE_SIZE,
+                cursor: nextFileCursor,
+                weights: formatWeights(weights)
+            });
+            setMetricsData(prev => ({...prev, file: [...prev.file, ...page.rows]}));
+            setNextFileCursor(page.next_cursor);
+        } catch (err) {
+            console.error('Error loading more files:', err);
+            setError(err.message);
+        }
+    };
+
+    // Re-score the loaded results with new weights (null restores the analysis-time weights)
+    const applyWeights = async (newWeights) => {
+        setWeights(newWeights);
+        await loadMetrics(metricsJobId, newWeights);
+    };
+
+    // Analyze a file or directory path, resolving to true once results are loaded
     const analyzePath = async (path) => {
         try {
             setIsLoading(true);
@@ -64,70 +110,151 @@ export const MetricsProvider = ({children}) => {
                 throw new Error(errorData.message || 'Failed to start analysis');
             }
 
-            // Start polling for status updates
-            await pollAnalysisStatus();
+            // Follow the queued job's status stream until it completes
+            const {job_id: jobId} = await response.json();
+            setCurrentJobId(jobId);
+            return await followAnalysisStatus(jobId);
 
         } catch (err) {
             console.error('Error analyzing path:', err);
             setError(err.message);
             setIsLoading(false);
+            return false;
+        } finally {
+            setCurrentJobId(null);
         }
     };
 
-    // Poll for analysis status updates
-    const pollAnalysisStatus = async () => {
+    // Ask the server to stop the running analysis; the status stream reports the outcome
+    const cancelAnalysis = async () => {
+        if (!currentJobId) return;
         try {
-            let completed = false;
-            let attempts = 0;
-            const maxAttempts = 60; // 5 minutes maximum (with 5s intervals)
-
-            while (!completed && attempts < maxAttempts) {
-                console.log("[Polling] Fetching /api/status...");
-                const response = await fetch('/api/status');
-                if (!response.ok) {
-                    throw new Error('Failed to fetch analysis status');
-                }
-
-                const status = await response.json();
-                console.log("[Polling] Status:", status);
-
-                // Update progress and status message for UI
-                setProgress(status.progress || 0);
-                setStatusMessage(status.status_message || '');
-
-                if (status.error) {
-                    throw new Error(status.error);
-                }
-
-                if (!status.in_progress) {
-                    completed = true;
-                    setProgress(100);
-                    setStatusMessage(status.status_message || 'Analysis complete');
-                    if (status.result && status.result.code === 0) {
-                        // Analysis completed successfully, load the metrics
-                        await loadMetricsFromCSV();
-                    } else {
-                        throw new Error(status.result?.message || 'Analysis failed');
-                    }
-                } else {
-                    // Wait before polling again
-                    await new Promise(resolve => setTimeout(resolve, 5000));
-                }
-
-                attempts++;
-            }
+            setStatusMessage('Cancelling...');
+            await requestCancelAnalysis(currentJobId);
+        } catch (err) {
+            setError(err.message);
+        }
+    };
 
-            if (!completed) {
-                throw new Error('Analysis timed out');
+    // Resolve with the final job status pushed over Server-Sent Events, reject on failure
+    const streamAnalysisStatus = (jobId) => new Promise((resolve, reject) => {
+        const source = new EventSource(`/api/jobs/${encodeURIComponent(jobId)}/events`);
+
+        source.onmessage = (event) => {
+            const status = JSON.parse(event.data);
+
+            // Update progress and status message for UI
+            setProgress(status.progress || 0);
+            setStatusMessage(status.status_message || '');
+
+            if (status.in_progress) return;
+
+            source.close();
+            if (status.error) {
+                reject(new Error(status.error));
+            } else if (status.result && status.result.code === 0) {
+                resolve(status);
+            } else {
+                reject(new Error(status.result?.message || 'Analysis failed'));
             }
+        };
+
+        source.onerror = () => {
+            source.close();
+            reject(new Error('Lost connection to the analysis status stream'));
+        };
+    });
+
+    // Follow analysis status updates and load the results once finished
+    const followAnalysisStatus = async (jobId) => {
+        try {
+            const status = await streamAnalysisStatus(jobId);
+
+            setProgress(100);
+            setStatusMessage(status.status_message || 'Analysis complete');
+
+            // Analysis completed successfully, load the metrics
+            await loadMetrics(jobId);
 
             setIsLoading(false);
+            return true;
         } catch (err) {
             setProgress(100);
             setStatusMessage('Error: ' + err.message);
-            console.error('Error during analysis polling:', err);
+            console.error('Error during analysis:', err);
+            setError(err.message);
+            setIsLoading(false);
+            return false;
+        }
+    };
+
+    // Watch updates arrive after later renders, so they must use the current loadMetrics
+    const latestLoadMetrics = useRef(loadMetrics);
+    latestLoadMetrics.current = loadMetrics;
+
+    // Close the watch stream when the provider unmounts
+    useEffect(() => () => watchSource.current?.close(), []);
+
+    // Follow a watch: load its results, and reload them after every re-scored batch.
+    // Resolves once the first results are loaded, rejects if the watch fails before that.
+    const followWatch = (watchId) => new Promise((resolve, reject) => {
+        watchSource.current?.close();
+        const source = new EventSource(`/api/watch/${encodeURIComponent(watchId)}/events`);
+        watchSource.current = source;
+        let loadedUpdates = 0;
+
+        source.onmessage = async (event) => {
+            const watch = JSON.parse(event.data);
+            setWatchStatus(watch);
+            setStatusMessage(watch.status_message || '');
+
+            if (watch.state === 'failed') {
+                source.close();
+                reject(new Error(watch.error || 'Watch failed'));
+                return;
+            }
+            if (watch.updates > loadedUpdates && watch.output_csv) {
+                const first = loadedUpdates === 0;
+                loadedUpdates = watch.updates;
+                await latestLoadMetrics.current(watchId, undefined, !first);
+                if (first) resolve(watch);
+            }
+            if (watch.state === 'stopped') {
+                source.close();
+                resolve(watch);
+            }
+        };
+
+        source.onerror = () => {
+            source.close();
+            reject(new Error('Lost connection to the watch stream'));
+        };
+    });
+
+    // Start watching a path, resolving to the watch id once its first results are loaded (null on failure)
+    const watchPath = async (path) => {
+        try {
+            setIsLoading(true);
+            setError(null);
+            const {watch_id: watchId} = await startWatch(path);
+            await followWatch(watchId);
+            setIsLoading(false);
+            return watchId;
+        } catch (err) {
+            console.error('Error watching path:', err);
             setError(err.message);
             setIsLoading(false);
+            return null;
+        }
+    };
+
+    // Stop the followed watch; the loaded results stay
+    const stopWatch = async () => {
+        if (!watchStatus) return;
+        try {
+            await requestStopWatch(watchStatus.watch_id);
+        } catch (err) {
+            setError(err.message);
         }
     };
 
@@ -150,12 +277,22 @@ export const MetricsProvider = ({children}) => {
         <MetricsContext.Provider
             value={{
                 metricsData,
+                metricsJobId,
                 selectedFile,
                 setSelectedFile,
                 isLoading,
                 error,
-                loadMetricsFromCSV,
+                loadMetrics,
+                loadMoreFiles,
+                hasMoreFiles: nextFileCursor !== null,
                 analyzePath,
+                cancelAnalysis,
+                watchPath,
+                followWatch,
+                stopWatch,
+                watchStatus,
+                weights,
+                applyWeights,
                 getFileMetrics,
                 getProjectMetrics,
                 progress,
@@ -0,0 +1,245 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from documetrics.CancellationToken import CancellationToken
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the pending queue is at capacity."""
+
+
+class JobQueue:
+    """
+    Bounded pool of analysis workers with per-job status records.
+
+    Jobs run in threads of the same process, so every job shares the models loaded once by
+    ``documetrics.CodeMetrics.load_models()``. Status records are plain dictionaries guarded by a
+    single lock; callers always receive copies. Every update is also pushed to the job's
+    subscribers (see subscribe()).
+    """
+
+    def __init__(self, runner: Callable[[str, str, CancellationToken], None], max_workers: int = 1,
+                 max_pending: int = 32, history: int = 50):
+        """
+        :param runner: Callable invoked as ``runner(job_id, path, cancel_token)`` on a worker thread.
+        :param max_workers: Number of analyses allowed to run concurrently.
+        :param max_pending: Maximum number of queued (not yet running) jobs.
+        :param history: Number of finished or failed jobs to remember.
+        """
+        self._runner = runner
+        self._max_pending = max_pending
+        self._history = history
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='analysis')
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._lock = threading.Lock()
+        self.max_workers = max(1, max_workers)
+
+    def submit(self, path: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Queue an analysis of ``path``.
+
+        :param path: File or directory to analyze.
+        :param fields: Extra fields stored on the job record.
+        :return: Copy of the new job record.
+        :raises QueueFullError: If ``max_pending`` jobs are already waiting.
+        """
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job['state'] == QUEUED)
+            if pending >= self._max_pending:
+                raise QueueFullError("Analysis queue is full.")
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'path': path,
+                'state': QUEUED,
+                'in_progress': True,
+                'progress': 0,
+                'status_message': 'Queued',
+                'result': None,
+                'error': None,
+                'output_csv': None,
+                'partial': False,
+                'cached': False,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                **fields,
+            }
+            self._tokens[job_id] = CancellationToken()
+            self._prune()
+            job = dict(self._jobs[job_id])
+        self._executor.submit(self._run, job_id, path)
+        return job
+
+    def _run(self, job_id: str, path: str) -> None:
+        """Worker entry point: mark the job running, call the runner and record a crash as failure."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            token = self._tokens.get(job_id)
+            if job is None or job['state'] != QUEUED:
+                return  # cancelled (or forgotten) while waiting in the queue
+        self.update(job_id, state=RUNNING, started_at=time.time(), status_message='Starting analysis...')
+        try:
+            self._runner(job_id, path, token)
+        except Exception as e:
+            self.finish(job_id, error=str(e))
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job. A queued job is cancelled immediately; a running job is asked to stop at its
+        next checkpoint and reaches the cancelled state once its runner returns.
+
+        :param job_id: Job identifier.
+        :return: Copy of the job record after the request, or None if the job is unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            state = job['state']
+            self._tokens[job_id].cancel()
+        if state == QUEUED:
+            self.update(job_id, state=CANCELLED, in_progress=False, progress=100,
+                        status_message='Analysis cancelled', finished_at=time.time())
+        elif state == RUNNING:
+            self.update(job_id, status_message='Cancelling...')
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """
+        Update fields of a job record.
+
+        :param job_id: Job identifier.
+        :param fields: Fields to overwrite.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            snapshot = dict(job)
+            for subscriber in self._subscribers.get(job_id, []):
+                subscriber.put(snapshot)
+
+    def subscribe(self, job_id: str) -> Optional[queue.Queue]:
+        """
+        Register for updates of a job. The returned queue immediately holds the current snapshot
+        and then receives a snapshot after every update.
+
+        :param job_id: Job identifier.
+        :return: Queue of job snapshots, or None if the job is unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            subscriber = queue.Queue()
+            subscriber.put(dict(job))
+            self._subscribers.setdefault(job_id, []).append(subscriber)
+            return subscriber
+
+    def unsubscribe(self, job_id: str, subscriber: queue.Queue) -> None:
+        """
+        Stop receiving updates on a queue returned by subscribe().
+
+        :param job_id: Job identifier.
+        :param subscriber: The queue to remove.
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def finish(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """
+        Mark a job as finished, or as cancelled if its token was triggered, or as failed if
+        ``error`` is given or the result code is negative.
+
+        :param job_id: Job identifier.
+        :param result: Result dictionary returned by ``ProjectAnalyzer.main``.
+        :param error: Error message if the analysis raised.
+        """
+        with self._lock:
+            token = self._tokens.get(job_id)
+        cancelled = token is not None and token.cancelled
+        failed = error is not None or (result is not None and result.get('code', 0) < 0)
+        if error is not None:
+            message = f'Error: {error}'
+        elif cancelled:
+            message = (result or {}).get('message', 'Analysis cancelled')
+        elif failed:
+            message = result.get('message', 'Analysis failed')
+        else:
+            message = 'Analysis complete'
+        if cancelled and error is None:
+            state = CANCELLED
+        else:
+            state = FAILED if failed else FINISHED
+        self.update(job_id,
+                    state=state,
+                    partial=state == CANCELLED and result is not None and result.get('code') == 1,
+                    in_progress=False,
+                    progress=100,
+                    status_message=message,
+                    result=result,
+                    error=error,
+                    finished_at=time.time())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        :param job_id: Job identifier.
+        :return: Copy of the job record, or None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        :return: Copies of all known job records, oldest first.
+        """
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def latest(self, state: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        :param state: If given, only consider jobs in this state.
+        :return: Copy of the most recently created matching job, or None.
+        """
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if state is None or job['state'] == state:
+                    return dict(job)
+        return None
+
+    def active_count(self) -> int:
+        """
+        :return: Number of queued or running jobs.
+        """
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job['state'] in ACTIVE_STATES)
+
+    def _prune(self) -> None:
+        """Forget the oldest completed jobs beyond the history limit. Caller must hold the lock."""
+        done = [job_id for job_id, job in self._jobs.items() if job['state'] not in ACTIVE_STATES]
+        for job_id in done[:max(0, len(done) - self._history)]:
+            del self._jobs[job_id]
+            self._tokens.pop(job_id, None)
@@ -0,0 +1,44 @@
+import threading
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+
+class LatencyTracker:
+    """Rolling window of request latencies with percentile summaries."""
+
+    def __init__(self, window: int = 1000):
+        """
+        :param window: Number of most recent samples kept.
+        """
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float) -> None:
+        """
+        :param latency_ms: Latency of one request in milliseconds.
+        """
+        with self._lock:
+            self._samples.append(latency_ms)
+            self._count += 1
+
+    def summary(self) -> Dict[str, float | int | None]:
+        """
+        :return: Total request count, number of samples in the window and their p50/p90/p99/max in ms.
+        """
+        with self._lock:
+            samples = np.array(self._samples, dtype=float)
+            count = self._count
+        if samples.size == 0:
+            return {"count": count, "window": 0, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+        return {
+            "count": count,
+            "window": int(samples.size),
+            "p50_ms": float(p50),
+            "p90_ms": float(p90),
+            "p99_ms": float(p99),
+            "max_ms": float(samples.max()),
+        }
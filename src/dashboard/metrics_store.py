@@ -0,0 +1,282 @@
+import base64
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional
+
+import pandas as pd
+
+from documetrics.DocuMetrics import ProjectAnalyzer
+from documetrics.FunctionTable import FunctionTable
+from documetrics.ScoreAggregator import ScoreAggregator
+from documetrics.globals import METRICS_LIST, COMPONENT_METRICS
+
+# Columns a query may sort by; all are non-null for file rows.
+SORTABLE_COLUMNS = ["identifier", "line_count", "doc_type"] + METRICS_LIST
+
+MAX_PAGE_SIZE = 1000
+
+
+class MetricsQueryError(ValueError):
+    """Raised for invalid query parameters; the message is safe to return to the client."""
+
+
+def read_results(path: str) -> pd.DataFrame:
+    """
+    :param path: Results file of a run, in any of OUTPUT_FORMATS.
+    :return: Its rows; Arrow and Parquet results need pyarrow.
+    """
+    return ProjectAnalyzer.load_results(path)
+
+
+def read_results_csv(path: str) -> bytes:
+    """
+    :param path: Results file of a run, in any of OUTPUT_FORMATS.
+    :return: The results as CSV, the format the dashboard downloads; CSV files are returned as is.
+    """
+    if ProjectAnalyzer.output_format_of(path) == 'csv':
+        with open(path, 'rb') as f:
+            return f.read()
+    return read_results(path).to_csv(index=False).encode('utf-8')
+
+
+class MetricsTable:
+    """
+    Indexed in-memory SQLite copy of one results file (usually CSV).
+
+    Rows keep the CSV columns; the SQLite rowid preserves the CSV order and breaks ties for
+    keyset (cursor) pagination.
+    """
+
+    def __init__(self, csv_path: str):
+        """
+        :param csv_path: Path of the results written by ProjectAnalyzer.export, in any of OUTPUT_FORMATS.
+        """
+        df = read_results(csv_path)
+        self.columns: List[str] = list(df.columns)
+        self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._lock = threading.Lock()
+        df.to_sql('metrics', self._conn, index=False)
+        cursor = self._conn.cursor()
+        cursor.execute('CREATE INDEX idx_identifier ON metrics (level, identifier)')
+        for column in SORTABLE_COLUMNS:
+            if column in self.columns and column != 'identifier':
+                cursor.execute(f'CREATE INDEX "idx_{column}" ON metrics (level, "{column}")')
+        self._conn.commit()
+
+    def query(self, level: str = 'file', path_prefix: Optional[str] = None, doc_type: Optional[str] = None,
+              score_metric: str = 'overall_score', min_score: Optional[float] = None,
+              max_score: Optional[float] = None, sort: str = 'identifier', order: str = 'asc',
+              limit: int = 100, cursor: Optional[str] = None,
+              weights: Optional[Mapping[str, float]] = None) -> Dict[str, Any]:
+        """
+        Filter, sort and paginate the rows of one level.
+
+        With ``weights``, overall_score is recomputed from the stored component metrics for
+        every row (file, directory and project alike, since it is linear in the components),
+        and filters and sorting use the recomputed score. Its percentiles cannot be recomputed
+        from the stored rows and are returned as None for weights other than the analysis-time ones.
+
+        :param level: Row level to return ("file", "project", ...).
+        :param path_prefix: Only return identifiers starting with this prefix.
+        :param doc_type: Only return rows of this doc type ("Human", "LLM", "Mixed").
+        :param score_metric: Metric the score range applies to.
+        :param min_score: Inclusive lower bound of ``score_metric``.
+        :param max_score: Inclusive upper bound of ``score_metric``.
+        :param sort: Column to sort by, one of SORTABLE_COLUMNS.
+        :param order: "asc" or "desc".
+        :param limit: Page size, at most MAX_PAGE_SIZE.
+        :param cursor: Opaque cursor returned as next_cursor by the previous page.
+        :param weights: Optional weight per component metric, see ScoreAggregator.validate_weights.
+        :return: Dictionary with rows, total (matching rows over all pages) and next_cursor
+            (None on the last page).
+        :raises MetricsQueryError: If a parameter is invalid.
+        """
+        if sort not in SORTABLE_COLUMNS or sort not in self.columns:
+            raise MetricsQueryError(f"Cannot sort by {sort!r}; expected one of {SORTABLE_COLUMNS}.")
+        if score_metric not in METRICS_LIST:
+            raise MetricsQueryError(f"Unknown metric {score_metric!r}; expected one of {METRICS_LIST}.")
+        if order not in ('asc', 'desc'):
+            raise MetricsQueryError("Order must be 'asc' or 'desc'.")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise MetricsQueryError(f"Limit must be between 1 and {MAX_PAGE_SIZE}.")
+        column = self._column_sql(weights)
+
+        where = ['level = ?']
+        params: List[Any] = [level]
+        if path_prefix:
+            # Range instead of LIKE so the (level, identifier) index is used
+            where.append('identifier >= ? AND identifier < ?')
+            params += [path_prefix, path_prefix + '\U0010ffff']
+        if doc_type:
+            where.append('doc_type = ?')
+            params.append(doc_type)
+        if min_score is not None:
+            where.append(f'{column(score_metric)} >= ?')
+            params.append(min_score)
+        if max_score is not None:
+            where.append(f'{column(score_metric)} <= ?')
+            params.append(max_score)
+
+        filter_sql = ' AND '.join(where)
+        page_where, page_params = filter_sql, list(params)
+        if cursor:
+            last_value, last_rowid = self._decode_cursor(cursor)
+            op = '>' if order == 'asc' else '<'
+            page_where += f' AND ({column(sort)} {op} ? OR ({column(sort)} = ? AND rowid {op} ?))'
+            page_params += [last_value, last_value, last_rowid]
+
+        direction = order.upper()
+        select = ', '.join(column(name) for name in self.columns)
+        sql = f'SELECT rowid, {select} FROM metrics WHERE {page_where} ' \
+              f'ORDER BY {column(sort)} {direction}, rowid {direction} LIMIT ?'
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM metrics WHERE {filter_sql}', params).fetchone()[0]
+            fetched = self._conn.execute(sql, page_params + [limit + 1]).fetchall()
+
+        has_more = len(fetched) > limit
+        fetched = fetched[:limit]
+        rows = [self._to_row(record) for record in fetched]
+        next_cursor = None
+        if has_more:
+            last = fetched[-1]
+            next_cursor = self._encode_cursor(last[1 + self.columns.index(sort)], last[0])
+        return {'rows': rows, 'total': total, 'next_cursor': next_cursor}
+
+    def averages(self, level: str = 'file', group_by: str = 'doc_type',
+                 weights: Optional[Mapping[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Average the component metrics and overall_score over all rows of one level, per group.
+
+        :param level: Row level to average ("file", "directory", ...).
+        :param group_by: Column to group by, one of SORTABLE_COLUMNS other than the metrics.
+        :param weights: Optional weight per component metric; overall_score is re-scored first.
+        :return: One dictionary per group value, in its order, with the group value, count
+            (rows in the group) and the mean of each metric (None if no row has a value).
+        :raises MetricsQueryError: If a parameter is invalid.
+        """
+        if group_by in METRICS_LIST or group_by not in SORTABLE_COLUMNS or group_by not in self.columns:
+            raise MetricsQueryError(f"Cannot group by {group_by!r}.")
+        column = self._column_sql(weights)
+        metrics = [name for name in COMPONENT_METRICS + ['overall_score'] if name in self.columns]
+        means = ', '.join(f'AVG({column(name)})' for name in metrics)
+        sql = f'SELECT "{group_by}", COUNT(*), {means} FROM metrics WHERE level = ? ' \
+              f'GROUP BY "{group_by}" ORDER BY "{group_by}"'
+        with self._lock:
+            fetched = self._conn.execute(sql, [level]).fetchall()
+        return [{group_by: record[0], 'count': record[1], **dict(zip(metrics, record[2:]))}
+                for record in fetched]
+
+    def _column_sql(self, weights: Optional[Mapping[str, float]]):
+        """
+        :param weights: Optional weight per component metric.
+        :return: Function mapping a column name to its SQL expression; overall_score becomes
+            the weighted sum of the components if weights are given, and its percentiles
+            become NULL unless the weights are the analysis-time ones.
+        :raises MetricsQueryError: If the weights are invalid or the table lacks a component.
+        """
+        if weights is None:
+            return lambda name: f'"{name}"'
+        try:
+            validated = ScoreAggregator.validate_weights(weights)
+        except ValueError as e:
+            raise MetricsQueryError(str(e))
+        if any(key not in self.columns for key in COMPONENT_METRICS):
+            raise MetricsQueryError("These results do not hold the component metrics needed for re-weighting.")
+        # Validated floats are safe to inline
+        overall = '(' + ' + '.join(f'"{key}" * {validated[key]!r}' for key in COMPONENT_METRICS) + ')'
+        stale = set()
+        if validated != ScoreAggregator.validate_weights(ScoreAggregator.WEIGHTS):
+            # Percentiles of the analysis-time scores would not match the re-scored mean
+            stale = {name for name in self.columns if re.fullmatch(r'overall_score_p\d+', name)}
+
+        def column(name: str) -> str:
+            if name == 'overall_score':
+                return overall
+            return 'NULL' if name in stale else f'"{name}"'
+        return column
+
+    def _to_row(self, record: tuple) -> Dict[str, Any]:
+        """Convert a SQLite record (rowid first) into a JSON-safe dictionary; NaN becomes None."""
+        row = {}
+        for column, value in zip(self.columns, record[1:]):
+            if isinstance(value, float) and math.isnan(value):
+                value = None
+            row[column] = value
+        return row
+
+    @staticmethod
+    def _encode_cursor(value: Any, rowid: int) -> str:
+        """Encode the sort value and rowid of the last row of a page."""
+        return base64.urlsafe_b64encode(json.dumps([value, rowid]).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple:
+        """Decode a cursor produced by _encode_cursor."""
+        try:
+            value, rowid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return value, int(rowid)
+        except (ValueError, TypeError):
+            raise MetricsQueryError("Invalid cursor.")
+
+
+class MetricsTableCache:
+    """Small LRU of MetricsTable objects keyed by CSV path, rebuilt when the file changes."""
+
+    def __init__(self, max_tables: int = 4):
+        self._max_tables = max_tables
+        self._tables: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, csv_path: str) -> MetricsTable:
+        """
+        :param csv_path: Path of a metrics CSV.
+        :return: Table for the current contents of the file.
+        """
+        stat = os.stat(csv_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._tables.get(csv_path)
+            if cached is not None and cached[0] == version:
+                self._tables.move_to_end(csv_path)
+                return cached[1]
+        table = MetricsTable(csv_path)
+        with self._lock:
+            self._tables[csv_path] = (version, table)
+            self._tables.move_to_end(csv_path)
+            while len(self._tables) > self._max_tables:
+                self._tables.popitem(last=False)
+        return table
+
+
+class FunctionTableCache:
+    """Small LRU of loaded FunctionTable objects keyed by path, reloaded when the file changes."""
+
+    def __init__(self, max_tables: int = 8):
+        self._max_tables = max_tables
+        self._tables: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> FunctionTable:
+        """
+        :param path: Path of a function table, see FunctionTable.table_file.
+        :return: Table for the current contents of the file.
+        """
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._tables.get(path)
+            if cached is not None and cached[0] == version:
+                self._tables.move_to_end(path)
+                return cached[1]
+        table = FunctionTable.load(path)
+        with self._lock:
+            self._tables[path] = (version, table)
+            self._tables.move_to_end(path)
+            while len(self._tables) > self._max_tables:
+                self._tables.popitem(last=False)
+        return table
@@ -0,0 +1,59 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+
+class ResultCache:
+    """
+    Bounded LRU of finished analyses keyed by ``ProjectAnalyzer.fingerprint``.
+
+    Entries only hold the location of a run's results; an entry whose CSV has disappeared is
+    treated as a miss and dropped.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        """
+        :param max_entries: Number of past runs to remember.
+        """
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        :param fingerprint: Fingerprint of the requested analysis.
+        :return: Copy of the cached entry (job_id, path, output_csv, result), or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            if not os.path.exists(entry['output_csv']):
+                del self._entries[fingerprint]
+                return None
+            self._entries.move_to_end(fingerprint)
+            return dict(entry)
+
+    def put(self, fingerprint: str, job_id: str, path: str, output_csv: str, result: Dict[str, Any]) -> None:
+        """
+        Remember a finished run, evicting the least recently used one beyond the limit.
+
+        :param fingerprint: Fingerprint the run was started with.
+        :param job_id: Job that produced the results.
+        :param path: Analyzed path.
+        :param output_csv: Results CSV of the run.
+        :param result: Result dictionary returned by ProjectAnalyzer.main.
+        """
+        with self._lock:
+            self._entries[fingerprint] = {'job_id': job_id, 'path': path, 'output_csv': output_csv, 'result': result}
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def output_files(self) -> Set[str]:
+        """
+        :return: Results files of all cached runs.
+        """
+        with self._lock:
+            return {entry['output_csv'] for entry in self._entries.values()}
@@ -1,10 +1,12 @@
 /**
  * Fetch metrics data from the server
+ * @param {string|null} jobId - Job to fetch results for (latest finished job if null)
  * @returns {Promise<string>} - CSV data as text
  */
-export const fetchMetricsData = async () => {
+export const fetchMetricsData = async (jobId = null) => {
     try {
-        const response = await fetch('/api/metrics');
+        const url = jobId ? `/api/metrics?job=${encodeURIComponent(jobId)}` : '/api/metrics';
+        const response = await fetch(url);
 
         if (!response.ok) {
             if (response.status === 404) {
@@ -21,22 +23,89 @@ export const fetchMetricsData = async () => {
 };
 
 /**
- * Analyze a file or directory path
+ * Query one page of metrics rows as JSON
+ * @param {Object} params - Query parameters: job, level, prefix, doc_type, metric, min, max,
+ *                          sort, order, limit, cursor and weights (null/undefined values are omitted)
+ * @returns {Promise<Object>} - Page with rows, total and next_cursor
+ */
+export const queryMetrics = async (params = {}) => {
+    const search = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined && value !== '') {
+            search.append(key, value);
+        }
+    });
+
+    try {
+        const response = await fetch(`/api/metrics/query?${search.toString()}`);
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.error || `Failed to query metrics: ${response.statusText}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API Error querying metrics:', error);
+        throw error;
+    }
+};
+
+/**
+ * Fetch per-group averages of the metrics over all rows of one level
+ * @param {Object} params - Query parameters: job, level, group_by and weights (null/undefined values are omitted)
+ * @returns {Promise<Object>} - Object with groups, one per group value with its count and metric means
+ */
+export const fetchMetricsSummary = async (params = {}) => {
+    const search = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined && value !== '') {
+            search.append(key, value);
+        }
+    });
+
+    try {
+        const response = await fetch(`/api/metrics/summary?${search.toString()}`);
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.error || `Failed to summarize metrics: ${response.statusText}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API Error summarizing metrics:', error);
+        throw error;
+    }
+};
+
+/**
+ * Fetch the weights overall scores were computed with at analysis time
+ * @returns {Promise<Object>} - Object with a weights mapping per component metric
+ */
+export const fetchWeights = async () => {
+    try {
+        const response = await fetch('/api/weights');
+
+        if (!response.ok) {
+            throw new Error(`Failed to load weights: ${response.statusText}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API Error fetching weights:', error);
+        throw error;
+    }
+};
+
+/**
+ * Queue analysis of a file or directory path
  * @param {string} rawPath - The file or directory path to analyze
- * @returns {Promise<Object>} - Analysis result indicating it started
+ * @returns {Promise<Object>} - Queue result including the job_id
  */
 export const analyzePath = async (rawPath) => {
     const path = rawPath.replace(/\\/g, '/');   // keeps ProjectAnalyzer happy
     try {
-        // Check the current status before starting a new analysis
-        const statusResponse = await fetch('/api/status');
-        if (statusResponse.ok) {
-            const status = await statusResponse.json();
-            if (status.in_progress) {
-                throw new Error('Analysis already in progress');
-            }
-        }
-
         const response = await fetch('/api/analyze', {
             method: 'POST',
             headers: {
@@ -58,12 +127,14 @@ export const analyzePath = async (rawPath) => {
 };
 
 /**
- * Check the status of an ongoing analysis
+ * Check the status of an analysis job
+ * @param {string|null} jobId - Job identifier (most recent job if null)
  * @returns {Promise<Object>} - Current analysis status
  */
-export const getAnalysisStatus = async () => {
+export const getAnalysisStatus = async (jobId = null) => {
     try {
-        const response = await fetch('/api/status');
+        const url = jobId ? `/api/status?job=${encodeURIComponent(jobId)}` : '/api/status';
+        const response = await fetch(url);
 
         if (!response.ok) {
             throw new Error(`Failed to get analysis status: ${response.statusText}`);
@@ -76,6 +147,121 @@ export const getAnalysisStatus = async () => {
     }
 };
 
+/**
+ * Cancel a queued or running analysis job
+ * @param {string} jobId - Job identifier
+ * @returns {Promise<Object>} - Job status after the cancellation request
+ */
+export const cancelAnalysis = async (jobId) => {
+    try {
+        const response = await fetch(`/api/jobs/${encodeURIComponent(jobId)}/cancel`, {method: 'POST'});
+
+        if (!response.ok) {
+            throw new Error(`Failed to cancel analysis: ${response.statusText}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API Error cancelling analysis:', error);
+        throw error;
+    }
+};
+
+/**
+ * Start watching a file or directory path; changed files are re-scored until the watch is stopped
+ * @param {string} rawPath - The file or directory path to watch
+ * @returns {Promise<Object>} - Start result including the watch_id
+ */
+export const startWatch = async (rawPath) => {
+    const path = rawPath.replace(/\\/g, '/');
+    try {
+        const response = await fetch('/api/watch', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({path}),
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.message || 'Failed to start watching');
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API Error starting watch:', error);
+        throw error;
+    }
+};
+
+/**
+ * Stop a watch; its results stay available
+ * @param {string} watchId - Watch identifier
+ * @returns {Promise<Object>} - Watch status after the stop request
+ */
+export const stopWatch = async (watchId) => {
+    try {
+        const response = await fetch(`/api/watch/${encodeURIComponent(watchId)}/stop`, {method: 'POST'});
+
+        if (!response.ok) {
+            throw new Error(`Failed to stop watch: ${response.statusText}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API Error stopping watch:', error);
+        throw error;
+    }
+};
+
+/**
+ * List queued, running and finished analysis jobs
+ * @returns {Promise<Object>} - Object with a jobs array and the worker count
+ */
+export const listJobs = async () => {
+    try {
+        const response = await fetch('/api/jobs');
+
+        if (!response.ok) {
+            throw new Error(`Failed to list jobs: ${response.statusText}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('API Error listing jobs:', error);
+        throw error;
+    }
+};
+
+/**
+ * Fetch the function-level records of one file
+ * @param {string} fileId - The file identifier
+ * @param {string|null} jobId - Job the file was analyzed in (latest finished job if null)
+ * @returns {Promise<Array|null>} - Functions in line order, or null if the run has none
+ */
+export const fetchFunctions = async (fileId, jobId = null) => {
+    const search = new URLSearchParams({file: fileId});
+    if (jobId) search.append('job', jobId);
+
+    try {
+        const response = await fetch(`/api/functions?${search.toString()}`);
+
+        if (response.status === 404) {
+            return null;
+        }
+        if (!response.ok) {
+            throw new Error(`Failed to load functions: ${response.statusText}`);
+        }
+
+        const data = await response.json();
+        return data.functions;
+    } catch (error) {
+        console.error('API Error fetching functions:', error);
+        throw error;
+    }
+};
+
 /**
  * Download metrics for a specific file
  * @param {string} fileId - The file identifier
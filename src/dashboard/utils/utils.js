@@ -1,3 +1,19 @@
+/**
+ * Metrics measured directly; overall_score is their weighted sum
+ */
+export const COMPONENT_METRICS = ['comment_density', 'completeness', 'conciseness', 'accuracy'];
+
+/**
+ * Format a weight vector as the weights query parameter of /api/metrics/query
+ * @param {Object|null} weights - Weight per component metric (null for the analysis-time weights)
+ * @returns {string|null} - Comma-separated name=value pairs, or null
+ */
+export const formatWeights = (weights) => {
+    if (!weights) return null;
+
+    return COMPONENT_METRICS.map(metric => `${metric}=${weights[metric]}`).join(',');
+};
+
 /**
  * Format a metric value for display
  * @param {number} value - The metric value (0-1)
@@ -47,29 +63,6 @@ export const formatFileName = (filePath) => {
     return filePath.split('/').pop();
 };
 
-/**
- * Parse CSV data into an array of objects
- * @param {string} csvText - The CSV text content
- * @returns {Array} - Array of objects representing CSV rows
- */
-export const parseCSV = (csvText) => {
-    const lines = csvText.trim().split('\n');
-    const headers = lines[0].split(',');
-
-    return lines.slice(1).map(line => {
-        const values = line.split(',');
-        const obj = {};
-
-        headers.forEach((header, i) => {
-            // Convert numeric values
-            const value = values[i] || '';
-            obj[header] = !isNaN(value) && value !== '' ? parseFloat(value) : value;
-        });
-
-        return obj;
-    });
-};
-
 /**
  * Group metrics data by level (file or project)
  * @param {Array} metricsData - Array of metrics objects
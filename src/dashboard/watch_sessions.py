@@ -0,0 +1,194 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from documetrics.CancellationToken import CancellationToken
+from documetrics.RunStore import RunStore
+from documetrics.WatchSession import WatchSession
+
+# Watch lifecycle states
+STARTING = 'starting'
+WATCHING = 'watching'
+STOPPED = 'stopped'
+FAILED = 'failed'
+
+ACTIVE_WATCH_STATES = (STARTING, WATCHING)
+
+
+class WatchLimitError(RuntimeError):
+    """Raised when a watch is started while ``max_sessions`` watches are already active."""
+
+
+class WatchRegistry:
+    """
+    Watch sessions (see ``documetrics.WatchSession``) running in the server, so re-scoring uses
+    the already loaded models. Each session runs on its own daemon thread rather than in the
+    job queue, since it only ends when stopped.
+
+    Like JobQueue, status records are plain dictionaries guarded by one lock, callers receive
+    copies, and every update is pushed to the watch's subscribers. A record's ``last_update``
+    holds the latest update event without its file rows; ``updates`` counts them. ``run_dir``
+    is the run directory the watch writes its results to once it has any.
+    """
+
+    def __init__(self, max_sessions: int = 4, history: int = 20):
+        """
+        :param max_sessions: Maximum number of concurrently active watches.
+        :param history: Number of stopped or failed watches to remember.
+        """
+        self._max_sessions = max_sessions
+        self._history = history
+        self._watches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, path: str, include: Optional[List[str]] = None,
+              exclude: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Start watching ``path``; the initial analysis runs on the session's thread.
+
+        :param path: File or directory to watch.
+        :param include: Optional include globs, see FileLoader.list_python_files.
+        :param exclude: Optional exclude globs, see FileLoader.list_python_files.
+        :return: Copy of the new watch record.
+        :raises WatchLimitError: If ``max_sessions`` watches are already active.
+        """
+        with self._lock:
+            active = sum(1 for watch in self._watches.values() if watch['state'] in ACTIVE_WATCH_STATES)
+            if active >= self._max_sessions:
+                raise WatchLimitError(f"At most {self._max_sessions} watches can be active.")
+            watch_id = uuid.uuid4().hex[:12]
+            self._watches[watch_id] = {
+                'watch_id': watch_id,
+                'path': path,
+                'state': STARTING,
+                'status_message': 'Analyzing...',
+                'backend': None,
+                'output_csv': None,
+                'run_dir': RunStore.run_dir(f'watch-{watch_id}'),
+                'files': 0,
+                'project': None,
+                'errors': {},
+                'last_update': None,
+                'updates': 0,
+                'error': None,
+                'created_at': time.time(),
+                'stopped_at': None,
+            }
+            self._tokens[watch_id] = CancellationToken()
+            self._prune()
+            watch = dict(self._watches[watch_id])
+        threading.Thread(target=self._run, args=(watch_id, path, include, exclude),
+                         name=f'watch-{watch_id}', daemon=True).start()
+        return watch
+
+    def _run(self, watch_id: str, path: str, include: Optional[List[str]], exclude: Optional[List[str]]) -> None:
+        """Session thread: analyze, then re-score changes until stopped; a crash marks the watch failed."""
+        token = self._tokens[watch_id]
+        session = None
+
+        def on_update(event: Dict[str, Any]) -> None:
+            summary = {key: value for key, value in event.items() if key != 'changed'}
+            summary['changed'] = [row['identifier'] for row in event['changed']]
+            with self._lock:
+                updates = self._watches[watch_id]['updates'] + 1
+            self._update(watch_id, files=event['files'], project=event['project'], errors=event['errors'],
+                         output_csv=session.output_file if event['project'] is not None else None,
+                         last_update=summary, updates=updates)
+
+        try:
+            session = WatchSession(path, run_id=f'watch-{watch_id}', on_update=on_update,
+                                   include=include, exclude=exclude)
+            session.start(cancel_token=token)
+            if not token.cancelled:
+                self._update(watch_id, state=WATCHING, backend=session.watcher.backend,
+                             status_message=f'Watching for changes ({session.watcher.backend})')
+                session.run(token)
+            self._update(watch_id, state=STOPPED, status_message='Watch stopped', stopped_at=time.time())
+        except Exception as e:
+            print(f"[Watch {watch_id}] Exception occurred:", e)
+            self._update(watch_id, state=FAILED, status_message=f'Error: {e}', error=str(e), stopped_at=time.time())
+        finally:
+            if session is not None: session.close()
+
+    def stop(self, watch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Ask a watch to stop; it reaches the stopped state within about half a second.
+
+        :param watch_id: Watch identifier.
+        :return: Copy of the watch record, or None if the watch is unknown.
+        """
+        with self._lock:
+            if watch_id not in self._watches:
+                return None
+            self._tokens[watch_id].cancel()
+        self._update(watch_id, status_message='Stopping...')
+        return self.get(watch_id)
+
+    def _update(self, watch_id: str, **fields: Any) -> None:
+        """Update fields of a watch record and push a snapshot to its subscribers."""
+        with self._lock:
+            watch = self._watches.get(watch_id)
+            if watch is None:
+                return
+            watch.update(fields)
+            snapshot = dict(watch)
+            for subscriber in self._subscribers.get(watch_id, []):
+                subscriber.put(snapshot)
+
+    def subscribe(self, watch_id: str) -> Optional[queue.Queue]:
+        """
+        Register for updates of a watch, see JobQueue.subscribe.
+
+        :param watch_id: Watch identifier.
+        :return: Queue of watch snapshots, or None if the watch is unknown.
+        """
+        with self._lock:
+            watch = self._watches.get(watch_id)
+            if watch is None:
+                return None
+            subscriber = queue.Queue()
+            subscriber.put(dict(watch))
+            self._subscribers.setdefault(watch_id, []).append(subscriber)
+            return subscriber
+
+    def unsubscribe(self, watch_id: str, subscriber: queue.Queue) -> None:
+        """
+        Stop receiving updates on a queue returned by subscribe().
+
+        :param watch_id: Watch identifier.
+        :param subscriber: The queue to remove.
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(watch_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(watch_id, None)
+
+    def get(self, watch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        :param watch_id: Watch identifier.
+        :return: Copy of the watch record, or None if unknown.
+        """
+        with self._lock:
+            watch = self._watches.get(watch_id)
+            return dict(watch) if watch is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        :return: Copies of all known watch records, oldest first.
+        """
+        with self._lock:
+            return [dict(watch) for watch in self._watches.values()]
+
+    def _prune(self) -> None:
+        """Forget the oldest stopped watches beyond the history limit. Caller must hold the lock."""
+        done = [watch_id for watch_id, watch in self._watches.items() if watch['state'] not in ACTIVE_WATCH_STATES]
+        for watch_id in done[:max(0, len(done) - self._history)]:
+            del self._watches[watch_id]
+            self._tokens.pop(watch_id, None)
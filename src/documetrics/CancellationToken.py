@@ -0,0 +1,45 @@
+import threading
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside the analysis pipeline once its cancellation token has been triggered."""
+
+
+# =============================================================================
+# Cooperative Cancellation
+# =============================================================================
+class CancellationToken:
+    """
+    Thread-safe flag shared between the caller of an analysis and the pipeline running it.
+
+    The pipeline checks the token between files and between embedding batches, so a cancelled
+    analysis stops after at most one model call.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """
+        Request cancellation. Safe to call more than once and from any thread.
+
+        :return: None.
+        """
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        :return: True once cancel() has been called.
+        """
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Abort the current unit of work if cancellation was requested.
+
+        :return: None.
+        :raises AnalysisCancelled: If cancel() has been called.
+        """
+        if self._event.is_set():
+            raise AnalysisCancelled("Analysis cancelled.")
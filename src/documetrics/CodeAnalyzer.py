@@ -1,38 +1,71 @@
 import re
 from typing import Dict, Any
 
-from documetrics.CodeMetrics import CodeMetrics
+from documetrics.CancellationToken import CancellationToken
+from documetrics.CodeMetrics import CodeMetrics, EmbeddingBatcher
 from documetrics.CodeParser import CodeParser
 from documetrics.ScoreAggregator import ScoreAggregator
+from documetrics.StageTimer import StageTimer
 
 
 class CodeAnalyzer:
     @staticmethod
-    def analyze_code(code: str, identifier: str = "unknown") -> Dict[str, Any] | None:
+    def analyze_code(code: str, identifier: str = "unknown",
+                     cancel_token: CancellationToken | None = None,
+                     batcher: EmbeddingBatcher | None = None,
+                     threshold: float | None = None, functions: bool = False) -> Dict[str, Any] | None:
         """
         Analyze a code snippet and compute various metrics.
 
+        Each stage is timed into the thread's StageTimer, if one is recording.
+
+        With a threshold, all metrics except accuracy (UniXcoder) are computed first. Accuracy
+        lies in [0, 1], so they bound the overall score; if both bounds fall on the same side of the threshold,
+        the accuracy metric is skipped and the result holds ``score_bounds`` (low, high) instead
+        of ``accuracy`` and ``overall_score``.
+
         :param code: The source code as a string.
         :param identifier: An identifier for the code snippet (e.g., filename).
+        :param cancel_token: Optional token checked between the model-based metrics.
+        :param batcher: Optional shared embedding batcher, see CodeMetrics.compute_accuracy_scores.
+        :param threshold: Optional overall score to decide cheaply, see above.
+        :param functions: If True, the result also holds ``functions``: the function-level
+            records, see CodeMetrics.function_records. Cheaply decided results never do.
         :return: Dictionary with computed metrics and metadata, or None if file does not contain
         enough comments or docstrings to be evaluated.
+        :raises AnalysisCancelled: If the token is cancelled during the analysis.
         """
         code_lines = [ln for ln in code.splitlines() if ln.strip()]  # no blanks
 
         if not code_lines:
             # empty file early drop out optimization
             return None
-        docstrings = CodeParser.extract_comments(code)
+        with StageTimer.stage("extract_comments"):
+            docstrings = CodeParser.extract_comments(code)
 
         # As of now we require 1 docstring to be present in the code to be evaluated
         if not docstrings:
             print(f"File {identifier} does not contain enough docstrings to be evaluated.")
             return None
 
-        density = CodeMetrics.compute_comment_density(code_lines)
-        completeness = CodeMetrics.compute_completeness(code)
-        conciseness = CodeMetrics.compute_conciseness(docstrings)
-        accuracy = CodeMetrics.compute_accuracy_scores(code)
+        with StageTimer.stage("comment_density"):
+            density = CodeMetrics.compute_comment_density(code_lines)
+        function_completeness = {} if functions else None
+        with StageTimer.stage("completeness"):
+            completeness = CodeMetrics.compute_completeness(code, function_completeness)
+        if cancel_token is not None: cancel_token.raise_if_cancelled()
+        with StageTimer.stage("conciseness"):
+            conciseness = CodeMetrics.compute_conciseness(docstrings)
+        if threshold is not None:
+            metrics = {"comment_density": density, "completeness": completeness, "conciseness": conciseness}
+            low = ScoreAggregator.compute_file_score(metrics)
+            high = low + ScoreAggregator.WEIGHTS["accuracy"]
+            if low >= threshold or high < threshold:
+                metrics.update(line_count=len(code_lines), identifier=identifier, score_bounds=(low, high))
+                return metrics
+        function_accuracy = {} if functions else None
+        with StageTimer.stage("accuracy"):
+            accuracy = CodeMetrics.compute_accuracy_scores(code, cancel_token, batcher, function_accuracy)
 
         metrics: Dict[str, Any] = {
             "comment_density": density,
@@ -44,23 +77,32 @@ class CodeAnalyzer:
         }
 
         metrics["overall_score"] = ScoreAggregator.compute_file_score(metrics)
+        if functions:
+            with StageTimer.stage("functions"):
+                metrics["functions"] = CodeMetrics.function_records(code, function_completeness, function_accuracy)
         return metrics
 
     @staticmethod
-    def analyze_file(file_path: str, throw: bool) -> Dict[str, Any] | None:
+    def analyze_file(file_path: str, throw: bool,
+                     cancel_token: CancellationToken | None = None,
+                     batcher: EmbeddingBatcher | None = None, functions: bool = False) -> Dict[str, Any] | None:
         """
         Load a Python file and analyze its code to compute metrics.
 
         :param file_path: Path to the Python file.
         :param throw: Throws an error if there is an error reading the file.
+        :param cancel_token: Optional token, see analyze_code.
+        :param batcher: Optional shared embedding batcher, see analyze_code.
+        :param functions: If True, also collect function-level records, see analyze_code.
         :return: Dictionary with computed metrics, or None if reading fails.
         """
         try:
-            with open(file_path, "r", encoding="utf-8-sig") as f:
+            with StageTimer.stage("read"), open(file_path, "r", encoding="utf-8-sig") as f:
                 code = f.read()
         except Exception as e:
             if throw:
                 raise RuntimeError(f"Error reading {file_path}: {e}")
             print(f"Error reading {file_path}: {e}")
             return None
-        return CodeAnalyzer.analyze_code(code, identifier=file_path)
+        return CodeAnalyzer.analyze_code(code, identifier=file_path, cancel_token=cancel_token, batcher=batcher,
+                                         functions=functions)
@@ -1,9 +1,12 @@
 import ast
 import math
 import re
+import threading
+import time
 import warnings
+from concurrent.futures import Future
 from functools import lru_cache
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import docstring_parser
 import nltk
@@ -14,18 +17,76 @@ from nltk.tokenize import sent_tokenize
 nltk.download('punkt_tab', quiet=True)
 
 from documetrics import unixcoder
+from documetrics.CancellationToken import CancellationToken
 from documetrics.CodeParser import CodeParser
+from documetrics.FunctionTable import FUNCTION_COLUMNS, FLAG_NO_DOCSTRING, FLAG_NO_DESCRIPTION, FLAG_VERBOSE
+from documetrics.ResourceManager import ResourceManager
+from documetrics.StageTimer import StageTimer
 
-from documetrics.globals import debug
+from documetrics.globals import debug, UNIXCODER_MODEL, MINILM_MODEL
 
 # Set the device to GPU if available, otherwise fallback to CPU
 _device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-# Initialize the UniXcoder model and move it to the selected device
-_unixcoder = unixcoder.UniXcoder("microsoft/unixcoder-base").to(_device).eval()
+# Models are loaded once per process by load_models(), on first use or during warm-up
+_unixcoder: unixcoder.UniXcoder | None = None
+_miniLM: SentenceTransformer | None = None
+_models_lock = threading.Lock()
 
-# Initialize the MiniLM-L6-v2 model for semantic comparison within conciseness metric
-_miniLM = SentenceTransformer("all-MiniLM-L6-v2", device=str(_device))
+# Maximum UniXcoder tokens per text (including special tokens); longer texts are truncated
+MAX_TOKEN_BUDGET = 512
+_token_budget = MAX_TOKEN_BUDGET
+
+
+def load_models() -> None:
+    """
+    Load the UniXcoder and MiniLM models if they are not loaded yet.
+
+    Safe to call from several threads; the first caller loads, the others wait. The core
+    budget from ResourceManager is applied first so the models start with the right thread pools.
+
+    :return: None.
+    """
+    global _unixcoder, _miniLM
+    if _unixcoder is not None:
+        return
+    with _models_lock:
+        if _unixcoder is not None:
+            return
+        ResourceManager.settings()
+        # Initialize the MiniLM-L6-v2 model for semantic comparison within conciseness metric
+        _miniLM = SentenceTransformer(MINILM_MODEL, device=str(_device))
+        # Initialize the UniXcoder model and move it to the selected device (published last)
+        _unixcoder = unixcoder.UniXcoder(UNIXCODER_MODEL).to(_device).eval()
+
+
+def models_loaded() -> bool:
+    """
+    :return: True once load_models() has completed.
+    """
+    return _unixcoder is not None
+
+
+def set_token_budget(tokens: int) -> None:
+    """
+    Set the maximum number of UniXcoder tokens per embedded text. Smaller budgets make the
+    accuracy metric cheaper for long functions, at the cost of ignoring their tails.
+
+    :param tokens: Budget between 8 and MAX_TOKEN_BUDGET.
+    :return: None.
+    :raises ValueError: If the budget is out of range.
+    """
+    global _token_budget
+    if not 8 <= tokens <= MAX_TOKEN_BUDGET:
+        raise ValueError(f"Token budget must be between 8 and {MAX_TOKEN_BUDGET}, got {tokens}.")
+    _token_budget = tokens
+
+
+def token_budget() -> int:
+    """
+    :return: The active token budget, see set_token_budget.
+    """
+    return _token_budget
 
 
 def _embed(text: str) -> torch.Tensor:
@@ -38,12 +99,126 @@ def _embed(text: str) -> torch.Tensor:
     :param text: The input text to embed.
     :return: A PyTorch tensor containing the L2-normalized embedding.
     """
-    token_ids = _unixcoder.tokenize([text], max_length=512, mode="<encoder-only>")
-    src = torch.tensor(token_ids).to(_device)
-    _, emb = _unixcoder(src)
+    load_models()
+    with StageTimer.stage("accuracy.unixcoder_tokenize", items=1):
+        token_ids = _unixcoder.tokenize([text], max_length=_token_budget, mode="<encoder-only>")
+    with StageTimer.stage("accuracy.unixcoder_inference", items=1, tokens=len(token_ids[0])):
+        src = torch.tensor(token_ids).to(_device)
+        _, emb = _unixcoder(src)
     return torch.nn.functional.normalize(emb, p=2, dim=1)
 
 
+def _embed_batch(texts: List[str], batch_size: int | None = None) -> torch.Tensor:
+    """
+    Generate L2-normalized embeddings for a batch of texts in UniXcoder forward passes of at
+    most ``batch_size`` texts.
+
+    Sequences are right-padded with the pad token; UniXcoder masks padding out of both the
+    attention and the mean pooling, so each row matches _embed of the same text.
+
+    :param texts: The input texts to embed.
+    :param batch_size: Maximum texts per forward pass; all texts in one pass if None.
+    :return: A PyTorch tensor of shape (len(texts), hidden_size).
+    """
+    if batch_size is not None and len(texts) > batch_size:
+        return torch.cat([_embed_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+    load_models()
+    with StageTimer.stage("accuracy.unixcoder_tokenize", items=len(texts)):
+        token_lists = _unixcoder.tokenize(texts, max_length=_token_budget, mode="<encoder-only>")
+    max_len = max(len(t) for t in token_lists)
+    pad_id = _unixcoder.config.pad_token_id
+    padded = [t + [pad_id] * (max_len - len(t)) for t in token_lists]
+    with StageTimer.stage("accuracy.unixcoder_inference", items=len(texts),
+                          tokens=sum(len(t) for t in token_lists), padded_tokens=max_len * len(texts)):
+        src = torch.tensor(padded, device=_device)
+        with torch.inference_mode():
+            _, emb = _unixcoder(src)
+    return torch.nn.functional.normalize(emb, p=2, dim=1)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces embedding requests from concurrent threads into shared UniXcoder batches.
+
+    A background thread waits up to ``window_ms`` after the first pending request for others to
+    arrive (or until ``max_batch`` texts are pending), embeds all of them in forward passes of
+    at most ``max_batch`` texts and hands each caller its own rows.
+    """
+
+    def __init__(self, window_ms: float = 5.0, max_batch: int = 64):
+        """
+        :param window_ms: How long to wait for more requests before running a batch.
+        :param max_batch: Number of pending texts that triggers a batch immediately, and the
+            maximum number of texts per forward pass.
+        """
+        self._window = window_ms / 1000.0
+        self._max_batch = max_batch
+        self._pending: List[Tuple[List[str], Future]] = []
+        self._pending_texts = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def embed(self, texts: List[str]) -> torch.Tensor:
+        """
+        Embed texts as part of the next batch, blocking until it has run. After close, the
+        worker is gone and the texts are embedded on the calling thread instead.
+
+        :param texts: The input texts to embed.
+        :return: A PyTorch tensor with one L2-normalized embedding per text.
+        """
+        future: Future = Future()
+        with self._cond:
+            closed = self._closed
+            if not closed:
+                self._pending.append((texts, future))
+                self._pending_texts += len(texts)
+                self._cond.notify()
+        if closed:
+            return _embed_batch(texts, self._max_batch)
+        return future.result()
+
+    def close(self) -> None:
+        """
+        Stop the worker thread once the pending requests are done; later requests are embedded
+        by their callers.
+
+        :return: None.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _run(self) -> None:
+        """Batching loop executed by the worker thread."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self._window
+                while self._pending_texts < self._max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending, self._pending_texts = self._pending, [], 0
+
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = _embed_batch(texts, self._max_batch)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[start:start + len(request_texts)])
+                start += len(request_texts)
+
+
 @lru_cache(maxsize=512)
 def _parse_docstring(ds: str):
     """
@@ -155,7 +330,8 @@ class CodeMetrics:
             if debug: print("Method has no docstring")
             return 0.0
         try:
-            parsed = _parse_docstring(docstring)
+            with StageTimer.stage("completeness.docstring_parser"):
+                parsed = _parse_docstring(docstring)
 
             # General description (minimum 2 words)
             has_desc = parsed.short_description is not None and len(parsed.short_description.split()) >= 2
@@ -191,7 +367,7 @@ class CodeMetrics:
             return 0.0
 
     @staticmethod
-    def compute_completeness(code: str) -> float:
+    def compute_completeness(code: str, function_scores: Dict[int, float] | None = None) -> float:
         """
         Check if the docstring contains required elements based on function/class definition.
         Supports the following Docstring Formats:
@@ -199,9 +375,12 @@ class CodeMetrics:
         DOES NOT support the combination of the above.
 
         :param code: The full source code containing the function/class.
+        :param function_scores: Optional dictionary receiving each function's score, keyed by
+            the line of its ``def``.
         :return: A completeness score between 0 (incomplete) and 1 (fully complete).
         """
-        function_doc_pairs = CodeParser.get_function_doc_pairs(code)
+        with StageTimer.stage("completeness.parse_ast"):
+            function_doc_pairs = CodeParser.get_function_doc_pairs(code)
         if not function_doc_pairs:
             print(f"Function docstring pairs not found in code: {code}")
             return 0.0
@@ -210,6 +389,7 @@ class CodeMetrics:
         for func_node, docstring in function_doc_pairs:
             score = CodeMetrics.assess_function_completeness(func_node, docstring)
             scores.append(score)
+            if function_scores is not None: function_scores[func_node.lineno] = score
 
         return np.round(sum(scores) / len(scores), 4)
 
@@ -236,10 +416,11 @@ class CodeMetrics:
             raise RuntimeError("Docstrings not found in code -- CodeMetrics.compute_conciseness")
 
         # Stop considering docstrings once tags are found (description ended)
-        parsed_docstring_descriptions = [
-            CodeParser.extract_description_text(doc).strip()
-            for doc in docstrings
-        ]
+        with StageTimer.stage("conciseness.extract_descriptions", items=len(docstrings)):
+            parsed_docstring_descriptions = [
+                CodeParser.extract_description_text(doc).strip()
+                for doc in docstrings
+            ]
         # Remove empty descriptions
         filtered_descriptions = [desc for desc in parsed_docstring_descriptions if desc.strip()]
         if not filtered_descriptions:
@@ -248,7 +429,9 @@ class CodeMetrics:
         # Count verbose comments
         verbose_count = 0
         for desc in filtered_descriptions:
-            for sent in sent_tokenize(desc):
+            with StageTimer.stage("conciseness.sent_tokenize"):
+                desc_sentences = sent_tokenize(desc)
+            for sent in desc_sentences:
                 sentences.append(sent)
                 if len(sent.split()) > verbose_threshold:
                     verbose_count += 1
@@ -261,8 +444,13 @@ class CodeMetrics:
             penalty = verbose_count
             max_penalty = num_sentences
         else:
-            embeddings = _miniLM.encode(sentences)
-            similarities = _miniLM.similarity(embeddings, embeddings).numpy()
+            load_models()
+            # Counting tokens costs a tokenizer pass, so only do it while timing
+            tokens = sum(map(len, _miniLM.tokenizer(sentences)["input_ids"])) if StageTimer.active() else 0
+            with StageTimer.stage("conciseness.minilm_encode", items=num_sentences, tokens=tokens):
+                embeddings = _miniLM.encode(sentences)
+            with StageTimer.stage("conciseness.similarity"):
+                similarities = _miniLM.similarity(embeddings, embeddings).numpy()
 
             similar_count = 0
             anchor = 0
@@ -277,6 +465,68 @@ class CodeMetrics:
 
         return max(0.0, 1.0 - (penalty / max_penalty))
 
+    @staticmethod
+    def function_records(code: str, completeness: Dict[int, float], accuracy: Dict[int, float],
+                         verbose_threshold: int = 20) -> Dict[str, List[Any]]:
+        """
+        Describe every function of the code, for the function table (see FunctionTable).
+
+        Names are qualified like ``__qualname__`` (``Class.method``, ``outer.<locals>.inner``).
+        Sentences are counted in the docstring description, the text before any tags, like
+        compute_conciseness does per docstring.
+
+        :param code: The Python source code as a string.
+        :param completeness: Completeness per function, see compute_completeness.
+        :param accuracy: Scaled similarity per function, see compute_accuracy_scores; functions
+            missing from it get None.
+        :param verbose_threshold: Word count above which a sentence is verbose.
+        :return: One list per column (``name`` and FUNCTION_COLUMNS), functions in line order.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", SyntaxWarning)
+            tree = ast.parse(code)
+
+        functions = []
+
+        def visit(node: ast.AST, prefix: str) -> None:
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.ClassDef):
+                    visit(child, f"{prefix}{child.name}.")
+                elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    # Like the metrics, only plain functions are described
+                    if isinstance(child, ast.FunctionDef): functions.append((child, prefix + child.name))
+                    visit(child, f"{prefix}{child.name}.<locals>.")
+                else:
+                    visit(child, prefix)
+
+        visit(tree, "")
+        functions.sort(key=lambda function: function[0].lineno)
+
+        records: Dict[str, List[Any]] = {"name": [], **{column: [] for column in FUNCTION_COLUMNS}}
+        for node, name in functions:
+            docstring = ast.get_docstring(node)
+            flags, sentences, verbose = 0, 0, 0
+            if not docstring:
+                flags |= FLAG_NO_DOCSTRING
+            else:
+                description = CodeParser.extract_description_text(docstring).strip()
+                if not description:
+                    flags |= FLAG_NO_DESCRIPTION
+                else:
+                    lengths = [len(sentence.split()) for sentence in sent_tokenize(description)]
+                    sentences = len(lengths)
+                    verbose = sum(length > verbose_threshold for length in lengths)
+                    if verbose: flags |= FLAG_VERBOSE
+            records["name"].append(name)
+            records["start_line"].append(node.lineno)
+            records["end_line"].append(node.end_lineno)
+            records["completeness"].append(completeness.get(node.lineno, 0.0))
+            records["accuracy"].append(accuracy.get(node.lineno))
+            records["sentences"].append(sentences)
+            records["verbose_sentences"].append(verbose)
+            records["flags"].append(flags)
+        return records
+
     @staticmethod
     def get_description_and_code(code: str) -> List[Tuple[str, str]]:
         """
@@ -286,6 +536,16 @@ class CodeMetrics:
         :param code: String containing the Python source code.
         :return: List of (docstring, function_body) tuples.
         """
+        return [(description, body) for _, description, body in CodeMetrics.get_functions_description_and_code(code)]
+
+    @staticmethod
+    def get_functions_description_and_code(code: str) -> List[Tuple[int, str, str]]:
+        """
+        Like get_description_and_code, with the line of each function's ``def``.
+
+        :param code: String containing the Python source code.
+        :return: List of (def line, docstring, function_body) tuples, in line order.
+        """
         lines = code.splitlines(keepends=True)
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", SyntaxWarning)
@@ -347,15 +607,17 @@ class CodeMetrics:
                 cleaned_lines.append(code_without_comment.rstrip())
 
             cleaned_function_body = '\n'.join(cleaned_lines)
-            functions.append((description, cleaned_function_body))
+            functions.append((node.lineno, description, cleaned_function_body))
         if debug:
-            for desc, body in functions:
+            for _, desc, body in functions:
                 print(f"Description: {desc}\n Body: {body}")
 
         return functions
 
     @staticmethod
-    def compute_accuracy_scores(code: str) -> float:
+    def compute_accuracy_scores(code: str, cancel_token: CancellationToken | None = None,
+                                batcher: EmbeddingBatcher | None = None,
+                                function_scores: Dict[int, float] | None = None) -> float:
         """
         Compute the accuracy score between code and its corresponding docstring.
 
@@ -365,15 +627,36 @@ class CodeMetrics:
         is returned as the accuracy score.
 
         :param code: The Python source code as a string.
+        :param cancel_token: Optional token checked before every embedding.
+        :param batcher: If given, embed all texts through this shared batcher instead of one by one.
+            Stage timings then only cover the wait for the batch (accuracy.unixcoder_batched).
+        :param function_scores: Optional dictionary receiving each function's scaled similarity,
+            keyed by the line of its ``def``.
         :return: A float representing the mean similarity score between code and docstrings.
+        :raises AnalysisCancelled: If the token is cancelled while embedding.
         """
-        pairs = CodeMetrics.get_description_and_code(code)
-        if not pairs:
+        with StageTimer.stage("accuracy.extract_pairs"):
+            functions = CodeMetrics.get_functions_description_and_code(code)
+        if not functions:
             return 0.0
+        pairs = [(description, body) for _, description, body in functions]
 
         flat = [txt for p in pairs for txt in p]  # [code0, doc0, …]
-        embeds = torch.cat([_embed(t) for t in flat])
+        if batcher is not None:
+            if cancel_token is not None: cancel_token.raise_if_cancelled()
+            # The batch runs on the batcher's thread; this times the wait for it
+            with StageTimer.stage("accuracy.unixcoder_batched", items=len(flat)):
+                embeds = batcher.embed(flat)
+        else:
+            embeds = []
+            for t in flat:
+                if cancel_token is not None: cancel_token.raise_if_cancelled()
+                embeds.append(_embed(t))
+            embeds = torch.cat(embeds)
         sims = torch.einsum("ac,ac->a", embeds[0::2], embeds[1::2])
+        if function_scores is not None:
+            for (line, _, _), sim in zip(functions, sims.tolist()):
+                function_scores[line] = CodeMetrics.normalize_and_scale_accuracy(sim)
         return  CodeMetrics.normalize_and_scale_accuracy(sims.mean().item())
 
     @staticmethod
@@ -0,0 +1,120 @@
+import os
+from typing import Any, Dict, List
+
+from documetrics.globals import METRICS_LIST
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for Arrow/Parquet output
+    pa = None
+    pq = None
+
+
+# =============================================================================
+# Arrow / Parquet Export
+# =============================================================================
+class ColumnarExport:
+    """
+    Typed columnar output of analysis results.
+
+    Metrics are stored as float64, counts as int64 and the repetitive string columns
+    (identifier, level, doc_type) as dictionary-encoded strings. Arrow IPC files are written
+    uncompressed so that load_arrow can memory-map them and read columns without copying.
+    """
+
+    @staticmethod
+    def _require_pyarrow() -> None:
+        """
+        :raises ImportError: If pyarrow is not installed.
+        """
+        if pa is None:
+            raise ImportError("Arrow and Parquet output require pyarrow: pip install DocuMetrics[arrow]")
+
+    @staticmethod
+    def to_table(file_results: List[Dict[str, Any]], project_results: Dict[str, Any],
+                 directory_results: List[Dict[str, Any]] | None = None) -> "pa.Table":
+        """
+        Build one Arrow table holding the file rows, the directory rows and the project row.
+
+        :param file_results: List of dictionaries with file metrics (``level`` set by the caller).
+        :param project_results: Aggregated project metrics.
+        :param directory_results: Optional directory rollups.
+        :return: Arrow table with typed columns.
+        :raises ImportError: If pyarrow is not installed.
+        """
+        ColumnarExport._require_pyarrow()
+        rows = file_results + (directory_results or []) + [project_results]
+        columns: List[str] = []
+        for row in rows:
+            columns += [key for key in row if key not in columns]
+
+        dictionary_type = pa.dictionary(pa.int32(), pa.string())
+        types = {"identifier": dictionary_type, "level": dictionary_type, "doc_type": dictionary_type,
+                 "line_count": pa.int64(), "num_files": pa.int64(), "partial": pa.bool_(), "is_package": pa.bool_()}
+        types.update({metric: pa.float64() for metric in METRICS_LIST})
+
+        arrays = [pa.array([row.get(column) for row in rows], type=types.get(column)) for column in columns]
+        return pa.Table.from_arrays(arrays, names=columns)
+
+    @staticmethod
+    def export_arrow(file_results: List[Dict[str, Any]], project_results: Dict[str, Any], output_file: str,
+                     directory_results: List[Dict[str, Any]] | None = None) -> None:
+        """
+        Write the results as an (uncompressed, memory-mappable) Arrow IPC file.
+
+        :param file_results: List of dictionaries with file metrics.
+        :param project_results: Aggregated project metrics.
+        :param output_file: Destination ``.arrow`` file.
+        :param directory_results: Optional directory rollups.
+        :return: None.
+        :raises ImportError: If pyarrow is not installed.
+        """
+        table = ColumnarExport.to_table(file_results, project_results, directory_results)
+        tmp_file = f"{output_file}.tmp-{os.getpid()}"
+        with pa.OSFile(tmp_file, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_file, output_file)
+
+    @staticmethod
+    def export_parquet(file_results: List[Dict[str, Any]], project_results: Dict[str, Any],
+                       output_file: str, directory_results: List[Dict[str, Any]] | None = None) -> None:
+        """
+        Write the results as a zstd-compressed Parquet file.
+
+        :param file_results: List of dictionaries with file metrics.
+        :param project_results: Aggregated project metrics.
+        :param output_file: Destination ``.parquet`` file.
+        :param directory_results: Optional directory rollups.
+        :return: None.
+        :raises ImportError: If pyarrow is not installed.
+        """
+        table = ColumnarExport.to_table(file_results, project_results, directory_results)
+        tmp_file = f"{output_file}.tmp-{os.getpid()}"
+        pq.write_table(table, tmp_file, compression="zstd")
+        os.replace(tmp_file, output_file)
+
+    @staticmethod
+    def load_arrow(path: str) -> "pa.Table":
+        """
+        Memory-map an Arrow IPC file written by export_arrow. Columns reference the mapped
+        file directly, so loading costs no parsing or copying regardless of the row count.
+
+        :param path: Path of the ``.arrow`` file.
+        :return: Arrow table backed by the memory map.
+        :raises ImportError: If pyarrow is not installed.
+        """
+        ColumnarExport._require_pyarrow()
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    @staticmethod
+    def load_parquet(path: str) -> "pa.Table":
+        """
+        :param path: Path of a ``.parquet`` file written by export_parquet.
+        :return: Arrow table (decoded into memory).
+        :raises ImportError: If pyarrow is not installed.
+        """
+        ColumnarExport._require_pyarrow()
+        return pq.read_table(path, memory_map=True)
@@ -0,0 +1,268 @@
+import ast
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from documetrics import __version__
+from documetrics.CodeAnalyzer import CodeAnalyzer
+from documetrics.CodeMetrics import EmbeddingBatcher
+from documetrics.DaemonClient import PROTOCOL_VERSION, PARSE_ERROR
+from documetrics.DocuMetrics import ProjectAnalyzer
+from documetrics.FileLoader import FileLoader
+from documetrics.FileResultCache import FileResultCache
+from documetrics.ScoreAggregator import ScoreAggregator
+from documetrics.globals import debug
+
+# Results kept in memory, in front of the optional cache directory
+MEMORY_ENTRIES = 4096
+
+
+def _to_json(value: Any) -> Any:
+    """Serialize the numpy scalars and arrays found in metrics."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+# =============================================================================
+# Daemon
+# =============================================================================
+class DaemonServer:
+    """
+    Local analysis server, so editors, hooks and scripts reuse loaded models and caches
+    instead of paying the start-up of a new process for every file.
+
+    Clients connect to a Unix domain socket and exchange one JSON object per line (see
+    DaemonClient). Requests name an ``op``:
+
+    - ``status`` (or ``ping``): version, protocol, pid, uptime, request count, cache statistics.
+    - ``analyze_path``: ``path`` with optional ``include``/``exclude``; returns ``files`` and
+      ``project``. Identifiers are absolute paths.
+    - ``analyze_source``: ``source`` with optional ``identifier``; returns ``metrics``, None if
+      the source has too few docstrings to be scored. With a ``threshold`` the metrics may
+      hold ``score_bounds`` instead of an overall score, see CodeAnalyzer.analyze_code.
+    - ``query``: ``paths`` or ``sources``; returns ``results``, the cached metrics of each
+      file's current content (or each source) or None, without analyzing anything.
+    - ``shutdown``: stops the daemon.
+
+    Every response carries ``code``: 0 on success, negative with a ``message`` on failure
+    (analyze_path uses the codes of ProjectAnalyzer.input_validation).
+
+    Requests of all connections share one embedding batcher, so concurrent analyses are
+    merged into batched forward passes, and one result cache: in memory, and in
+    ``cache_dir`` if given, keyed by content so a file saved back to an earlier state or an
+    identical blob is answered without analysis.
+    """
+
+    def __init__(self, socket_path: str, cache_dir: str | None = None, idle_timeout: float | None = 3600.0):
+        """
+        :param socket_path: Socket to listen on.
+        :param cache_dir: Optional persistent result cache, see FileResultCache.
+        :param idle_timeout: Seconds without requests after which the daemon exits; None to run until stopped.
+        """
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.cache = FileResultCache(cache_dir, ProjectAnalyzer.config_fingerprint(), memory_entries=MEMORY_ENTRIES)
+        self.batcher = EmbeddingBatcher(window_ms=5.0)
+        self.requests = 0
+        self.started_at = time.time()
+        self.last_request = time.monotonic()
+        self._server: _Server | None = None
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "ping": self.status,
+            "status": self.status,
+            "analyze_path": self.analyze_path,
+            "analyze_source": self.analyze_source,
+            "query": self.query,
+            "shutdown": self.shutdown,
+        }
+
+    # =============================================================================
+    # Requests
+    # =============================================================================
+    def status(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "code": 0,
+            "version": __version__,
+            "protocol": PROTOCOL_VERSION,
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started_at,
+            "requests": self.requests,
+            "cache": {"hits": self.cache.hits, "misses": self.cache.misses, "directory": self.cache.cache_dir},
+        }
+
+    def analyze_path(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        path, include, exclude = request.get("path"), request.get("include"), request.get("exclude")
+        validation = ProjectAnalyzer.input_validation(path, include, exclude)
+        if validation["code"] != 0:
+            return validation
+        path = os.path.abspath(path)
+        if os.path.isfile(path):
+            metrics = FileLoader.load_single_file(path, True, batcher=self.batcher, cache=self.cache)
+            files = [metrics] if metrics is not None else []
+        else:
+            files = FileLoader.load_dataset(path, include=include, exclude=exclude,
+                                            batcher=self.batcher, cache=self.cache)
+        project = ScoreAggregator.aggregate_project_score(files) if files else None
+        return {"code": 0, "files": files, "project": project}
+
+    def analyze_source(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        source = request.get("source")
+        if not isinstance(source, str):
+            return {"code": -1, "message": "No source provided."}
+        identifier = request.get("identifier") or "snippet"
+        try:
+            ast.parse(source, identifier)
+        except (SyntaxError, ValueError) as e:
+            return {"code": PARSE_ERROR, "message": f"Cannot parse {identifier}: {e}"}
+        key = self.cache.key_for(source.encode("utf-8"))
+        metrics = self.cache.get(key)
+        if metrics is None:
+            metrics = CodeAnalyzer.analyze_code(source, identifier, batcher=self.batcher,
+                                                threshold=request.get("threshold"))
+            # Only complete results are cached; bounds depend on the threshold
+            if metrics is None or "score_bounds" not in metrics: self.cache.put(key, metrics)
+        elif FileResultCache.is_skipped(metrics):
+            metrics = None
+        if metrics is not None:
+            metrics = {**metrics, "identifier": identifier,
+                       "doc_type": "LLM" if "llm" in identifier.lower() else "Human"}
+        return {"code": 0, "metrics": metrics}
+
+    def query(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        paths, sources = request.get("paths"), request.get("sources")
+        if not isinstance(paths, list) and not isinstance(sources, list):
+            return {"code": -1, "message": "No paths or sources provided."}
+        results = []
+        for path in paths or []:
+            key = self.cache.key(path)
+            # A memory-only cache counts misses for never analyzed files; that is what they are
+            metrics = self.cache.get(key) if key is not None else None
+            if metrics is None or FileResultCache.is_skipped(metrics):
+                results.append(None)
+            else:
+                results.append({**metrics, "identifier": path})
+        for source in sources or []:
+            metrics = self.cache.get(self.cache.key_for(source.encode("utf-8")))
+            results.append(None if metrics is None or FileResultCache.is_skipped(metrics) else metrics)
+        return {"code": 0, "results": results}
+
+    def shutdown(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # shutdown() waits for serve_forever, which runs on another thread than this handler
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {"code": 0, "message": "Shutting down."}
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer one request.
+
+        :param request: Decoded request.
+        :return: Response; failures are reported as negative codes rather than raised.
+        """
+        with self._lock:
+            self.requests += 1
+            self.last_request = time.monotonic()
+        handler = self._handlers.get(request.get("op")) if isinstance(request, dict) else None
+        if handler is None:
+            return {"code": -100, "message": f"Unknown request: {request!r:.100}"}
+        try:
+            return handler(request)
+        except Exception as e:
+            print(f"[Daemon] {request.get('op')} failed:", e)
+            return {"code": -101, "message": f"{type(e).__name__}: {e}"}
+        finally:
+            with self._lock:
+                self.last_request = time.monotonic()
+
+    # =============================================================================
+    # Serving
+    # =============================================================================
+    def _claim_socket(self) -> None:
+        """
+        Remove a socket left behind by a daemon that died.
+
+        :raises RuntimeError: If another daemon is listening on the socket.
+        """
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A daemon is already listening on {self.socket_path}.")
+
+    def _watch_idle(self) -> None:
+        while True:
+            time.sleep(min(self.idle_timeout, 30.0))
+            with self._lock:
+                idle = time.monotonic() - self.last_request
+            if idle >= self.idle_timeout:
+                print(f"[Daemon] Idle for {idle:.0f}s, shutting down.")
+                self._server.shutdown()
+                return
+
+    def serve(self) -> None:
+        """
+        Bind the socket, load the models, and answer requests until shut down or idle.
+
+        The socket is bound before the models load, so a second daemon started meanwhile
+        fails fast; clients connecting early wait in the listen backlog.
+
+        :return: None.
+        :raises RuntimeError: If another daemon is listening on the socket.
+        """
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        response = {"code": -100, "message": f"Invalid request: {e}"}
+                    else:
+                        response = daemon.handle(request)
+                    self.wfile.write(json.dumps(response, default=_to_json).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        self._claim_socket()
+        old_umask = os.umask(0o177)  # only the owner may connect
+        try:
+            self._server = _Server(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+        try:
+            print(f"[Daemon] Loading models (pid {os.getpid()})...")
+            ProjectAnalyzer.warm_up()
+            self.last_request = time.monotonic()
+            if self.idle_timeout:
+                threading.Thread(target=self._watch_idle, name="daemon-idle", daemon=True).start()
+            print(f"[Daemon] Listening on {self.socket_path}")
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self._server.server_close()
+            self.batcher.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            if debug: print(f"[Daemon] Served {self.requests} requests")
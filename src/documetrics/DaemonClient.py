@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from documetrics import __version__
+
+# Overrides the daemon's socket path, see DaemonClient.default_socket
+SOCKET_ENV = "DOCUMETRICS_SOCKET"
+
+# Bumped whenever requests or responses change incompatibly
+PROTOCOL_VERSION = 2
+
+# Response code of analyze_source for source that does not parse
+PARSE_ERROR = -3
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon cannot be reached, cannot be started, or rejects a request."""
+
+    def __init__(self, message: str, code: int | None = None):
+        """
+        :param message: Error message.
+        :param code: Response code of a rejected request; None if the daemon was not reached.
+        """
+        super().__init__(message)
+        self.code = code
+
+
+# =============================================================================
+# Daemon Client
+# =============================================================================
+class DaemonClient:
+    """
+    Thin client of the DocuMetrics daemon (see DaemonServer).
+
+    The protocol is one JSON object per line over a Unix domain socket: a request
+    ``{"op": ..., ...}`` is answered by one response ``{"code": 0, ...}``, or
+    ``{"code": <negative>, "message": ...}`` on failure. A connection may carry any number of
+    requests in turn.
+
+    This module only uses the standard library, so a client process starts in milliseconds;
+    the daemon pays the torch and model start-up once. With ``autostart`` the first request
+    starts a daemon in the background if none is listening (or one of another version is),
+    and waits for it to come up.
+    """
+
+    def __init__(self, socket_path: str | None = None, autostart: bool = True, timeout: float | None = 300.0,
+                 daemon_args: List[str] | None = None):
+        """
+        :param socket_path: Socket of the daemon; see default_socket if None.
+        :param autostart: Start a daemon if none is listening.
+        :param timeout: Seconds to wait for a response (the first one includes the daemon's
+            start-up); None waits forever.
+        :param daemon_args: Extra ``documetrics daemon`` arguments for an auto-started daemon,
+            e.g. ``["--cache-dir", path]``.
+        """
+        self.socket_path = socket_path or DaemonClient.default_socket()
+        self.autostart = autostart
+        self.timeout = timeout
+        self.daemon_args = list(daemon_args or [])
+        self._sock: socket.socket | None = None
+        self._reader = None
+
+    @staticmethod
+    def default_socket() -> str:
+        """
+        :return: ``$DOCUMETRICS_SOCKET`` if set, else a per-user socket in ``$XDG_RUNTIME_DIR``
+            or the temporary directory.
+        """
+        path = os.environ.get(SOCKET_ENV)
+        if path:
+            return path
+        user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+        return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"documetrics-{user}.sock")
+
+    @staticmethod
+    def log_file(socket_path: str) -> str:
+        """
+        :param socket_path: Socket of the daemon.
+        :return: File an auto-started daemon writes its output to.
+        """
+        return socket_path + ".log"
+
+    def _connect(self) -> socket.socket:
+        """
+        :return: Connected socket.
+        :raises OSError: If no daemon is listening.
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("The daemon needs Unix domain sockets, which this platform does not provide.")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.timeout)
+        return sock
+
+    def start_daemon(self) -> None:
+        """
+        Start a daemon in its own session, detached from this process, and wait until it accepts
+        connections (it answers once its models are loaded).
+
+        :return: None.
+        :raises DaemonError: If the daemon does not come up within the timeout.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        with open(DaemonClient.log_file(self.socket_path), "ab") as log:
+            process = subprocess.Popen([sys.executable, "-m", "documetrics.cli", "daemon",
+                                        "--socket", self.socket_path, *self.daemon_args],
+                                       stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                                       start_new_session=True, close_fds=True)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                self._connect().close()
+                return
+            except OSError:
+                pass
+            if process.poll() is not None:
+                # Lost a start-up race to another daemon, which may still be binding
+                try:
+                    self._connect().close()
+                    return
+                except OSError:
+                    raise DaemonError(f"The daemon exited with code {process.returncode}; "
+                                      f"see {DaemonClient.log_file(self.socket_path)}.")
+            time.sleep(0.05)
+        raise DaemonError(f"The daemon did not start within {self.timeout}s; "
+                          f"see {DaemonClient.log_file(self.socket_path)}.")
+
+    def _ensure_connected(self) -> None:
+        if self._sock is not None:
+            return
+        try:
+            self._sock = self._connect()
+        except OSError:
+            if not self.autostart:
+                raise DaemonError(f"No DocuMetrics daemon is listening on {self.socket_path}.")
+            self.start_daemon()
+            self._sock = self._connect()
+        self._reader = self._sock.makefile("rb")
+        if self.autostart:
+            status = self._send({"op": "status"})
+            if status.get("version") != __version__ or status.get("protocol") != PROTOCOL_VERSION:
+                # A daemon left over from another installation; replace it
+                self._send({"op": "shutdown"})
+                self.close()
+                time.sleep(0.2)
+                self.start_daemon()
+                self._sock = self._connect()
+                self._reader = self._sock.makefile("rb")
+
+    def _send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            self._sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            line = self._reader.readline()
+        except OSError as e:
+            self.close()
+            raise DaemonError(f"Lost the connection to the daemon: {e}")
+        if not line:
+            self.close()
+            raise DaemonError("The daemon closed the connection.")
+        return json.loads(line)
+
+    def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Send one request and wait for its response.
+
+        :param op: Operation, see DaemonServer.handle.
+        :param fields: Request fields.
+        :return: The response.
+        :raises DaemonError: If the daemon cannot be reached or the request failed.
+        """
+        self._ensure_connected()
+        response = self._send({"op": op, **fields})
+        if response.get("code", 0) < 0:
+            raise DaemonError(response.get("message", "Request failed."), response["code"])
+        return response
+
+    def analyze_path(self, path: str, include: List[str] | None = None,
+                     exclude: List[str] | None = None) -> Dict[str, Any]:
+        """
+        :param path: Python file or directory, resolved on the client's side.
+        :param include: Optional include globs, see FileLoader.list_python_files.
+        :param exclude: Optional exclude globs, see FileLoader.list_python_files.
+        :return: ``{"files": [file metrics], "project": project metrics or None}``.
+        """
+        return self.request("analyze_path", path=os.path.abspath(path), include=include, exclude=exclude)
+
+    def analyze_source(self, source: str, identifier: str = "snippet",
+                       threshold: float | None = None) -> Dict[str, Any] | None:
+        """
+        :param source: Python source code, e.g. an unsaved editor buffer or a staged blob.
+        :param identifier: Name of the source; "llm" in it labels the result as LLM-written.
+        :param threshold: Optional overall score to decide; if all metrics except accuracy
+            (UniXcoder) decide it, the metrics hold ``score_bounds`` instead of ``overall_score``.
+        :return: The metrics, or None if the source has too few docstrings to be scored.
+        """
+        return self.request("analyze_source", source=source, identifier=identifier, threshold=threshold)["metrics"]
+
+    def query(self, paths: List[str]) -> Dict[str, Dict[str, Any] | None]:
+        """
+        Look up cached results without analyzing anything.
+
+        :param paths: Python files.
+        :return: Metrics of every file whose current content the daemon has analyzed, None for
+            the others, keyed by the given paths.
+        """
+        response = self.request("query", paths=[os.path.abspath(path) for path in paths])
+        return dict(zip(paths, response["results"]))
+
+    def query_sources(self, sources: List[str]) -> List[Dict[str, Any] | None]:
+        """
+        Look up cached results of source code, e.g. committed blobs, without analyzing anything.
+
+        :param sources: Python source code.
+        :return: Metrics of every source the daemon has analyzed in full, None for the others.
+        """
+        return self.request("query", sources=sources)["results"]
+
+    def status(self) -> Dict[str, Any]:
+        """
+        :return: Version, pid, uptime, request count and cache statistics of the daemon.
+        """
+        return self.request("status")
+
+    def shutdown(self) -> None:
+        """
+        Stop the daemon.
+
+        :return: None.
+        """
+        self.request("shutdown")
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connection; the daemon keeps running.
+
+        :return: None.
+        """
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of the ``documetrics-client`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="documetrics-client",
+        description="Score Python code through the DocuMetrics daemon, starting it if needed.",
+    )
+    parser.add_argument("--socket", default=None, help="Socket of the daemon (default: $DOCUMETRICS_SOCKET).")
+    parser.add_argument("--no-start", action="store_true", help="Fail instead of starting a daemon.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    analyze = commands.add_parser("analyze", help="Analyze a file or directory and print the results as JSON.")
+    analyze.add_argument("path")
+    analyze.add_argument("--include", action="append", default=None, metavar="GLOB")
+    analyze.add_argument("--exclude", action="append", default=None, metavar="GLOB")
+    source = commands.add_parser("source", help="Analyze source code read from a file or '-' (stdin).")
+    source.add_argument("file")
+    source.add_argument("--identifier", default=None, help="Name of the source (default: the file name).")
+    query = commands.add_parser("query", help="Print cached results of files without analyzing them.")
+    query.add_argument("paths", nargs="+")
+    commands.add_parser("status", help="Print the daemon's status.")
+    commands.add_parser("stop", help="Stop the daemon.")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Entry point of the ``documetrics-client`` console script. Results are printed to stdout as JSON.
+
+    :param argv: Command-line arguments; defaults to sys.argv[1:].
+    :return: Process exit code: 0 on success, 1 on failure.
+    """
+    args = build_parser().parse_args(argv)
+    client = DaemonClient(args.socket, autostart=not args.no_start and args.command != "stop")
+    try:
+        if args.command == "analyze":
+            result = client.analyze_path(args.path, args.include, args.exclude)
+        elif args.command == "source":
+            if args.file == "-":
+                code = sys.stdin.read()
+            else:
+                with open(args.file, encoding="utf-8-sig") as f:
+                    code = f.read()
+            result = {"metrics": client.analyze_source(code, args.identifier or args.file)}
+        elif args.command == "query":
+            result = {"results": client.query(args.paths)}
+        elif args.command == "status":
+            result = client.status()
+        else:
+            client.shutdown()
+            result = {"code": 0, "message": "Daemon stopped."}
+    except (DaemonError, OSError) as e:
+        print(f"documetrics-client: {e}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,48 @@
+import contextlib
+import hashlib
+import json
 import os
-from typing import List, Dict, Any
+import re
+import sys
+from typing import List, Dict, Any, Callable
 
+import numpy as np
 import pandas as pd
 
+from documetrics.CancellationToken import CancellationToken
+from documetrics.CodeAnalyzer import CodeAnalyzer
+from documetrics.CodeMetrics import load_models, token_budget, EmbeddingBatcher
+from documetrics.ColumnarExport import ColumnarExport
 from documetrics.FileLoader import FileLoader
+from documetrics.FileResultCache import FileResultCache
+from documetrics.FunctionTable import FunctionTable
+from documetrics.JsonlSink import JsonlSink
+from documetrics.Profiler import RunProfiler
+from documetrics.QuantileSketch import QuantileCollector
+from documetrics.StageTimer import StageTimer, TIMING_ENV
+from documetrics.ResultsDatabase import ResultsDatabase
+from documetrics.RunStore import RunStore
 from documetrics.ScoreAggregator import ScoreAggregator
-from documetrics.globals import debug, METRICS_LIST
+from documetrics import __version__
+from documetrics.globals import debug, METRICS_LIST, COMPONENT_METRICS, UNIXCODER_MODEL, MINILM_MODEL
+
+
+# Small but representative snippet run through the full pipeline by warm_up()
+_WARM_UP_SNIPPET = '''
+def scale(values: list, factor: float) -> list:
+    """
+    Multiply every value by a constant factor. The input list is left unchanged.
+
+    :param values: Numbers to scale.
+    :param factor: Multiplier applied to each number.
+    :return: A new list with the scaled numbers.
+    """
+    return [v * factor for v in values]  # keep the original list intact
+'''
+
+
+# Supported result formats and their file extensions
+OUTPUT_FORMATS = {"csv": ".csv", "arrow": ".arrow", "parquet": ".parquet", "jsonl": ".jsonl"}
 
 
 # =============================================================================
@@ -44,37 +81,304 @@ class ProjectAnalyzer:
         print_file_results(project_results)
 
     @staticmethod
-    def export_to_csv(file_results: List[Dict[str, Any]], project_results: Dict[str, Any]) -> None:
+    def export_to_csv(file_results: List[Dict[str, Any]], project_results: Dict[str, Any],
+                      output_file: str, directory_results: List[Dict[str, Any]] | None = None) -> None:
         """
-        Export the analysis results to a CSV file.
+        Export the analysis results to a CSV file. The file is written under a temporary name
+        and renamed into place, so readers never see a half-written CSV.
 
         :param file_results: List of dictionaries with file metrics.
         :param project_results: Aggregated project metrics.
+        :param output_file: Destination CSV.
+        :param directory_results: Optional directory rollups, see ScoreAggregator.aggregate_directories.
         :return: None.
         """
-        output_file = os.path.join(os.path.dirname(__file__), "outputs", "all_metrics_combined.csv")
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        directory_results = directory_results or []
+
+        for d in file_results:
+            d["level"] = "file"
+        for d in directory_results:
+            d["level"] = "directory"
+        project_results["level"] = "project"
+
+        df = pd.DataFrame(file_results + directory_results + [project_results])
+        tmp_file = f"{output_file}.tmp-{os.getpid()}"
+        df.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, output_file)
+
+    @staticmethod
+    def output_format_of(output_file: str | None, output_format: str | None = None) -> str:
+        """
+        :param output_file: Destination file, "-" for standard output, or None.
+        :param output_format: Explicit format, one of OUTPUT_FORMATS.
+        :return: The explicit format, else the one matching the file extension, else "csv"
+            ("jsonl" for standard output).
+        :raises ValueError: If the explicit format is unknown, or cannot be written to standard output.
+        """
+        if output_format is not None:
+            if output_format not in OUTPUT_FORMATS:
+                raise ValueError(f"Unknown output format {output_format!r}; expected one of {list(OUTPUT_FORMATS)}.")
+            if output_file == JsonlSink.STDOUT and output_format != "jsonl":
+                raise ValueError("Only jsonl output can be written to standard output.")
+            return output_format
+        if output_file == JsonlSink.STDOUT:
+            return "jsonl"
+        extension = os.path.splitext(output_file or "")[1].lower()
+        return next((fmt for fmt, ext in OUTPUT_FORMATS.items() if ext == extension), "csv")
+
+    @staticmethod
+    def export(file_results: List[Dict[str, Any]], project_results: Dict[str, Any], output_file: str,
+               output_format: str | None = None, directory_results: List[Dict[str, Any]] | None = None) -> None:
+        """
+        Export the analysis results as CSV, Arrow IPC, Parquet or JSON Lines.
+        Rows are ordered files, directories, project.
 
+        :param file_results: List of dictionaries with file metrics.
+        :param project_results: Aggregated project metrics.
+        :param output_file: Destination file.
+        :param output_format: One of OUTPUT_FORMATS; inferred from the extension of output_file if None.
+        :param directory_results: Optional directory rollups, see ScoreAggregator.aggregate_directories.
+        :return: None.
+        :raises ImportError: For Arrow/Parquet output without pyarrow installed.
+        """
+        output_format = ProjectAnalyzer.output_format_of(output_file, output_format)
+        directory_results = directory_results or []
+        if output_format == "csv":
+            ProjectAnalyzer.export_to_csv(file_results, project_results, output_file, directory_results)
+            return
+        if output_format == "jsonl":
+            sink = JsonlSink(output_file, None)
+            for d in file_results:
+                sink.write(d)
+            for d in directory_results:
+                sink.write(d, level="directory")
+            sink.write(project_results, level="project")
+            sink.close()
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
         for d in file_results:
             d["level"] = "file"
+        for d in directory_results:
+            d["level"] = "directory"
         project_results["level"] = "project"
+        if output_format == "arrow":
+            ColumnarExport.export_arrow(file_results, project_results, output_file, directory_results)
+        else:
+            ColumnarExport.export_parquet(file_results, project_results, output_file, directory_results)
 
-        df = pd.DataFrame(file_results + [project_results])
-        df.to_csv(output_file, index=False)
+    @staticmethod
+    def load_results(input_file: str, input_format: str | None = None) -> pd.DataFrame:
+        """
+        Load exported results (any of OUTPUT_FORMATS) back into a DataFrame.
+
+        :param input_file: Results file.
+        :param input_format: One of OUTPUT_FORMATS; inferred from the extension if None.
+        :return: One row per file, directory and project result.
+        :raises ImportError: For Arrow/Parquet input without pyarrow installed.
+        """
+        input_format = ProjectAnalyzer.output_format_of(input_file, input_format)
+        if input_format == "arrow":
+            return ColumnarExport.load_arrow(input_file).to_pandas()
+        if input_format == "parquet":
+            return ColumnarExport.load_parquet(input_file).to_pandas()
+        if input_format == "jsonl":
+            return pd.read_json(input_file, lines=True)
+        return pd.read_csv(input_file)
 
     @staticmethod
-    def analyze_and_export(directory: str) -> None:
+    def save_results(df: pd.DataFrame, output_file: str, output_format: str | None = None) -> None:
+        """
+        Write a results DataFrame (see load_results) in any of OUTPUT_FORMATS, atomically.
+
+        :param df: Results to write.
+        :param output_file: Destination file.
+        :param output_format: One of OUTPUT_FORMATS; inferred from the extension if None.
+        :return: None.
+        :raises ImportError: For Arrow/Parquet output without pyarrow installed.
+        """
+        output_format = ProjectAnalyzer.output_format_of(output_file, output_format)
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        tmp_file = f"{output_file}.tmp-{os.getpid()}"
+        if output_format == "arrow":
+            df.to_feather(tmp_file, compression="uncompressed")  # keep it memory-mappable
+        elif output_format == "parquet":
+            df.to_parquet(tmp_file, compression="zstd", index=False)
+        elif output_format == "jsonl":
+            df.to_json(tmp_file, orient="records", lines=True)
+        else:
+            df.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, output_file)
+
+    @staticmethod
+    def reweight_results(input_file: str, weights: Dict[str, float], output_file: str | None = None) -> int:
+        """
+        Recompute overall scores of exported results for new weights, without re-analysis.
+
+        The overall_score percentiles of directory and project rows (see QuantileCollector) are
+        recomputed from the re-scored file rows.
+
+        :param input_file: Results file, see load_results.
+        :param weights: New weight per component metric, see ScoreAggregator.validate_weights.
+        :param output_file: Destination; defaults to overwriting the input. Its format follows
+            its extension.
+        :return: Number of re-scored rows.
+        :raises ValueError: If the weights are invalid.
+        """
+        df = ProjectAnalyzer.load_results(input_file)
+        df["overall_score"] = ScoreAggregator.reweight_scores(df[COMPONENT_METRICS].to_numpy(dtype=float), weights)
+        percentiles = [column for column in df.columns if re.fullmatch(r"overall_score_p\d+", column)]
+        if percentiles and "level" in df.columns:
+            quantiles = QuantileCollector()
+            files = df[df["level"] == "file"]
+            for identifier, score in zip(files["identifier"], files["overall_score"]):
+                quantiles.add({"identifier": identifier, "overall_score": score})
+            # Identifiers in exported results are relative to the analyzed root
+            columns = quantiles.metric_quantiles("overall_score", "",
+                                                 [int(column.rpartition("_p")[2]) / 100 for column in percentiles])
+            for i in np.flatnonzero(df["level"].isin(["directory", "project"]).to_numpy()):
+                key = None if df["level"].iat[i] == "project" else df["identifier"].iat[i]
+                for column in percentiles:
+                    df.iloc[i, df.columns.get_loc(column)] = columns.get(key, {}).get(column, np.nan)
+        ProjectAnalyzer.save_results(df, output_file or input_file)
+        return len(df)
+
+    @staticmethod
+    def analyze_and_export(directory: str, output_file: str,
+                           progress_callback: Callable[[Dict[str, Any]], None] | None = None,
+                           cancel_token: CancellationToken | None = None,
+                           results_db: str | None = None, run_id: str | None = None,
+                           output_format: str | None = None, timing: bool = False,
+                           profiler: RunProfiler | None = None,
+                           include: List[str] | None = None, exclude: List[str] | None = None,
+                           jobs: int = 1, batch_size: int | None = None,
+                           cache_dir: str | None = None) -> int:
         """
         Analyze all Python files in a directory and display both individual and aggregated metrics.
 
+        If the analysis is cancelled, the files completed so far are still exported, with every
+        row carrying ``partial=True``. Nothing is exported if no file was completed.
+
+        JSON Lines output is streamed: each file row is written as soon as the file is analyzed
+        (so rows of a cancelled run do not carry ``partial``; the project row does), and the
+        directory and project rows follow at the end. While streaming to standard output,
+        everything else the pipeline prints goes to standard error.
+
+        Directory and project rows carry p10/p50/p90 of every metric, from histogram sketches
+        built while the results stream in.
+
+        With timing enabled, per-stage timings of every file and their run summary (see
+        StageTimer) are written next to the output file and the summary is printed. Streamed
+        JSON Lines file rows carry their own ``timings``; other formats leave them out.
+
+        Embeddings are computed one text at a time unless ``jobs > 1`` or a ``batch_size`` is
+        given; then all files share one EmbeddingBatcher.
+
+        Function-level records of all files are saved as a FunctionTable next to the output
+        file (see FunctionTable.table_file), unless streaming to standard output.
+
         :param directory: Path to the directory containing Python files.
+        :param output_file: Destination file, see export.
+        :param progress_callback: Optional per-file progress callback, see FileLoader.load_dataset.
+        :param cancel_token: Optional cancellation token, see FileLoader.load_dataset.
+        :param results_db: Optional SQLite database (see ResultsDatabase) the run is also recorded in.
+        :param run_id: Id of the run in the results database; generated if None.
+        :param output_format: Result format, see export.
+        :param timing: If True, record and report per-stage timings.
+        :param profiler: Optional profiler, see FileLoader.load_dataset; closed by the caller.
+        :param include: Optional include globs, see FileLoader.list_python_files.
+        :param exclude: Optional exclude globs, see FileLoader.list_python_files.
+        :param jobs: Number of files analyzed concurrently, see FileLoader.load_dataset.
+        :param batch_size: Maximum texts per UniXcoder forward pass, see EmbeddingBatcher.
+        :param cache_dir: Optional per-file result cache directory, see FileResultCache.
+        :return: Number of analyzed files that were exported.
+        """
+        output_format = ProjectAnalyzer.output_format_of(output_file, output_format)
+        sink = JsonlSink(output_file, directory) if output_format == "jsonl" else None
+        quantiles = QuantileCollector()
+
+        def on_result(res: Dict[str, Any]) -> None:
+            if sink is None:
+                quantiles.add(res)
+                return
+            # Sketch the root-relative paths the streamed rows carry
+            quantiles.add({**res, "identifier": sink.relative_identifier(res["identifier"])})
+            sink.write({key: value for key, value in res.items() if key != "functions"})
+
+        batcher = None
+        if jobs > 1 or batch_size is not None:
+            # A single job has nobody to wait for, so batch each file's texts without delay
+            batcher = EmbeddingBatcher(window_ms=5.0 if jobs > 1 else 0.0, max_batch=batch_size or 64)
+        cache = FileResultCache(cache_dir, ProjectAnalyzer.config_fingerprint()) if cache_dir else None
+
+        redirect = contextlib.redirect_stdout(sys.stderr) if sink is not None and sink.to_stdout \
+            else contextlib.nullcontext()
+        try:
+            with redirect:
+                file_results = FileLoader.load_dataset(directory, progress_callback, cancel_token, on_result, timing,
+                                                       profiler, include, exclude, jobs, batcher, cache,
+                                                       functions=True)
+                if cache is not None: print(f"File cache: {cache.hits} hits, {cache.misses} misses")
+                file_timings = [res.pop("timings") for res in file_results] if timing else []
+                file_functions = [res.pop("functions", None) for res in file_results]
+                partial = cancel_token is not None and cancel_token.cancelled
+                if partial:
+                    if not file_results:
+                        return 0
+                    for res in file_results:
+                        res["partial"] = True
+                project_metrics = ScoreAggregator.aggregate_project_score(file_results)
+                if debug: ProjectAnalyzer.print_results(file_results, project_metrics)
+                if partial:
+                    project_metrics["partial"] = True
+                if results_db:
+                    database = ResultsDatabase(results_db)
+                    try:
+                        database.record_run(run_id or RunStore.new_run_id(), directory, file_results, project_metrics)
+                    finally:
+                        database.close()
+                if sink is not None:
+                    # Roll up over the same root-relative paths the streamed file rows carry
+                    relative = [{**res, "identifier": sink.relative_identifier(res["identifier"])}
+                                for res in file_results]
+                    directory_results = ScoreAggregator.aggregate_directories(relative)
+                    quantiles.annotate(directory_results, project_metrics, "")
+                    for d in directory_results:
+                        sink.write(d, level="directory")
+                    sink.write(project_metrics, level="project")
+                    identifiers = [res["identifier"] for res in relative]
+                else:
+                    prefix = FileLoader.trim_common_path_in_identifiers(file_results)
+                    directory_results = ScoreAggregator.aggregate_directories(file_results)
+                    quantiles.annotate(directory_results, project_metrics, prefix)
+                    ProjectAnalyzer.export(file_results, project_metrics, output_file, output_format,
+                                           directory_results)
+                    identifiers = [res["identifier"] for res in file_results]
+                if sink is None or not sink.to_stdout:
+                    table = FunctionTable.build((identifier, functions) for identifier, functions
+                                                in zip(identifiers, file_functions) if functions is not None)
+                    table.save(FunctionTable.table_file(output_file))
+                if timing:
+                    summary = StageTimer.summarize(file_timings)
+                    if sink is None or not sink.to_stdout:
+                        StageTimer.write(StageTimer.timings_file(output_file), summary,
+                                         dict(zip(identifiers, file_timings)))
+                    print(StageTimer.format_summary(summary))
+        finally:
+            if sink is not None: sink.close()
+            if batcher is not None: batcher.close()
+        return len(file_results)
+
+    @staticmethod
+    def warm_up() -> None:
+        """
+        Load the models and run one snippet through the whole pipeline, so that tokenizer
+        initialization and first-inference costs are paid before the first real analysis.
+
         :return: None.
         """
-        file_results = FileLoader.load_dataset(directory)
-        project_metrics = ScoreAggregator.aggregate_project_score(file_results)
-        if debug: ProjectAnalyzer.print_results(file_results, project_metrics)
-        FileLoader.trim_common_path_in_identifiers(file_results)
-        ProjectAnalyzer.export_to_csv(file_results, project_metrics)
+        load_models()
+        CodeAnalyzer.analyze_code(_WARM_UP_SNIPPET, identifier="warm-up")
 
     @staticmethod
     def cleanup() -> None:
@@ -85,6 +389,9 @@ class ProjectAnalyzer:
         - Synchronizes GPU kernels to ensure all operations are complete.
         - Triggers garbage collection to finalize and free memory.
         - Exits the program to terminate any stray non-daemon threads.
+
+        Long-running processes that analyze repeatedly should skip this (see main's keep_warm),
+        as it throws away the allocator cache the next analysis would reuse.
         """
         import gc
         # noinspection PyBroadException
@@ -97,7 +404,44 @@ class ProjectAnalyzer:
         gc.collect()  # encourage finalizers
 
     @staticmethod
-    def input_validation(file_path: str) -> Dict[str, int | str]:
+    def config_fingerprint() -> str:
+        """
+        Fingerprint the analysis configuration: the metrics, their weights, the model versions,
+        the token budget and the DocuMetrics version.
+
+        :return: Hex digest that changes whenever the same file could be scored differently.
+        """
+        config = {
+            "metrics": METRICS_LIST,
+            "weights": ScoreAggregator.WEIGHTS,
+            "models": [UNIXCODER_MODEL, MINILM_MODEL],
+            "token_budget": token_budget(),
+            "version": __version__,
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def fingerprint(file_path: str, include: List[str] | None = None, exclude: List[str] | None = None) -> str:
+        """
+        Fingerprint everything an analysis result depends on: the Python files below the path
+        (see FileLoader.fingerprint_tree), the absolute path itself (it feeds the Human/LLM label)
+        and the configuration (see config_fingerprint).
+
+        :param file_path: Path to a single Python file or directory.
+        :param include: Optional include globs, see FileLoader.list_python_files.
+        :param exclude: Optional exclude globs, see FileLoader.list_python_files.
+        :return: Hex digest identifying the expected analysis result.
+        """
+        config = {
+            "path": os.path.abspath(file_path),
+            "tree": FileLoader.fingerprint_tree(file_path, include, exclude),
+            "config": ProjectAnalyzer.config_fingerprint(),
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def input_validation(file_path: str, include: List[str] | None = None,
+                         exclude: List[str] | None = None) -> Dict[str, int | str]:
         if not file_path:  # Check for None or empty string
             return {"code": -1, "message": "No file or directory provided."}
         if not os.path.exists(file_path):  # Check if path exists
@@ -110,8 +454,7 @@ class ProjectAnalyzer:
             if os.path.getsize(file_path) == 0:  # Check for empty file
                 return {"code": -5, "message": f"File is empty: {file_path}"}
         if os.path.isdir(file_path):
-            py_files = [os.path.join(dp, f) for dp, dn, filenames in os.walk(file_path) for f in filenames if
-                        f.endswith(".py")]
+            py_files = FileLoader.list_python_files(file_path, include, exclude)
             if not py_files:  # Check if directory contains Python files
                 return {"code": -6, "message": f"Directory does not contain any Python (.py) files: {file_path}"}
         if not os.access(file_path, os.R_OK):  # Check for read permissions
@@ -122,23 +465,100 @@ class ProjectAnalyzer:
     # Main Routine
     # =============================================================================
     @staticmethod
-    def main(file_path: str = None) -> Dict[str, int | str]:
+    def main(file_path: str = None, output_file: str | None = None,
+             progress_callback: Callable[[Dict[str, Any]], None] | None = None,
+             cancel_token: CancellationToken | None = None,
+             keep_warm: bool = False, run_id: str | None = None,
+             results_db: str | None = None, output_format: str | None = None,
+             timing: bool | None = None, profile: Dict[str, Any] | None = None,
+             include: List[str] | None = None, exclude: List[str] | None = None,
+             jobs: int = 1, batch_size: int | None = None, cache_dir: str | None = None) -> Dict[str, int | str]:
         """
         Main routine to analyze a Python file or directory containing Python files.
 
+        Unless ``output_file`` is given, the results go into a new run directory of the RunStore,
+        which is published (and becomes the latest run) only once the export has completed.
+        The returned dictionary then also holds ``run_id`` and ``output_file``.
+
         :param file_path: Path to a single Python file or directory. If None, error is raised.
+        :param output_file: Destination file, see export. Bypasses the RunStore if given.
+        :param progress_callback: Optional per-file progress callback, see FileLoader.load_dataset.
+        :param cancel_token: Optional cancellation token. A cancelled run returns code 1 if partial
+            results were exported and code -8 if there was nothing to export.
+        :param keep_warm: If True, skip cleanup() so a long-running server keeps its warm state.
+        :param run_id: Id of the new run directory, see RunStore.begin_run.
+        :param results_db: SQLite results database the run is also recorded in, see ResultsDatabase.
+            Defaults to ``$DOCUMETRICS_RESULTS_DB``; run history is not kept if neither is set.
+        :param output_format: "csv", "arrow", "parquet" or "jsonl"; inferred from output_file if None.
+        :param timing: Record per-stage timings, see analyze_and_export. Defaults to
+            ``$DOCUMETRICS_TIMING``.
+        :param profile: Optional profiling spec, see RunProfiler.from_spec. Artifacts go into
+            ``profile/`` of the run directory (``<output>.profile/`` next to an output file, or
+            ``profiles/<run_id>/`` below the output root when streaming to stdout), which is
+            returned as ``profile_dir``.
+        :param include: Optional include globs, see FileLoader.list_python_files.
+        :param exclude: Optional exclude globs, see FileLoader.list_python_files.
+        :param jobs: Number of files analyzed concurrently, see analyze_and_export.
+        :param batch_size: Maximum texts per UniXcoder forward pass, see analyze_and_export.
+        :param cache_dir: Optional per-file result cache directory, see FileResultCache.
+        :raises ValueError: If the profiling spec is invalid.
         """
-        validation_result = ProjectAnalyzer.input_validation(file_path)
+        validation_result = ProjectAnalyzer.input_validation(file_path, include, exclude)
         if validation_result["code"] != 0:
             return validation_result
-        ProjectAnalyzer.analyze_and_export(file_path)
-        ProjectAnalyzer.cleanup()
-        return validation_result
+
+        output_format = ProjectAnalyzer.output_format_of(output_file, output_format)
+        results_db = results_db or os.environ.get(ResultsDatabase.DB_ENV)
+        run_id = run_id or RunStore.new_run_id()
+        if timing is None:
+            timing = os.environ.get(TIMING_ENV, "") not in ("", "0")
+        staging_dir = None
+        if output_file is None:
+            staging_dir = RunStore.begin_run(run_id)
+            output_file = os.path.join(staging_dir, RunStore.results_file(OUTPUT_FORMATS[output_format]))
+        profiler = None
+        try:
+            if profile:
+                if staging_dir is not None:
+                    profile_dir = os.path.join(staging_dir, "profile")
+                elif output_file == JsonlSink.STDOUT:
+                    profile_dir = os.path.join(RunStore.output_root(), "profiles", run_id)
+                else:
+                    profile_dir = RunProfiler.profile_dir(output_file)
+                profiler = RunProfiler.from_spec(profile, profile_dir, file_path)
+            exported = ProjectAnalyzer.analyze_and_export(file_path, output_file, progress_callback, cancel_token,
+                                                          results_db, run_id, output_format, timing, profiler,
+                                                          include, exclude, jobs, batch_size, cache_dir)
+            if profiler is not None: profiler.close()
+        except BaseException:
+            if staging_dir is not None: RunStore.abort_run(staging_dir)
+            raise
+        if staging_dir is not None:
+            if exported:
+                run_dir = RunStore.commit_run(staging_dir)
+                output_file = os.path.join(run_dir, os.path.basename(output_file))
+                validation_result = {**validation_result, "run_id": os.path.basename(run_dir)}
+            else:
+                RunStore.abort_run(staging_dir)
+                output_file = None
+        if not keep_warm:
+            ProjectAnalyzer.cleanup()
+        if cancel_token is not None and cancel_token.cancelled:
+            if exported:
+                return {"code": 1, "message": f"Analysis cancelled; partial results for {exported} files exported.",
+                        "run_id": validation_result.get("run_id"), "output_file": output_file}
+            return {"code": -8, "message": "Analysis cancelled before any file was analyzed."}
+        if profiler is not None:
+            profile_dir = profiler.output_dir
+            if staging_dir is not None:
+                profile_dir = os.path.join(os.path.dirname(output_file), "profile") if output_file else None
+            validation_result = {**validation_result, "profile_dir": profile_dir}
+        return {**validation_result, "output_file": output_file}
 
 
 if __name__ == "__main__":
-    import sys
-
     user_input = sys.argv[1] if len(sys.argv) > 1 else None
     result = ProjectAnalyzer.main(user_input)
     print(result["message"])
+    if result.get("output_file"):
+        print(f"Results written to {result['output_file']}")
@@ -1,19 +1,38 @@
+import fnmatch
+import hashlib
 import os
-from typing import List, Dict, Any, Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional, Callable, Sequence
 
+from documetrics.CancellationToken import CancellationToken, AnalysisCancelled
 from documetrics.CodeAnalyzer import CodeAnalyzer
+from documetrics.CodeMetrics import EmbeddingBatcher
+from documetrics.FileResultCache import FileResultCache
+from documetrics.Profiler import RunProfiler
+from documetrics.StageTimer import StageTimer
 from documetrics.globals import debug
 
 
 class FileLoader:
     @staticmethod
-    def load_single_file(file_path: str, throw: bool = False) -> Dict[str, Any] | None:
+    def load_single_file(file_path: str, throw: bool = False,
+                         cancel_token: CancellationToken | None = None,
+                         batcher: EmbeddingBatcher | None = None,
+                         cache: FileResultCache | None = None, functions: bool = False) -> Dict[str, Any] | None:
         """
         Load and analyze a single Python file.
 
         :param file_path: Path to the file.
         :param throw: If True, throw an exception if reading file causes an error
             If a file is within a folder, we just skip it rather than halting execution.
+        :param cancel_token: Optional token, see CodeAnalyzer.analyze_code.
+        :param batcher: Optional shared embedding batcher, see CodeAnalyzer.analyze_code.
+        :param cache: Optional per-file result cache; unchanged files are not re-analyzed.
+        :param functions: If True, the metrics also hold the function-level records, see
+            CodeAnalyzer.analyze_code; cache entries without them are re-analyzed.
         :return: Dictionary with file metrics.
         :raises FileNotFoundError: If the file does not exist.
         :raises RunTimeError: If throw is true, and error reading file
@@ -21,36 +40,232 @@ class FileLoader:
         if not os.path.exists(file_path): # should never happen
             print(f"File not found: {file_path}")
             raise FileNotFoundError
-        metrics = CodeAnalyzer.analyze_file(file_path, throw)
+        key = cache.key(file_path) if cache is not None else None
+        cached = cache.get(key) if key is not None else None
+        if cached is not None and functions and "functions" not in cached and not FileResultCache.is_skipped(cached):
+            cached = None  # cached by a run that did not collect functions
+        if cached is not None:
+            if FileResultCache.is_skipped(cached):
+                return None
+            metrics = {**cached, "identifier": file_path}
+            if not functions: metrics.pop("functions", None)
+        else:
+            metrics = CodeAnalyzer.analyze_file(file_path, throw, cancel_token, batcher, functions)
+            if key is not None: cache.put(key, metrics)
         if metrics is not None:
             label = "LLM" if "llm" in file_path.lower() else "Human"
             metrics["doc_type"] = label
         return metrics
 
     @staticmethod
-    def load_dataset(directory: str) -> List[Dict[str, Any]]:
+    def matches(relative_path: str, patterns: Sequence[str]) -> bool:
+        """
+        :param relative_path: '/'-separated path relative to the analyzed root.
+        :param patterns: fnmatch-style globs; ``*`` also matches '/'.
+        :return: True if any pattern matches.
+        """
+        return any(fnmatch.fnmatch(relative_path, pattern) for pattern in patterns)
+
+    @staticmethod
+    def list_python_files(directory: str, include: Sequence[str] | None = None,
+                          exclude: Sequence[str] | None = None) -> List[str]:
+        """
+        Recursively list all .py files below a directory, in os.walk order.
+
+        :param directory: Directory path to search.
+        :param include: If given, only list files whose path relative to the directory matches
+            one of these globs, see matches.
+        :param exclude: Skip files (and whole directories) whose relative path matches one of
+            these globs.
+        :return: List of file paths.
+        """
+        if not include and not exclude:
+            return [os.path.join(root, file)
+                    for root, _, files in os.walk(directory)
+                    for file in files
+                    if file.endswith(".py")]
+        file_paths = []
+        for root, dirs, files in os.walk(directory):
+            relative_root = os.path.relpath(root, directory).replace("\\", "/")
+            prefix = "" if relative_root == "." else relative_root + "/"
+            if exclude:
+                dirs[:] = [d for d in dirs if not FileLoader.matches(prefix + d, exclude)]
+            for file in files:
+                relative = prefix + file
+                if not file.endswith(".py") or (exclude and FileLoader.matches(relative, exclude)):
+                    continue
+                if include and not FileLoader.matches(relative, include):
+                    continue
+                file_paths.append(os.path.join(root, file))
+        return file_paths
+
+    @staticmethod
+    def count_lines(file_path: str) -> int:
+        """
+        Cheaply count the lines of a file without decoding it.
+
+        :param file_path: Path to the file.
+        :return: Number of lines, or 0 if the file cannot be read.
+        """
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return 0
+        return data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+
+    @staticmethod
+    def fingerprint_tree(path: str, include: Sequence[str] | None = None,
+                         exclude: Sequence[str] | None = None) -> str:
+        """
+        Cheaply fingerprint the Python files below a path from their relative paths, sizes and
+        modification times, without reading their contents.
+
+        :param path: A Python file or a directory.
+        :param include: Optional include globs, see list_python_files.
+        :param exclude: Optional exclude globs, see list_python_files.
+        :return: Hex digest that changes whenever a .py file is added, removed or modified.
+        """
+        digest = hashlib.sha256()
+        if os.path.isfile(path):
+            file_paths, root = [path], os.path.dirname(path)
+        else:
+            file_paths, root = FileLoader.list_python_files(path, include, exclude), path
+        for file_path in sorted(file_paths):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            rel = os.path.relpath(file_path, root).replace("\\", "/")
+            digest.update(f"{rel}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def load_dataset(directory: str,
+                     progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     cancel_token: Optional[CancellationToken] = None,
+                     result_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     timing: bool = False, profiler: RunProfiler | None = None,
+                     include: Sequence[str] | None = None, exclude: Sequence[str] | None = None,
+                     jobs: int = 1, batcher: EmbeddingBatcher | None = None,
+                     cache: FileResultCache | None = None, functions: bool = False) -> List[Dict[str, Any]]:
         """
         Walk through a directory to analyze all .py files and collect their metrics.
 
+        If a progress callback is given, it is called before each file and once at the end with a
+        dictionary containing files_done, files_total, lines_done, lines_total, current_file
+        (None at the end), elapsed_seconds and eta_seconds (None until the first file is done).
+
+        If the cancellation token is triggered, the file being analyzed is dropped and the
+        results of the files completed so far are returned; check ``cancel_token.cancelled``
+        to tell a partial result from a complete one.
+
+        If a result callback is given, it receives the metrics of each file as soon as the file
+        has been analyzed, e.g. to stream them out.
+
+        If timing is enabled, each file's metrics carry ``timings``: the StageTimer stages of its
+        analysis, including a ``total`` stage. Likewise, with ``functions`` they carry
+        ``functions``, the function-level records (see CodeMetrics.function_records).
+
+        With ``jobs > 1`` files are analyzed by that many threads (sharing ``batcher``, if given,
+        so their embeddings are computed in common batches). Results, callbacks and progress still
+        follow file order. Profiled runs are always sequential.
+
         :param directory: Directory path containing Python files.
+        :param progress_callback: Optional callable receiving progress dictionaries.
+        :param cancel_token: Optional token checked between files and embedding batches.
+        :param result_callback: Optional callable receiving each file's metrics dictionary.
+        :param timing: If True, record per-stage timings of every file.
+        :param profiler: Optional profiler wrapped around the analysis of each file it selects.
+        :param include: Optional include globs, see list_python_files.
+        :param exclude: Optional exclude globs, see list_python_files.
+        :param jobs: Number of files analyzed concurrently.
+        :param batcher: Optional shared embedding batcher, see CodeAnalyzer.analyze_code.
+        :param cache: Optional per-file result cache, see load_single_file.
+        :param functions: If True, collect function-level records.
         :return: List of dictionaries with file metrics.
         """
         results = []
-        if os.path.isfile(directory):
-            if debug: print(f"Analyzing file: {directory}")
-            metrics = FileLoader.load_single_file(directory, throw=True)
-            if metrics is None:  # This should not happen if throw=True
-                raise RuntimeError(f"Unexpected error: No metrics returned for file {directory}")
-            results.append(metrics)
-            return results
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".py"):
-                    file_path = os.path.join(root, file)
-                    if debug: print(f"Analyzing file: {file_path}")
-                    metrics = FileLoader.load_single_file(file_path)
-                    if metrics is not None:
-                        results.append(metrics)
+        single_file = os.path.isfile(directory)
+        file_paths = [directory] if single_file else FileLoader.list_python_files(directory, include, exclude)
+
+        line_counts = [FileLoader.count_lines(p) for p in file_paths] if progress_callback else []
+        lines_total = sum(line_counts)
+        lines_done = 0
+        start = time.perf_counter()
+
+        def report(done: int, current_file: str | None) -> None:
+            elapsed = time.perf_counter() - start
+            eta = elapsed / lines_done * (lines_total - lines_done) if lines_done else None
+            progress_callback({
+                "files_done": done,
+                "files_total": len(file_paths),
+                "lines_done": lines_done,
+                "lines_total": lines_total,
+                "current_file": current_file,
+                "elapsed_seconds": elapsed,
+                "eta_seconds": eta,
+            })
+
+        def analyze(file_path: str) -> Dict[str, Any] | None:
+            timer = StageTimer.begin() if timing else None
+            try:
+                with profiler.file(file_path) if profiler is not None else nullcontext(), StageTimer.stage("total"):
+                    metrics = FileLoader.load_single_file(file_path, single_file, cancel_token, batcher, cache,
+                                                          functions)
+            finally:
+                if timer is not None: timer.end()
+            if metrics is not None and timer is not None:
+                metrics["timings"] = timer.stages
+            return metrics
+
+        files_done = 0
+
+        def collect(i: int, file_path: str, metrics: Dict[str, Any] | None) -> None:
+            nonlocal files_done, lines_done
+            if metrics is not None:
+                results.append(metrics)
+                if result_callback: result_callback(metrics)
+            elif single_file:  # This should not happen if throw=True
+                raise RuntimeError(f"Unexpected error: No metrics returned for file {file_path}")
+            files_done += 1
+            if progress_callback: lines_done += line_counts[i]
+
+        if jobs <= 1 or profiler is not None or len(file_paths) <= 1:
+            for i, file_path in enumerate(file_paths):
+                if cancel_token is not None and cancel_token.cancelled:
+                    break
+                if debug: print(f"Analyzing file: {file_path}")
+                if progress_callback: report(files_done, file_path)
+                try:
+                    metrics = analyze(file_path)
+                except AnalysisCancelled:
+                    break
+                collect(i, file_path, metrics)
+        else:
+            # Keep a bounded window of files in flight and collect them in file order
+            with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="documetrics-file") as pool:
+                in_flight = deque()
+                next_index = 0
+                while next_index < len(file_paths) or in_flight:
+                    while next_index < len(file_paths) and len(in_flight) < 2 * jobs \
+                            and not (cancel_token is not None and cancel_token.cancelled):
+                        file_path = file_paths[next_index]
+                        if debug: print(f"Analyzing file: {file_path}")
+                        in_flight.append((next_index, file_path, pool.submit(analyze, file_path)))
+                        next_index += 1
+                    if not in_flight:
+                        break
+                    i, file_path, future = in_flight.popleft()
+                    if progress_callback: report(files_done, file_path)
+                    try:
+                        metrics = future.result()
+                    except AnalysisCancelled:
+                        break
+                    collect(i, file_path, metrics)
+                for _, _, future in in_flight:
+                    future.cancel()
+        if progress_callback: report(files_done, None)
         return results
 
     @staticmethod
@@ -62,7 +277,13 @@ class FileLoader:
         return prefix
 
     @staticmethod
-    def trim_common_path_in_identifiers(data: List[Dict[str, Any]]) -> None:
+    def trim_common_path_in_identifiers(data: List[Dict[str, Any]]) -> str:
+        """
+        Strip the longest common directory prefix from all file identifiers.
+
+        :param data: Result rows; the "Project Results" row is left alone.
+        :return: The removed prefix ('/'-separated, ending in '/'), or "" if there are no files.
+        """
         # Extract all identifiers that are actual file paths
         paths = [
             d["identifier"].replace("\\", "/")
@@ -71,7 +292,7 @@ class FileLoader:
         ]
 
         if not paths:
-            return
+            return ""
 
         common_prefix = FileLoader.find_common_path_prefix(paths)
 
@@ -82,3 +303,4 @@ class FileLoader:
                     d["identifier"] = normalized[len(common_prefix):]
                 else:
                     d["identifier"] = normalized
+        return common_prefix
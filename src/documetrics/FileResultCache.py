@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+# Marker stored for files that were analyzed but had too few docstrings to be scored
+_SKIPPED = {"skipped": True}
+
+
+# =============================================================================
+# Per-File Result Cache
+# =============================================================================
+class FileResultCache:
+    """
+    On-disk cache of file metrics keyed by file content and analysis configuration.
+
+    An entry is a small JSON file named after the SHA-256 of the configuration key and the
+    file's bytes, so renamed or copied files hit the same entry and any change to the file,
+    the weights, the models or the token budget misses. Path-dependent fields (identifier,
+    doc_type) are not stored. Entries are never evicted; delete the directory to reclaim space.
+
+    Long-running processes can add an in-memory LRU of the most recent entries in front of
+    the directory, or use the memory alone.
+    """
+
+    def __init__(self, cache_dir: str | None, config_key: str, memory_entries: int = 0):
+        """
+        :param cache_dir: Cache directory, created if needed; None to only cache in memory.
+        :param config_key: Fingerprint of everything besides the content the metrics depend on,
+            see ProjectAnalyzer.config_fingerprint.
+        :param memory_entries: Number of entries kept in memory.
+        """
+        self.cache_dir = cache_dir
+        self.config_key = config_key
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir is not None: os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, source: bytes) -> str:
+        """
+        :param source: File content.
+        :return: Cache key of the content.
+        """
+        return hashlib.sha256(self.config_key.encode() + source).hexdigest()
+
+    def key(self, file_path: str) -> str | None:
+        """
+        :param file_path: Python file.
+        :return: Cache key of the file's current content, or None if it cannot be read.
+        """
+        try:
+            with open(file_path, "rb") as f:
+                return self.key_for(f.read())
+        except OSError:
+            return None
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        """
+        :param key: Output of key.
+        :return: The cached metrics (``{"skipped": True}`` for files without enough docstrings),
+            or None on a miss.
+        """
+        with self._lock:
+            metrics = self._memory.get(key)
+            if metrics is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(metrics)
+        metrics = None
+        if self.cache_dir is not None:
+            try:
+                with open(self._entry(key), encoding="utf-8") as f:
+                    metrics = json.load(f)
+            except (OSError, ValueError):
+                pass
+        with self._lock:
+            if metrics is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, metrics)
+        return metrics
+
+    def _remember(self, key: str, stored: Dict[str, Any]) -> None:
+        if not self.memory_entries:
+            return
+        with self._lock:
+            self._memory[key] = dict(stored)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def put(self, key: str, metrics: Dict[str, Any] | None) -> None:
+        """
+        :param key: Output of key.
+        :param metrics: Metrics of the file, or None if it had too few docstrings.
+        :return: None.
+        """
+        stored = _SKIPPED if metrics is None else {
+            k: v for k, v in metrics.items() if k not in ("identifier", "doc_type", "timings")}
+        self._remember(key, stored)
+        if self.cache_dir is None:
+            return
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp_file = f"{entry}.tmp-{os.getpid()}-{id(stored)}"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+        os.replace(tmp_file, entry)
+
+    @staticmethod
+    def is_skipped(metrics: Dict[str, Any]) -> bool:
+        """
+        :param metrics: Output of get.
+        :return: True if the cached file had too few docstrings to be scored.
+        """
+        return metrics.get("skipped") is True
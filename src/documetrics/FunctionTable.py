@@ -0,0 +1,151 @@
+import os
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Bits of the flags column
+FLAG_NO_DOCSTRING = 1    # The function has no docstring
+FLAG_NO_DESCRIPTION = 2  # The docstring has no free text before its tags
+FLAG_VERBOSE = 4         # A description sentence is longer than the verbosity threshold
+
+FLAG_NAMES = {FLAG_NO_DOCSTRING: "no_docstring", FLAG_NO_DESCRIPTION: "no_description", FLAG_VERBOSE: "verbose"}
+
+# Numeric columns and their storage types; qualified names are stored separately
+FUNCTION_COLUMNS: Dict[str, type] = {
+    "start_line": np.int32,
+    "end_line": np.int32,
+    "completeness": np.float32,
+    "accuracy": np.float32,  # NaN if not computed
+    "sentences": np.int16,
+    "verbose_sentences": np.int16,
+    "flags": np.uint8,
+}
+
+
+def _encode(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """:return: UTF-8 bytes of all strings back to back, and the offsets of each string."""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+# =============================================================================
+# Function-Level Results
+# =============================================================================
+class FunctionTable:
+    """
+    Function-level results of a run in a columnar table.
+
+    Each column is one typed numpy array over all functions of all files; qualified names are
+    stored as one UTF-8 buffer with offsets. Rows are grouped by file, so looking up a file
+    costs a dictionary lookup and a slice of each column, independent of the run's size.
+
+    During the analysis, each file's functions are kept as a dictionary of per-column lists
+    (see CodeMetrics.function_records), which is JSON-friendly and cached along with the file
+    metrics. A run's table is saved uncompressed next to its results file (see table_file).
+    """
+
+    def __init__(self, files: List[str], row_offsets: np.ndarray, name_data: np.ndarray,
+                 name_offsets: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        :param files: File identifiers, in row order.
+        :param row_offsets: Rows of file i are ``row_offsets[i]:row_offsets[i + 1]``.
+        :param name_data: UTF-8 bytes of all qualified names.
+        :param name_offsets: Name of row j is ``name_data[name_offsets[j]:name_offsets[j + 1]]``.
+        :param columns: One array per FUNCTION_COLUMNS entry.
+        """
+        self.files = files
+        self.row_offsets = row_offsets
+        self.columns = columns
+        self._name_data = name_data
+        self._name_offsets = name_offsets
+        self._index = {identifier: i for i, identifier in enumerate(files)}
+
+    @staticmethod
+    def build(records: Iterable[Tuple[str, Dict[str, List[Any]]]]) -> "FunctionTable":
+        """
+        :param records: (file identifier, per-column lists of the file's functions) pairs.
+        :return: Table of all functions; a repeated identifier keeps its first records.
+        """
+        files: List[str] = []
+        seen = set()
+        names: List[str] = []
+        values: Dict[str, List[Any]] = {column: [] for column in FUNCTION_COLUMNS}
+        row_offsets = [0]
+        for identifier, rows in records:
+            if identifier in seen:
+                continue
+            seen.add(identifier)
+            files.append(identifier)
+            names.extend(rows["name"])
+            for column in FUNCTION_COLUMNS:
+                values[column].extend(rows[column])
+            row_offsets.append(len(names))
+        columns = {}
+        for column, dtype in FUNCTION_COLUMNS.items():
+            if np.issubdtype(dtype, np.floating):
+                values[column] = [np.nan if value is None else value for value in values[column]]
+            columns[column] = np.array(values[column], dtype=dtype)
+        name_data, name_offsets = _encode(names)
+        return FunctionTable(files, np.array(row_offsets, dtype=np.int64), name_data, name_offsets, columns)
+
+    def __len__(self) -> int:
+        return int(self.row_offsets[-1])
+
+    def rows(self, identifier: str) -> List[Dict[str, Any]] | None:
+        """
+        :param identifier: File identifier.
+        :return: The file's functions in line order, or None if the file is not in the table.
+            ``accuracy`` is None if it was not computed, ``flags`` lists FLAG_NAMES.
+        """
+        i = self._index.get(identifier)
+        if i is None:
+            return None
+        start, end = int(self.row_offsets[i]), int(self.row_offsets[i + 1])
+        columns = {column: values[start:end].tolist() for column, values in self.columns.items()}
+        rows = []
+        for j in range(end - start):
+            name_start, name_end = self._name_offsets[start + j], self._name_offsets[start + j + 1]
+            row = {"name": self._name_data[name_start:name_end].tobytes().decode("utf-8")}
+            row.update({column: values[j] for column, values in columns.items()})
+            row["completeness"] = round(row["completeness"], 4)
+            row["accuracy"] = None if np.isnan(row["accuracy"]) else round(row["accuracy"], 4)
+            row["flags"] = [name for bit, name in FLAG_NAMES.items() if row["flags"] & bit]
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def table_file(output_file: str) -> str:
+        """
+        :param output_file: Results file of a run.
+        :return: Path of the run's function table next to it, e.g. results.functions.npz.
+        """
+        return os.path.splitext(output_file)[0] + ".functions.npz"
+
+    def save(self, path: str) -> None:
+        """
+        Write the table as an uncompressed ``.npz`` archive.
+
+        :param path: Destination file, see table_file.
+        :return: None.
+        """
+        files, file_offsets = _encode(self.files)
+        tmp_file = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_file, "wb") as f:
+            np.savez(f, files=files, file_offsets=file_offsets, row_offsets=self.row_offsets,
+                     names=self._name_data, name_offsets=self._name_offsets, **self.columns)
+        os.replace(tmp_file, path)
+
+    @staticmethod
+    def load(path: str) -> "FunctionTable":
+        """
+        :param path: File written by save.
+        :return: The table.
+        """
+        with np.load(path) as archive:
+            files, file_offsets = archive["files"].tobytes(), archive["file_offsets"]
+            identifiers = [files[file_offsets[i]:file_offsets[i + 1]].decode("utf-8")
+                           for i in range(len(file_offsets) - 1)]
+            return FunctionTable(identifiers, archive["row_offsets"], archive["names"], archive["name_offsets"],
+                                 {column: archive[column] for column in FUNCTION_COLUMNS})
@@ -0,0 +1,103 @@
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+# =============================================================================
+# Streaming JSON Lines Output
+# =============================================================================
+class JsonlSink:
+    """
+    Writes one JSON object per line as results become available: a row per file as soon as it
+    is analyzed, then the project row. Rows are buffered in batches of at most ``batch_size``
+    and flushed when the batch is full or ``flush_interval`` seconds have passed, so consumers
+    see results promptly without a syscall per file.
+
+    File identifiers are written relative to the analyzed root, since the common path prefix
+    trimmed from the CSV output is not known until the run ends.
+    """
+    STDOUT = "-"
+
+    def __init__(self, output_file: str, root: str | None, batch_size: int = 32, flush_interval: float = 1.0):
+        """
+        :param output_file: Destination ``.jsonl`` file, or "-" for standard output.
+        :param root: Analyzed file or directory; None to write identifiers unchanged.
+        :param batch_size: Maximum number of buffered rows.
+        :param flush_interval: Maximum time in seconds a row stays buffered, checked on each write.
+        """
+        self.to_stdout = output_file == JsonlSink.STDOUT
+        if self.to_stdout:
+            self._stream = sys.stdout
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+            self._stream = open(output_file, "w", encoding="utf-8")
+        self._root = None
+        if root is not None:
+            self._root = os.path.abspath(os.path.dirname(root) if os.path.isfile(root) else root)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self.rows_written = 0
+
+    @staticmethod
+    def _jsonable(value: Any) -> Any:
+        """Convert numpy scalars to Python values and NaN to None."""
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
+
+    def relative_identifier(self, identifier: str) -> str:
+        """
+        :param identifier: File path as produced by the analysis.
+        :return: The path relative to the sink's root, '/'-separated (unchanged without a root).
+        """
+        if self._root is None:
+            return identifier
+        return os.path.relpath(os.path.abspath(identifier), self._root).replace("\\", "/")
+
+    def write(self, record: Dict[str, Any], level: str = "file") -> None:
+        """
+        Buffer one result row, flushing if the batch is full or overdue.
+
+        :param record: File metrics (with an untrimmed identifier) or project metrics.
+        :param level: "file", "directory" or "project".
+        :return: None.
+        """
+        row = {key: self._jsonable(value) for key, value in record.items()}
+        if level == "file":
+            row["identifier"] = self.relative_identifier(row["identifier"])
+        row["level"] = level
+        self._buffer.append(json.dumps(row))
+        if len(self._buffer) >= self._batch_size or time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write out the buffered rows.
+
+        :return: None.
+        """
+        if self._buffer:
+            self._stream.write("\n".join(self._buffer) + "\n")
+            self.rows_written += len(self._buffer)
+            self._buffer.clear()
+        self._stream.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Flush the remaining rows and close the file (standard output is left open).
+
+        :return: None.
+        """
+        self.flush()
+        if not self.to_stdout:
+            self._stream.close()
@@ -0,0 +1,227 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from documetrics.DaemonClient import DaemonClient, DaemonError, PARSE_ERROR
+
+# Staged changes the hook looks at: added, copied, modified and renamed files
+_DIFF_FILTER = "ACMR"
+
+
+# =============================================================================
+# Pre-Commit Hook
+# =============================================================================
+class PreCommitHook:
+    """
+    Blocks commits that lower the documentation quality of the staged Python files.
+
+    The staged content is read from the git index, not the working tree, so partially staged
+    files are judged by what is actually committed. Every file is scored through the daemon
+    (see DaemonClient) against its limit:
+
+    - the threshold, for new files and files whose committed version has no cached score;
+    - otherwise the lower of the threshold and the committed score minus the tolerance, so a
+      file below the threshold may be committed as long as it does not get worse.
+
+    The limit is sent along with the source, so the daemon skips the accuracy model whenever
+    all metrics except accuracy (UniXcoder) already decide it (see CodeAnalyzer.analyze_code). Complete scores
+    of committed content come from the daemon's cache: a file fully scored when it was staged
+    has its score cached once it is committed. Files with too few docstrings to be scored pass,
+    unless their committed version had a score.
+
+    Like DaemonClient, this module only uses the standard library, so with a running daemon a
+    typical commit is checked well within a second.
+    """
+
+    @staticmethod
+    def git(*args: str, stdin: bytes | None = None) -> bytes:
+        """
+        :param args: git arguments.
+        :param stdin: Optional standard input.
+        :return: Standard output.
+        :raises RuntimeError: If git fails.
+        """
+        result = subprocess.run(["git", *args], input=stdin, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"git {args[0]} failed: {result.stderr.decode(errors='replace').strip()}")
+        return result.stdout
+
+    @staticmethod
+    def staged_files() -> List[Tuple[str, str | None]]:
+        """
+        :return: (path, path in HEAD or None if new) of every staged Python file, relative to
+            the repository root.
+        """
+        output = PreCommitHook.git("diff", "--cached", "--name-status", "-z", "-M",
+                                   f"--diff-filter={_DIFF_FILTER}", "--", "*.py")
+        fields = output.decode("utf-8", errors="surrogateescape").split("\0")
+        files, i = [], 0
+        while i < len(fields) and fields[i]:
+            status = fields[i]
+            if status[0] in "RC":
+                old, new = fields[i + 1], fields[i + 2]
+                files.append((new, old if status[0] == "R" else None))
+                i += 3
+            else:
+                files.append((fields[i + 1], fields[i + 1] if status[0] == "M" else None))
+                i += 2
+        return files
+
+    @staticmethod
+    def read_blobs(specs: List[str]) -> List[bytes | None]:
+        """
+        Read several objects with one ``git cat-file --batch``.
+
+        :param specs: Object names, e.g. ``:path`` for the index or ``HEAD:path``.
+        :return: Content of each object, None if it does not exist.
+        """
+        if not specs:
+            return []
+        output = PreCommitHook.git("cat-file", "--batch",
+                                   stdin="".join(spec + "\n" for spec in specs).encode("utf-8", "surrogateescape"))
+        blobs, offset = [], 0
+        for _ in specs:
+            end = output.index(b"\n", offset)
+            header = output[offset:end].split()
+            offset = end + 1
+            if len(header) != 3:  # "<spec> missing" or "ambiguous"
+                blobs.append(None)
+                continue
+            size = int(header[2])
+            blobs.append(output[offset:offset + size])
+            offset += size + 1
+        return blobs
+
+    @staticmethod
+    def check(client: DaemonClient, files: List[Tuple[str, str | None]], threshold: float,
+              tolerance: float) -> List[Dict[str, object]]:
+        """
+        Score the staged version of each file against its limit.
+
+        :param client: Connected daemon client.
+        :param files: Output of staged_files.
+        :param threshold: Minimum overall score of a file.
+        :param tolerance: Allowed drop below the committed score for files under the threshold.
+        :return: One row per file: path, score or bounds, committed score, limit and whether it passed.
+        """
+        staged = PreCommitHook.read_blobs([f":{path}" for path, _ in files])
+        indexes = [i for i, (_, old) in enumerate(files) if old is not None]
+        committed = PreCommitHook.read_blobs([f"HEAD:{files[i][1]}" for i in indexes])
+        sources = {i: blob.decode("utf-8-sig", errors="replace")
+                   for i, blob in zip(indexes, committed) if blob is not None}
+        cached = dict(zip(sources, client.query_sources(list(sources.values())))) if sources else {}
+
+        rows = []
+        for i, ((path, _), blob) in enumerate(zip(files, staged)):
+            head = cached[i]["overall_score"] if cached.get(i) is not None else None
+            limit = threshold if head is None else min(threshold, head - tolerance)
+            row = {"path": path, "head": head, "limit": limit, "score": None, "bounds": None}
+            if blob is None:
+                continue
+            try:
+                metrics = client.analyze_source(blob.decode("utf-8-sig"), path, threshold=limit)
+            except UnicodeDecodeError as e:
+                row.update(passed=False, message=f"not UTF-8: {e}")
+                rows.append(row)
+                continue
+            except DaemonError as e:
+                if e.code != PARSE_ERROR:
+                    raise
+                row.update(passed=False, message=str(e))
+                rows.append(row)
+                continue
+            if metrics is None:
+                row.update(passed=head is None, message="too few docstrings to be scored")
+            elif "score_bounds" in metrics:
+                low, high = metrics["score_bounds"]
+                row.update(bounds=(low, high), passed=low >= limit)
+            else:
+                row.update(score=metrics["overall_score"], passed=metrics["overall_score"] >= limit)
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def describe(row: Dict[str, object]) -> str:
+        """
+        :param row: Row of check.
+        :return: One-line report of the row.
+        """
+        if row["score"] is not None:
+            score = f"{row['score']:.3f}"
+        elif row["bounds"] is not None:
+            low, high = row["bounds"]
+            score = f"at least {low:.3f}" if row["passed"] else f"at most {high:.3f}"
+        else:
+            score = row["message"]
+        head = f", was {row['head']:.3f}" if row["head"] is not None else ""
+        verdict = "ok" if row["passed"] else f"below {row['limit']:.3f}"
+        return f"{row['path']}: {score}{head} ({verdict})"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of the ``documetrics-hook`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="documetrics-hook",
+        description="Fail if staged Python files lower the documentation quality (git pre-commit hook).",
+    )
+    parser.add_argument("files", nargs="*",
+                        help="Only check these staged files (as passed by pre-commit); default: all staged files.")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Minimum overall score of a staged file (default: 0.5).")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Allowed score drop of files already below the threshold (default: 0.01).")
+    parser.add_argument("--socket", default=None, help="Socket of the daemon (default: $DOCUMETRICS_SOCKET).")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Cache directory of an auto-started daemon, so committed scores survive restarts.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Also list the files that pass.")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Entry point of the ``documetrics-hook`` console script; reports go to stderr.
+
+    :param argv: Command-line arguments; defaults to sys.argv[1:].
+    :return: Process exit code: 0 if every file passes, 1 otherwise or on failure.
+    """
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    client = None
+    try:
+        root = PreCommitHook.git("rev-parse", "--show-toplevel").decode().strip()
+        selected = {os.path.relpath(os.path.abspath(path), root).replace("\\", "/") for path in args.files}
+        os.chdir(root)
+        files = PreCommitHook.staged_files()
+        if selected:
+            files = [entry for entry in files if entry[0] in selected]
+        if not files:
+            return 0
+        daemon_args = ["--cache-dir", os.path.abspath(args.cache_dir)] if args.cache_dir else None
+        client = DaemonClient(args.socket, daemon_args=daemon_args)
+        rows = PreCommitHook.check(client, files, args.threshold, args.tolerance)
+    except (RuntimeError, OSError) as e:
+        print(f"documetrics-hook: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if client is not None: client.close()
+    failed = [row for row in rows if not row["passed"]]
+    for row in rows:
+        if args.verbose or not row["passed"]:
+            print(PreCommitHook.describe(row), file=sys.stderr)
+    if failed:
+        print(f"documetrics-hook: {len(failed)} of {len(rows)} files lower the documentation quality "
+              f"(checked in {time.perf_counter() - start:.2f}s).", file=sys.stderr)
+        return 1
+    if args.verbose:
+        print(f"documetrics-hook: {len(rows)} files ok (checked in {time.perf_counter() - start:.2f}s).",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import cProfile
+import fnmatch
+import json
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+import torch
+
+# Profilers a run can be wrapped in
+PROFILE_MODES = ("cprofile", "torch", "memory")
+
+
+# =============================================================================
+# Run Profiling
+# =============================================================================
+class RunProfiler:
+    """
+    Wraps the analysis of selected files in cProfile, the PyTorch profiler and/or tracemalloc,
+    and writes the artifacts into one directory:
+
+    - ``cprofile.pstats`` (all selected files, loadable with pstats) and ``cprofile.txt``;
+    - ``<n>-<file>.trace.json``: a Chrome trace (chrome://tracing, Perfetto) of the UniXcoder
+      and MiniLM operators per file;
+    - ``<n>-<file>.tracemalloc`` (a tracemalloc snapshot) and ``<n>-<file>.memory.txt`` with
+      the top allocation sites and the peak per file;
+    - ``profile.json`` listing the profiled files and artifacts.
+
+    Files are selected in analysis order: those matching ``match`` (a glob on the path
+    relative to the analyzed root), up to ``max_files``. The torch profiler and tracemalloc
+    are process-wide, so concurrent runs should not both profile with them.
+    """
+
+    def __init__(self, output_dir: str, modes: List[str], root: str, max_files: int | None = None,
+                 match: str | None = None):
+        """
+        :param output_dir: Directory the artifacts are written to; created if needed.
+        :param modes: Any of PROFILE_MODES.
+        :param root: Analyzed file or directory, for relative paths.
+        :param max_files: Maximum number of files to profile; all selected files if None.
+        :param match: Glob the relative file path must match, e.g. ``pkg/*.py``; all files if None.
+        :raises ValueError: If a mode is unknown or no mode is given.
+        """
+        RunProfiler.validate_spec({"modes": modes})
+        self.output_dir = output_dir
+        self.modes = list(modes)
+        self.root = os.path.dirname(root) if os.path.isfile(root) else root
+        self.max_files = max_files
+        self.match = match
+        self.profiled: List[str] = []
+        self.artifacts: List[str] = []
+        self._cprofile = cProfile.Profile() if "cprofile" in modes else None
+        os.makedirs(output_dir, exist_ok=True)
+
+    @staticmethod
+    def validate_spec(spec: Dict[str, Any]) -> Tuple[List[str], int | None, str | None]:
+        """
+        :param spec: ``{"modes": [...] or "cprofile,torch", "max_files": n, "match": glob}``,
+            e.g. from a request body.
+        :return: The modes, max_files and match.
+        :raises ValueError: If the spec is invalid.
+        """
+        if not isinstance(spec, dict):
+            raise ValueError(f"Profile spec must be an object, got {spec!r}.")
+        modes = spec.get("modes") or []
+        if isinstance(modes, str):
+            modes = [mode.strip() for mode in modes.split(",") if mode.strip()]
+        unknown = [mode for mode in modes if mode not in PROFILE_MODES]
+        if unknown or not modes:
+            raise ValueError(f"Invalid profile modes {list(modes)}, expected some of {PROFILE_MODES}.")
+        max_files = spec.get("max_files")
+        if max_files is not None and (not isinstance(max_files, int) or max_files < 1):
+            raise ValueError(f"max_files must be a positive integer, got {max_files!r}.")
+        match = spec.get("match")
+        if match is not None and not isinstance(match, str):
+            raise ValueError(f"match must be a glob string, got {match!r}.")
+        return list(modes), max_files, match
+
+    @staticmethod
+    def from_spec(spec: Dict[str, Any], output_dir: str, root: str) -> "RunProfiler":
+        """
+        :param spec: Profiling spec, see validate_spec.
+        :param output_dir: Directory the artifacts are written to.
+        :param root: Analyzed file or directory.
+        :return: The profiler.
+        :raises ValueError: If the spec is invalid.
+        """
+        modes, max_files, match = RunProfiler.validate_spec(spec)
+        return RunProfiler(output_dir, modes, root, max_files, match)
+
+    @staticmethod
+    def profile_dir(output_file: str) -> str:
+        """
+        :param output_file: Results file of a run.
+        :return: Directory for the run's profiling artifacts next to it, e.g. results.profile.
+        """
+        return os.path.splitext(output_file)[0] + ".profile"
+
+    def selects(self, file_path: str) -> str | None:
+        """
+        :param file_path: File about to be analyzed.
+        :return: Its root-relative path if it is to be profiled, else None.
+        """
+        if self.max_files is not None and len(self.profiled) >= self.max_files:
+            return None
+        relative = os.path.relpath(file_path, self.root).replace("\\", "/")
+        if self.match and not fnmatch.fnmatch(relative, self.match):
+            return None
+        return relative
+
+    def _artifact(self, name: str) -> str:
+        self.artifacts.append(name)
+        return os.path.join(self.output_dir, name)
+
+    @contextmanager
+    def file(self, file_path: str) -> Iterator[None]:
+        """
+        Profile the analysis of one file, if it is selected.
+
+        :param file_path: File analyzed in the enclosed block.
+        :return: Context manager.
+        """
+        relative = self.selects(file_path)
+        if relative is None:
+            yield
+            return
+        self.profiled.append(relative)
+        stem = f"{len(self.profiled):04d}-{relative.replace('/', '_')}"
+
+        torch_profile = None
+        if "torch" in self.modes:
+            torch_profile = torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU]
+                                                   + ([torch.profiler.ProfilerActivity.CUDA]
+                                                      if torch.cuda.is_available() else []),
+                                                   record_shapes=True)
+            torch_profile.__enter__()
+        if "memory" in self.modes:
+            tracemalloc.start(25)
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        try:
+            if torch_profile is not None:
+                with torch.profiler.record_function(f"documetrics:{relative}"):
+                    yield
+            else:
+                yield
+        finally:
+            if self._cprofile is not None:
+                self._cprofile.disable()
+            if "memory" in self.modes:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                snapshot.dump(self._artifact(f"{stem}.tracemalloc"))
+                with open(self._artifact(f"{stem}.memory.txt"), "w", encoding="utf-8") as f:
+                    f.write(f"{relative}: peak {peak / 1024 / 1024:.2f} MiB traced\n\n")
+                    for stat in snapshot.statistics("lineno")[:30]:
+                        f.write(f"{stat}\n")
+            if torch_profile is not None:
+                torch_profile.__exit__(None, None, None)
+                torch_profile.export_chrome_trace(self._artifact(f"{stem}.trace.json"))
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Write the cProfile statistics and the ``profile.json`` index.
+
+        :return: The index: output_dir, modes, profiled files and artifact names.
+        """
+        if self._cprofile is not None and self.profiled:
+            self._cprofile.dump_stats(self._artifact("cprofile.pstats"))
+            with open(self._artifact("cprofile.txt"), "w", encoding="utf-8") as f:
+                pstats.Stats(self._cprofile, stream=f).sort_stats("cumulative").print_stats(60)
+        index = {"output_dir": self.output_dir, "modes": self.modes, "files": self.profiled,
+                 "artifacts": list(self.artifacts)}
+        with open(os.path.join(self.output_dir, "profile.json"), "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        return index
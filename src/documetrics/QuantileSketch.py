@@ -0,0 +1,230 @@
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from documetrics.globals import METRICS_LIST
+
+# Percentiles attached to directory and project rows
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+
+# =============================================================================
+# Score Distributions
+# =============================================================================
+class QuantileSketch:
+    """
+    Fixed-bin histogram of every metric over [0, 1].
+
+    Memory is ``len(METRICS_LIST) * bins`` counters regardless of how many files are added,
+    and merging two sketches is an exact element-wise sum, so sketches built by shards or
+    parallel workers combine into exactly the sketch a single pass would have built.
+    Quantiles are interpolated within a bin and are accurate to ``1 / bins``.
+    """
+
+    def __init__(self, bins: int = 100, counts: np.ndarray | None = None):
+        """
+        :param bins: Number of equal-width bins over [0, 1].
+        :param counts: Existing counts of shape (len(METRICS_LIST), bins), e.g. from from_dict.
+        """
+        self.bins = bins
+        self.counts = np.zeros((len(METRICS_LIST), bins), dtype=np.int64) if counts is None else counts
+
+    def add(self, values: Sequence[float]) -> None:
+        """
+        Add one file.
+
+        :param values: One value per metric, in METRICS_LIST order; NaN values are skipped.
+        :return: None.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        bin_index = np.clip((values[present] * self.bins).astype(np.int64), 0, self.bins - 1)
+        self.counts[np.flatnonzero(present), bin_index] += 1
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        """
+        Add one file result.
+
+        :param result: File metrics dictionary; missing metrics are skipped.
+        :return: None.
+        """
+        self.add([result.get(metric, np.nan) for metric in METRICS_LIST])
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Add another sketch's counts into this one.
+
+        :param other: Sketch with the same number of bins.
+        :return: This sketch.
+        :raises ValueError: If the bin counts differ.
+        """
+        if other.bins != self.bins:
+            raise ValueError(f"Cannot merge sketches with {self.bins} and {other.bins} bins.")
+        self.counts += other.counts
+        return self
+
+    @property
+    def count(self) -> int:
+        """
+        :return: Number of files added (counting the metric with the most values).
+        """
+        return int(self.counts.sum(axis=1).max())
+
+    def quantile(self, q: float) -> np.ndarray:
+        """
+        :param q: Quantile in [0, 1].
+        :return: Estimated quantile of every metric, in METRICS_LIST order; NaN for metrics
+            without values.
+        """
+        cumulative = np.cumsum(self.counts, axis=1)
+        totals = cumulative[:, -1]
+        rank = np.maximum(q * totals, 1e-9)
+        result = np.full(len(METRICS_LIST), np.nan)
+        for j in np.flatnonzero(totals):
+            b = int(np.searchsorted(cumulative[j], rank[j]))
+            below = cumulative[j, b - 1] if b > 0 else 0
+            result[j] = (b + (rank[j] - below) / self.counts[j, b]) / self.bins
+        return result
+
+    def quantiles(self, qs: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+        """
+        :param qs: Quantiles to estimate.
+        :return: Columns named ``<metric>_p<percent>``, e.g. overall_score_p10.
+        """
+        columns: Dict[str, float] = {}
+        for q in qs:
+            for metric, value in zip(METRICS_LIST, self.quantile(q)):
+                columns[f"{metric}_p{round(q * 100)}"] = float(value)
+        return columns
+
+    def histogram(self, metric: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param metric: One of METRICS_LIST.
+        :return: Bin edges of shape (bins + 1,) and counts of shape (bins,).
+        """
+        return np.linspace(0.0, 1.0, self.bins + 1), self.counts[METRICS_LIST.index(metric)].copy()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: JSON-serializable form of the sketch, see from_dict.
+        """
+        return {"bins": self.bins, "metrics": METRICS_LIST, "counts": self.counts.tolist()}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "QuantileSketch":
+        """
+        :param data: Output of to_dict.
+        :return: The sketch.
+        :raises ValueError: If the sketch was built over different metrics.
+        """
+        if data["metrics"] != METRICS_LIST:
+            raise ValueError(f"Sketch metrics {data['metrics']} do not match {METRICS_LIST}.")
+        return QuantileSketch(data["bins"], np.array(data["counts"], dtype=np.int64))
+
+
+class QuantileCollector:
+    """
+    Streams file results into one sketch per directory that directly contains files; sketches
+    of parent directories and of the project are merged from those at the end, so memory grows
+    with the number of directories, not files.
+    """
+
+    def __init__(self, bins: int = 100):
+        """
+        :param bins: Bins per sketch, see QuantileSketch.
+        """
+        self.bins = bins
+        self.leaves: Dict[str, QuantileSketch] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """
+        Add one file result, e.g. as a FileLoader.load_dataset result callback.
+
+        :param result: File metrics with its (untrimmed) identifier.
+        :return: None.
+        """
+        directory = result["identifier"].replace("\\", "/").rpartition("/")[0]
+        sketch = self.leaves.get(directory)
+        if sketch is None:
+            sketch = self.leaves[directory] = QuantileSketch(self.bins)
+        sketch.add_result(result)
+
+    def merge(self, other: "QuantileCollector") -> "QuantileCollector":
+        """
+        Merge the sketches of another collector, e.g. from a shard or parallel worker.
+
+        :param other: Collector with the same number of bins.
+        :return: This collector.
+        """
+        for directory, sketch in other.leaves.items():
+            if directory in self.leaves:
+                self.leaves[directory].merge(sketch)
+            else:
+                self.leaves[directory] = QuantileSketch(sketch.bins, sketch.counts.copy())
+        return self
+
+    def project_sketch(self) -> QuantileSketch:
+        """
+        :return: Sketch of all files.
+        """
+        total = QuantileSketch(self.bins)
+        for sketch in self.leaves.values():
+            total.merge(sketch)
+        return total
+
+    def directory_sketches(self, prefix: str) -> Dict[str, QuantileSketch]:
+        """
+        :param prefix: Common path prefix removed from identifiers (ending in '/'), see
+            FileLoader.trim_common_path_in_identifiers.
+        :return: Sketch of every directory below the prefix, keyed by its prefix-relative path
+            (as in ScoreAggregator.aggregate_directories).
+        """
+        prefix = prefix.replace("\\", "/")
+        sketches: Dict[str, QuantileSketch] = {}
+        for directory, sketch in self.leaves.items():
+            if not (directory + "/").startswith(prefix):
+                continue
+            relative = (directory + "/")[len(prefix):].strip("/")
+            if not relative:  # files directly in the root only count towards the project
+                continue
+            parts = relative.split("/")
+            for depth in range(1, len(parts) + 1):
+                key = "/".join(parts[:depth])
+                if key in sketches:
+                    sketches[key].merge(sketch)
+                else:
+                    sketches[key] = QuantileSketch(self.bins, sketch.counts.copy())
+        return sketches
+
+    def annotate(self, directory_results: List[Dict[str, Any]], project_results: Dict[str, Any], prefix: str,
+                 qs: Iterable[float] = DEFAULT_QUANTILES) -> None:
+        """
+        Add ``<metric>_p<percent>`` columns to directory and project rows in place.
+
+        :param directory_results: Rows from ScoreAggregator.aggregate_directories.
+        :param project_results: Project row.
+        :param prefix: Common path prefix of the directory identifiers, see directory_sketches.
+        :param qs: Quantiles to add.
+        :return: None.
+        """
+        qs = tuple(qs)
+        sketches = self.directory_sketches(prefix)
+        for row in directory_results:
+            sketch = sketches.get(row["identifier"])
+            if sketch is not None:
+                row.update(sketch.quantiles(qs))
+        project_results.update(self.project_sketch().quantiles(qs))
+
+    def metric_quantiles(self, metric: str, prefix: str,
+                         qs: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str | None, Dict[str, float]]:
+        """
+        :param metric: One of METRICS_LIST.
+        :param prefix: Common path prefix of the directory identifiers, see directory_sketches.
+        :param qs: Quantiles to estimate.
+        :return: ``<metric>_p<percent>`` columns of every directory, and of the project under None.
+        """
+        qs = tuple(qs)
+        sketches: Dict[str | None, QuantileSketch] = {**self.directory_sketches(prefix), None: self.project_sketch()}
+        return {key: {column: value for column, value in sketch.quantiles(qs).items()
+                      if column.startswith(metric + "_p")}
+                for key, sketch in sketches.items()}
@@ -0,0 +1,152 @@
+import math
+import os
+from typing import Dict
+
+from documetrics.globals import debug
+
+
+# =============================================================================
+# CPU Resource Management
+# =============================================================================
+class ResourceManager:
+    # Environment variables that override auto-detection.
+    CORES_ENV = "DOCUMETRICS_CORES"
+    JOBS_ENV = "DOCUMETRICS_JOBS"
+
+    # Active plan, populated by configure().
+    _settings: Dict[str, int] | None = None
+
+    @staticmethod
+    def detect_cpu_quota() -> float | None:
+        """
+        Read the CPU quota imposed on this process by cgroups (v2 first, then v1).
+
+        :return: Number of CPUs allowed by the quota (may be fractional), or None if unlimited or unknown.
+        """
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        try:
+            with open("/sys/fs/cgroup/cpu.max", "r") as f:
+                quota, period = f.read().split()[:2]
+            if quota != "max" and int(period) > 0:
+                return int(quota) / int(period)
+            return None
+        except (OSError, ValueError):
+            pass
+
+        # cgroup v1: separate quota and period files, quota of -1 means unlimited
+        for base in ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct"):
+            try:
+                with open(os.path.join(base, "cpu.cfs_quota_us"), "r") as f:
+                    quota = int(f.read().strip())
+                with open(os.path.join(base, "cpu.cfs_period_us"), "r") as f:
+                    period = int(f.read().strip())
+                if quota > 0 and period > 0:
+                    return quota / period
+                return None
+            except (OSError, ValueError):
+                continue
+        return None
+
+    @staticmethod
+    def detect_core_budget() -> int:
+        """
+        Determine how many cores the analyzer may use.
+
+        The budget is the ``DOCUMETRICS_CORES`` environment variable if set, otherwise the
+        smaller of the CPU affinity mask and the (rounded up) cgroup CPU quota.
+
+        :return: Core budget, at least 1.
+        """
+        override = os.environ.get(ResourceManager.CORES_ENV)
+        if override:
+            try:
+                return max(1, int(override))
+            except ValueError:
+                print(f"Ignoring invalid {ResourceManager.CORES_ENV}={override!r}")
+
+        try:
+            available = len(os.sched_getaffinity(0))
+        except (AttributeError, OSError):
+            available = os.cpu_count() or 1
+
+        quota = ResourceManager.detect_cpu_quota()
+        if quota is not None:
+            available = min(available, math.ceil(quota))
+        return max(1, available)
+
+    @staticmethod
+    def plan(cores: int, jobs: int = 1) -> Dict[str, int]:
+        """
+        Split a core budget between concurrent jobs and the torch thread pools.
+
+        Each job gets an equal share of intra-op threads so that ``jobs`` concurrent
+        inferences together use roughly ``cores`` threads. Inter-op parallelism is kept at 1
+        since the models are evaluated one operator graph at a time.
+
+        :param cores: Total core budget.
+        :param jobs: Number of analyses (or worker processes) expected to run concurrently.
+        :return: Dictionary with cores, pool_size, intra_op_threads and inter_op_threads.
+        """
+        cores = max(1, cores)
+        jobs = max(1, min(jobs, cores))
+        return {
+            "cores": cores,
+            "pool_size": jobs,
+            "intra_op_threads": max(1, cores // jobs),
+            "inter_op_threads": 1,
+        }
+
+    @staticmethod
+    def configure(cores: int | None = None, jobs: int | None = None) -> Dict[str, int]:
+        """
+        Apply a core budget to torch, the HuggingFace tokenizers and any child processes.
+
+        Must be called before the models are loaded to take full effect; the inter-op thread
+        count can only be set once per process, later attempts are ignored.
+
+        :param cores: Core budget. Auto-detected from affinity and cgroup quota if None.
+        :param jobs: Concurrent jobs sharing the budget. Read from ``DOCUMETRICS_JOBS`` if None.
+        :return: The applied plan (see plan()).
+        """
+        if cores is None:
+            cores = ResourceManager.detect_core_budget()
+        if jobs is None:
+            try:
+                jobs = int(os.environ.get(ResourceManager.JOBS_ENV, "1"))
+            except ValueError:
+                jobs = 1
+        settings = ResourceManager.plan(cores, jobs)
+
+        # Child processes and native libraries read these at start-up
+        threads = str(settings["intra_op_threads"])
+        os.environ["OMP_NUM_THREADS"] = threads
+        os.environ["MKL_NUM_THREADS"] = threads
+        os.environ["RAYON_NUM_THREADS"] = threads
+        # Tokenizer threads would compete with torch (and deadlock after fork) when sharing cores
+        os.environ["TOKENIZERS_PARALLELISM"] = "true" if settings["pool_size"] == 1 else "false"
+
+        # noinspection PyBroadException
+        try:
+            import torch
+            torch.set_num_threads(settings["intra_op_threads"])
+            try:
+                torch.set_num_interop_threads(settings["inter_op_threads"])
+            except RuntimeError:
+                pass  # inter-op pool already started, can only be set once
+        except ImportError:
+            pass
+
+        ResourceManager._settings = settings
+        if debug: print(f"Resource plan: {settings}")
+        return settings
+
+    @staticmethod
+    def settings() -> Dict[str, int]:
+        """
+        Return the active resource plan, configuring from the environment on first use.
+
+        :return: Dictionary with cores, pool_size, intra_op_threads and inter_op_threads.
+        """
+        if ResourceManager._settings is None:
+            return ResourceManager.configure()
+        return ResourceManager._settings
@@ -0,0 +1,205 @@
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List
+
+from documetrics.globals import debug, METRICS_LIST
+
+
+# =============================================================================
+# Run History
+# =============================================================================
+class ResultsDatabase:
+    """
+    Optional SQLite store keeping the file results of every run, for trend and regression queries.
+
+    Schema::
+
+        runs(run_id, root, created_at, partial, line_count, num_files, doc_type, <project metrics>)
+        paths(path_id, path)                  -- file paths relative to the run root, '/'-separated
+        file_results(path_id, run_id, line_count, doc_type, <metrics>)
+
+    ``file_results`` is clustered on (path_id, run_id), so the history of a path or a directory
+    (a range of paths) is read with index seeks only; a second index on (run_id, path_id)
+    serves whole-run queries.
+    """
+    DB_ENV = "DOCUMETRICS_RESULTS_DB"
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) a results database.
+
+        :param db_path: Path of the SQLite file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # readers are not blocked by a run being recorded
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        metric_columns = ", ".join(f"{metric} REAL" for metric in METRICS_LIST)
+        with self._conn:
+            self._conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    root TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    partial INTEGER NOT NULL DEFAULT 0,
+                    line_count INTEGER,
+                    num_files INTEGER,
+                    doc_type TEXT,
+                    {metric_columns}
+                );
+                CREATE INDEX IF NOT EXISTS idx_runs_root_created ON runs (root, created_at);
+                CREATE TABLE IF NOT EXISTS paths (
+                    path_id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS file_results (
+                    path_id INTEGER NOT NULL REFERENCES paths (path_id),
+                    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+                    line_count INTEGER,
+                    doc_type TEXT,
+                    {metric_columns},
+                    PRIMARY KEY (path_id, run_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_file_results_run ON file_results (run_id, path_id);
+            """)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+
+        :return: None.
+        """
+        self._conn.close()
+
+    @staticmethod
+    def _check_metric(metric: str) -> None:
+        """
+        :raises ValueError: If the metric is not one of METRICS_LIST.
+        """
+        if metric not in METRICS_LIST:
+            raise ValueError(f"Unknown metric {metric!r}; expected one of {METRICS_LIST}.")
+
+    @staticmethod
+    def relative_path(identifier: str, root: str) -> str:
+        """
+        :param identifier: Absolute or root-relative file path.
+        :param root: Analyzed file or directory.
+        :return: Path relative to the root directory, with '/' separators.
+        """
+        base = os.path.dirname(root) if os.path.isfile(root) else root
+        return os.path.relpath(os.path.abspath(identifier), os.path.abspath(base)).replace("\\", "/")
+
+    def record_run(self, run_id: str, root: str, file_results: List[Dict[str, Any]],
+                   project_results: Dict[str, Any], created_at: float | None = None) -> None:
+        """
+        Store one run. All rows are inserted in a single transaction.
+
+        :param run_id: Unique run id, e.g. from RunStore.new_run_id.
+        :param root: Analyzed file or directory.
+        :param file_results: File results with untrimmed identifiers.
+        :param project_results: Aggregated project metrics.
+        :param created_at: Run timestamp (seconds since the epoch); defaults to now.
+        :return: None.
+        """
+        root = os.path.abspath(root)
+        created_at = time.time() if created_at is None else created_at
+        metric_columns = ", ".join(METRICS_LIST)
+        metric_params = ", ".join("?" for _ in METRICS_LIST)
+        rows = [
+            (self.relative_path(res["identifier"], root), res.get("line_count"), res.get("doc_type"),
+             *(res.get(metric) for metric in METRICS_LIST))
+            for res in file_results
+        ]
+        with self._conn:
+            self._conn.execute(
+                f"INSERT INTO runs (run_id, root, created_at, partial, line_count, num_files, doc_type, {metric_columns}) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, {metric_params})",
+                (run_id, root, created_at, int(bool(project_results.get("partial"))),
+                 project_results.get("line_count"), project_results.get("num_files"), project_results.get("doc_type"),
+                 *(project_results.get(metric) for metric in METRICS_LIST)))
+            self._conn.executemany("INSERT OR IGNORE INTO paths (path) VALUES (?)", ((row[0],) for row in rows))
+            self._conn.executemany(
+                f"INSERT INTO file_results (path_id, run_id, line_count, doc_type, {metric_columns}) "
+                f"VALUES ((SELECT path_id FROM paths WHERE path = ?), ?, ?, ?, {metric_params})",
+                ((row[0], run_id, *row[1:]) for row in rows))
+        if debug: print(f"Recorded run {run_id} with {len(rows)} files in {self.db_path}")
+
+    def previous_run(self, run_id: str) -> str | None:
+        """
+        :param run_id: A recorded run.
+        :return: The last complete run of the same root recorded before it, or None.
+        """
+        row = self._conn.execute(
+            "SELECT prev.run_id FROM runs cur JOIN runs prev ON prev.root = cur.root AND prev.created_at < cur.created_at "
+            "WHERE cur.run_id = ? AND prev.partial = 0 ORDER BY prev.created_at DESC LIMIT 1", (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def latest_run(self, root: str) -> str | None:
+        """
+        :param root: Analyzed file or directory.
+        :return: The most recent complete run of that root, or None.
+        """
+        row = self._conn.execute("SELECT run_id FROM runs WHERE root = ? AND partial = 0 "
+                                 "ORDER BY created_at DESC LIMIT 1",
+                                 (os.path.abspath(root),)).fetchone()
+        return row[0] if row else None
+
+    def directory_trend(self, root: str, directory: str = "", metric: str = "overall_score",
+                        days: float = 90) -> List[Dict[str, Any]]:
+        """
+        Line-weighted score of a directory in every complete run of the last ``days`` days.
+
+        :param root: Analyzed root the runs were recorded with.
+        :param directory: Directory relative to the root ('' for the whole root).
+        :param metric: Metric to follow, one of METRICS_LIST.
+        :param days: Length of the window, counted back from now.
+        :return: One dictionary per run (run_id, created_at, score, num_files, line_count), oldest first.
+        :raises ValueError: If the metric is unknown.
+        """
+        self._check_metric(metric)
+        prefix = directory.replace("\\", "/").strip("/")
+        prefix = prefix + "/" if prefix else ""
+        cursor = self._conn.execute(
+            f"SELECT r.run_id, r.created_at, SUM(f.{metric} * f.line_count) / SUM(f.line_count), "
+            f"COUNT(*), SUM(f.line_count) "
+            f"FROM runs r JOIN file_results f ON f.run_id = r.run_id "
+            f"WHERE r.root = ? AND r.created_at >= ? AND r.partial = 0 "
+            f"AND f.path_id IN (SELECT path_id FROM paths WHERE path >= ? AND path < ?) "
+            f"GROUP BY r.run_id ORDER BY r.created_at",
+            (os.path.abspath(root), time.time() - days * 86400, prefix, prefix + "\U0010ffff"))
+        return [{"run_id": run_id, "created_at": created_at, "score": score, "num_files": num_files,
+                 "line_count": line_count}
+                for run_id, created_at, score, num_files, line_count in cursor]
+
+    def regressions(self, run_id: str, metric: str = "overall_score", min_drop: float = 0.0,
+                    baseline_run_id: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Files whose score dropped between a baseline run and ``run_id``.
+
+        :param run_id: The newer run.
+        :param metric: Metric to compare, one of METRICS_LIST.
+        :param min_drop: Only report drops larger than this.
+        :param baseline_run_id: The older run; defaults to the previous run of the same root.
+        :return: Dictionaries with path, previous, current and delta, largest drop first.
+        :raises ValueError: If the metric is unknown.
+        """
+        self._check_metric(metric)
+        baseline_run_id = baseline_run_id or self.previous_run(run_id)
+        if baseline_run_id is None:
+            return []
+        cursor = self._conn.execute(
+            f"SELECT p.path, prev.{metric}, cur.{metric} "
+            f"FROM file_results cur "
+            f"JOIN file_results prev ON prev.path_id = cur.path_id AND prev.run_id = ? "
+            f"JOIN paths p ON p.path_id = cur.path_id "
+            f"WHERE cur.run_id = ? AND cur.{metric} < prev.{metric} - ? "
+            f"ORDER BY cur.{metric} - prev.{metric}",
+            (baseline_run_id, run_id, min_drop))
+        return [{"path": path, "previous": previous, "current": current, "delta": current - previous}
+                for path, previous, current in cursor]
@@ -0,0 +1,184 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+from documetrics.globals import debug
+
+
+# =============================================================================
+# Per-Run Output Directories
+# =============================================================================
+class RunStore:
+    """
+    Keeps the results of every analysis in its own directory below an output root::
+
+        <root>/runs/<run_id>/all_metrics_combined.csv   (or .arrow, .parquet, .jsonl)
+        <root>/LATEST                                   (id of the last completed run)
+
+    A run is written into a hidden staging directory and renamed into ``runs/`` once complete,
+    so readers never see half-written results and concurrent runs never share files. The
+    ``LATEST`` pointer is replaced atomically after the rename.
+    """
+    ROOT_ENV = "DOCUMETRICS_OUTPUT_ROOT"
+    RESULTS_FILE = "all_metrics_combined.csv"
+    # Extensions of the result formats (see OUTPUT_FORMATS), in lookup order
+    RESULTS_EXTENSIONS = (".csv", ".arrow", ".parquet", ".jsonl")
+    LATEST_FILE = "LATEST"
+    RUNS_DIR = "runs"
+    _STAGING_PREFIX = ".staging-"
+
+    @staticmethod
+    def _writable(directory: str) -> bool:
+        """
+        :param directory: Directory that may not exist yet.
+        :return: True if the directory exists or can be created, and is writable.
+        """
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            return False
+        return os.access(directory, os.W_OK)
+
+    @staticmethod
+    def _user_cache_dir() -> str:
+        """
+        :return: Per-user cache directory for DocuMetrics outputs.
+        """
+        if sys.platform == "win32":
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+        elif sys.platform == "darwin":
+            base = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+        return os.path.join(base, "documetrics")
+
+    @staticmethod
+    def output_root() -> str:
+        """
+        Resolve the output root: ``$DOCUMETRICS_OUTPUT_ROOT`` if set, otherwise the ``outputs``
+        directory of the package, or the user cache directory if the package is read-only.
+
+        :return: Absolute path of the output root.
+        """
+        root = os.environ.get(RunStore.ROOT_ENV)
+        if root:
+            return os.path.abspath(root)
+        package_outputs = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
+        if RunStore._writable(package_outputs):
+            return package_outputs
+        return RunStore._user_cache_dir()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """
+        :return: Unique run id that sorts by start time, e.g. ``20240131-142501-1a2b3c4d``.
+        """
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def results_file(extension: str = ".csv") -> str:
+        """
+        :param extension: Extension of the result format.
+        :return: File name of the results inside a run directory.
+        """
+        return os.path.splitext(RunStore.RESULTS_FILE)[0] + extension
+
+    @staticmethod
+    def results_in(run_dir: str) -> str | None:
+        """
+        :param run_dir: Directory of a completed run.
+        :return: The run's results file, in whichever format it was exported, or None if it has none.
+        """
+        for extension in RunStore.RESULTS_EXTENSIONS:
+            path = os.path.join(run_dir, RunStore.results_file(extension))
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def run_dir(run_id: str, root: str | None = None) -> str:
+        """
+        :param run_id: Run id.
+        :param root: Output root, see output_root.
+        :return: Directory of the completed run.
+        """
+        return os.path.join(root or RunStore.output_root(), RunStore.RUNS_DIR, run_id)
+
+    @staticmethod
+    def begin_run(run_id: str | None = None, root: str | None = None) -> str:
+        """
+        Create the staging directory of a new run.
+
+        :param run_id: Run id, generated if None.
+        :param root: Output root, see output_root.
+        :return: Staging directory; pass it to commit_run or abort_run when done.
+        :raises FileExistsError: If a run with this id is already staged or completed.
+        """
+        root = root or RunStore.output_root()
+        run_id = run_id or RunStore.new_run_id()
+        runs = os.path.join(root, RunStore.RUNS_DIR)
+        os.makedirs(runs, exist_ok=True)
+        if os.path.exists(os.path.join(runs, run_id)):
+            raise FileExistsError(f"Run already exists: {run_id}")
+        staging = os.path.join(runs, RunStore._STAGING_PREFIX + run_id)
+        os.mkdir(staging)
+        return staging
+
+    @staticmethod
+    def commit_run(staging_dir: str) -> str:
+        """
+        Publish a staged run by renaming it into place, then point ``LATEST`` at it.
+
+        :param staging_dir: Directory returned by begin_run.
+        :return: Directory of the completed run.
+        """
+        runs = os.path.dirname(staging_dir)
+        run_id = os.path.basename(staging_dir)[len(RunStore._STAGING_PREFIX):]
+        final_dir = os.path.join(runs, run_id)
+        os.rename(staging_dir, final_dir)
+
+        root = os.path.dirname(runs)
+        fd, tmp_pointer = tempfile.mkstemp(prefix=".latest-", dir=root)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(run_id)
+        os.replace(tmp_pointer, os.path.join(root, RunStore.LATEST_FILE))
+        if debug: print(f"Run {run_id} written to {final_dir}")
+        return final_dir
+
+    @staticmethod
+    def abort_run(staging_dir: str) -> None:
+        """
+        Discard a staged run.
+
+        :param staging_dir: Directory returned by begin_run.
+        :return: None.
+        """
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    @staticmethod
+    def latest_run(root: str | None = None) -> str | None:
+        """
+        :param root: Output root, see output_root.
+        :return: Directory of the last completed run, or None if there is none.
+        """
+        root = root or RunStore.output_root()
+        try:
+            with open(os.path.join(root, RunStore.LATEST_FILE), encoding="utf-8") as f:
+                run_id = f.read().strip()
+        except OSError:
+            return None
+        run_dir = RunStore.run_dir(run_id, root)
+        return run_dir if run_id and os.path.isdir(run_dir) else None
+
+    @staticmethod
+    def latest_results(root: str | None = None) -> str | None:
+        """
+        :param root: Output root, see output_root.
+        :return: Results file of the last completed run (any of RESULTS_EXTENSIONS), or None if
+            there is none.
+        """
+        run_dir = RunStore.latest_run(root)
+        return RunStore.results_in(run_dir) if run_dir else None
@@ -1,13 +1,14 @@
-from typing import List, Dict, Any
+import math
+from typing import List, Dict, Any, Mapping, Tuple
 import numpy as np
-from documetrics.globals import METRICS_LIST
+from documetrics.globals import METRICS_LIST, COMPONENT_METRICS
 
 
 # =============================================================================
 # Aggregate Scoring
 # =============================================================================
 class ScoreAggregator:
-    # Global adjustable weights; must sum to 1.
+    # Global adjustable weights; must sum to 1. Change them through set_weights, which validates them.
     WEIGHTS: Dict[str, float] = {
         "comment_density": 0.3,
         "completeness": 0.4,
@@ -15,22 +16,124 @@ class ScoreAggregator:
         "accuracy": 0.1
     }
 
+    @staticmethod
+    def validate_weights(weights: Mapping[str, float]) -> Dict[str, float]:
+        """
+        Check a weight vector over the component metrics.
+
+        :param weights: Weight per component metric (see COMPONENT_METRICS).
+        :return: The weights as floats, in COMPONENT_METRICS order.
+        :raises ValueError: If a component is missing or unknown, a weight is negative or not
+            finite, or the weights do not sum to 1.
+        """
+        if set(weights) != set(COMPONENT_METRICS):
+            raise ValueError(f"Weights must be given for exactly {COMPONENT_METRICS}, got {sorted(weights)}.")
+        validated = {}
+        for key in COMPONENT_METRICS:
+            try:
+                value = float(weights[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"Weight of {key} is not a number: {weights[key]!r}.")
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"Weight of {key} must be a finite non-negative number, got {value}.")
+            validated[key] = value
+        if not np.isclose(sum(validated.values()), 1.0):
+            raise ValueError(f"Weights must sum to 1, got {sum(validated.values()):.6f}.")
+        return validated
+
+    @staticmethod
+    def parse_weights(text: str) -> Dict[str, float]:
+        """
+        Parse a weight vector written as ``name=value`` pairs, e.g.
+        ``comment_density=0.25,completeness=0.25,conciseness=0.25,accuracy=0.25``.
+
+        :param text: Comma-separated pairs.
+        :return: Validated weights, see validate_weights.
+        :raises ValueError: If the text is malformed or the weights are invalid.
+        """
+        weights: Dict[str, Any] = {}
+        for pair in filter(None, (part.strip() for part in text.split(","))):
+            key, sep, value = pair.partition("=")
+            if not sep:
+                raise ValueError(f"Expected name=value, got {pair!r}.")
+            weights[key.strip()] = value.strip()
+        return ScoreAggregator.validate_weights(weights)
+
+    @staticmethod
+    def set_weights(weights: Mapping[str, float]) -> None:
+        """
+        Replace the global weights used for new analyses.
+
+        :param weights: Weight per component metric, see validate_weights.
+        :return: None.
+        :raises ValueError: If the weights are invalid.
+        """
+        ScoreAggregator.WEIGHTS = ScoreAggregator.validate_weights(weights)
+
     @staticmethod
     def compute_file_score(metrics: Dict[str, float]) -> float:
         """
         Compute a weighted overall score for a single file based on individual metrics.
+        The weights are validated once, by set_weights, rather than on every call.
 
         :param metrics: Dictionary with keys corresponding to metric names (each normalized between 0 and 1).
         :return: Weighted overall score.
-        :raises AssertionError: If the weights do not sum to 1.
         """
-        assert np.isclose(sum(ScoreAggregator.WEIGHTS.values()), 1.0), "Weights must sum to 1"
         score = 0.0
         for key, weight in ScoreAggregator.WEIGHTS.items():
             if key in metrics:
                 score += metrics[key] * weight
         return score
 
+    @staticmethod
+    def pack_metrics(file_results: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pack per-file line counts and metrics into arrays for vectorized aggregation.
+
+        :param file_results: List of dictionaries with file metrics and a 'line_count'.
+        :return: Line counts of shape (files,) and metric values of shape (files, len(METRICS_LIST)),
+            with missing values as 0.
+        """
+        n = len(file_results)
+        lines = np.fromiter((res.get("line_count", 0) for res in file_results), dtype=np.float64, count=n)
+        values = np.empty((n, len(METRICS_LIST)))
+        for j, key in enumerate(METRICS_LIST):
+            values[:, j] = np.fromiter((res.get(key, 0) for res in file_results), dtype=np.float64, count=n)
+        return lines, values
+
+    @staticmethod
+    def reweight_scores(components: np.ndarray, weights: Mapping[str, float]) -> np.ndarray:
+        """
+        Recompute overall scores from stored component metrics in one matrix-vector product.
+
+        The overall score is linear in the components, and directory and project rows hold
+        line-weighted means of the components, so the same product re-scores file, directory
+        and project rows alike.
+
+        :param components: Component metric values of shape (rows, len(COMPONENT_METRICS)),
+            columns in COMPONENT_METRICS order.
+        :param weights: New weight per component metric, see validate_weights.
+        :return: Overall scores of shape (rows,).
+        :raises ValueError: If the weights are invalid.
+        """
+        validated = ScoreAggregator.validate_weights(weights)
+        return components @ np.array([validated[key] for key in COMPONENT_METRICS])
+
+    @staticmethod
+    def reweight(results: List[Dict[str, Any]], weights: Mapping[str, float]) -> None:
+        """
+        Replace ``overall_score`` of file, directory or project result rows in place.
+
+        :param results: Result rows holding the component metrics.
+        :param weights: New weight per component metric, see validate_weights.
+        :return: None.
+        :raises ValueError: If the weights are invalid.
+        """
+        components = np.array([[res.get(key, 0) for key in COMPONENT_METRICS] for res in results],
+                              dtype=np.float64).reshape(len(results), len(COMPONENT_METRICS))
+        for res, score in zip(results, ScoreAggregator.reweight_scores(components, weights)):
+            res["overall_score"] = float(score)
+
     @staticmethod
     def aggregate_project_score(file_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -40,6 +143,7 @@ class ScoreAggregator:
         :return: Aggregated metrics dictionary.
         :raises ValueError: If the total line count is zero.
         """
+        lines, values = ScoreAggregator.pack_metrics(file_results)
         total_lines = sum(res.get("line_count", 0) for res in file_results)
         if total_lines == 0:
             raise ValueError("No lines found in the project.")
@@ -63,14 +167,185 @@ class ScoreAggregator:
             "identifier": "Project Results"
         }
 
-        for res in file_results:
-            for key in METRICS_LIST:
-                aggregated_metrics[key] += res.get(key, 0) * res.get("line_count", 0)
+        weighted = lines @ values / total_lines
+        for key, value in zip(METRICS_LIST, weighted):
+            aggregated_metrics[key] = float(value)
+            assert 0.0 <= aggregated_metrics[key] <= 1.0, f"Metric {key} out of bounds: {aggregated_metrics[key]}"
 
-        for key in aggregated_metrics:
-            if key not in ["identifier", "line_count", "doc_type", "num_files"]:
-                aggregated_metrics[key] /= total_lines
-                assert 0.0 <= aggregated_metrics[key] <= 1.0, f"Metric {key} out of bounds: {aggregated_metrics[key]}"
+        return aggregated_metrics
 
+    @staticmethod
+    def aggregate_directories(file_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Line-weighted rollups for every directory, at every level, below the files' common root.
 
-        return aggregated_metrics
+        :param file_results: File metrics with identifiers relative to the common root
+            (see FileLoader.trim_common_path_in_identifiers).
+        :return: One dictionary per directory (metrics, line_count, doc_type, num_files,
+            identifier, is_package), sorted by path. Files directly in the root have no row of
+            their own beyond the project row.
+        """
+        if not file_results:
+            return []
+        index = DirectoryIndex([res["identifier"] for res in file_results],
+                               [res.get("doc_type") for res in file_results])
+        lines, values = ScoreAggregator.pack_metrics(file_results)
+        return index.rows(*index.rollup(lines, values))
+
+
+# The default weights are checked once, at import
+ScoreAggregator.validate_weights(ScoreAggregator.WEIGHTS)
+
+
+# =============================================================================
+# Directory Rollups
+# =============================================================================
+class DirectoryIndex:
+    """
+    Maps files to integer codes of every directory containing them, so directory rollups of
+    any per-file column are computed with bincounts instead of Python loops.
+
+    Building the index touches each path string once; each rollup afterwards is two vectorized
+    passes: files are summed into their own directory, and directory sums are added into every
+    ancestor over (directory, ancestor) code pairs.
+    """
+
+    def __init__(self, identifiers: List[str], doc_types: List[str | None]):
+        """
+        :param identifiers: File paths relative to the common root, '/' or '\\' separated.
+        :param doc_types: Doc type ("Human"/"LLM") of each file.
+        """
+        n = len(identifiers)
+        leaf_codes: Dict[str, int] = {}
+        self.file_leaf = np.empty(n, dtype=np.int64)
+        is_llm = np.zeros(n)
+        is_init = np.zeros(n)
+        for i, identifier in enumerate(identifiers):
+            directory, _, name = identifier.replace("\\", "/").rpartition("/")
+            self.file_leaf[i] = leaf_codes.setdefault(directory, len(leaf_codes))
+            is_llm[i] = doc_types[i] == "LLM"
+            is_init[i] = name == "__init__.py"
+
+        dir_codes: Dict[str, int] = {}
+        pair_leaf, pair_dir = [], []
+        for directory, leaf in leaf_codes.items():
+            parts = directory.split("/") if directory else []
+            for depth in range(1, len(parts) + 1):
+                pair_leaf.append(leaf)
+                pair_dir.append(dir_codes.setdefault("/".join(parts[:depth]), len(dir_codes)))
+        self.n_leaf = len(leaf_codes)
+        self.directories = list(dir_codes)
+        self.pair_leaf = np.array(pair_leaf, dtype=np.int64)
+        self.pair_dir = np.array(pair_dir, dtype=np.int64)
+
+        self.num_files = self._propagate(np.bincount(self.file_leaf, minlength=self.n_leaf)[:, None])[:, 0]
+        self.llm_files = self._propagate(self._to_leaves(is_llm[:, None]))[:, 0]
+        leaf_package = self._to_leaves(is_init[:, None])[:, 0] > 0
+        self.is_package = np.zeros(len(dir_codes), dtype=bool)
+        for directory, leaf in leaf_codes.items():
+            if directory:
+                self.is_package[dir_codes[directory]] = leaf_package[leaf]
+
+    def _to_leaves(self, columns: np.ndarray) -> np.ndarray:
+        """Sum per-file columns of shape (files, k) into the files' own directories."""
+        return np.column_stack([np.bincount(self.file_leaf, weights=columns[:, j], minlength=self.n_leaf)
+                                for j in range(columns.shape[1])])
+
+    def _propagate(self, leaf_columns: np.ndarray) -> np.ndarray:
+        """Sum per-directory columns of shape (leaves, k) into every ancestor directory."""
+        return np.column_stack([np.bincount(self.pair_dir, weights=leaf_columns[self.pair_leaf, j],
+                                            minlength=len(self.directories))
+                                for j in range(leaf_columns.shape[1])])
+
+    def rollup(self, lines: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param lines: Line count of each file, shape (files,).
+        :param values: Per-file metric values, shape (files, k).
+        :return: Line count of each directory, shape (directories,), and line-weighted
+            directory means, shape (directories, k); 0 for directories without lines.
+        """
+        if not self.directories:
+            return np.zeros(0), np.zeros((0, values.shape[1]))
+        sums = self._propagate(self._to_leaves(np.column_stack([lines, lines[:, None] * values])))
+        dir_lines = sums[:, 0]
+        means = np.divide(sums[:, 1:], dir_lines[:, None], out=np.zeros_like(sums[:, 1:]),
+                          where=dir_lines[:, None] > 0)
+        return dir_lines, means
+
+    def rows(self, dir_lines: np.ndarray, means: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        :param dir_lines: Directory line counts returned by rollup.
+        :param means: Directory means of the METRICS_LIST columns returned by rollup.
+        :return: Directory result rows sorted by path, see ScoreAggregator.aggregate_directories.
+        """
+        rows = []
+        for code in sorted(range(len(self.directories)), key=self.directories.__getitem__):
+            num_files, llm_files = int(self.num_files[code]), int(self.llm_files[code])
+            row: Dict[str, Any] = {key: float(means[code, j]) for j, key in enumerate(METRICS_LIST)}
+            row.update({
+                "line_count": int(dir_lines[code]),
+                "doc_type": "LLM" if llm_files == num_files else "Human" if llm_files == 0 else "Mixed",
+                "num_files": num_files,
+                "identifier": self.directories[code],
+                "is_package": bool(self.is_package[code]),
+            })
+            rows.append(row)
+        return rows
+
+
+# =============================================================================
+# Incremental Project Score
+# =============================================================================
+class IncrementalProjectScore:
+    """
+    Project aggregate kept up to date as single files are added, re-scored or removed.
+
+    The line-weighted metric sums are adjusted by each file's old and new contribution, so an
+    update costs O(metrics) rather than a pass over the project; project() matches
+    ScoreAggregator.aggregate_project_score over the current files up to rounding.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._lines = 0.0
+        self._sums = np.zeros(len(METRICS_LIST))
+        self._llm_files = 0
+
+    def _apply(self, metrics: Dict[str, Any], sign: int) -> None:
+        lines, values = ScoreAggregator.pack_metrics([metrics])
+        self._lines += sign * lines[0]
+        self._sums += sign * lines[0] * values[0]
+        self._llm_files += sign * (metrics.get("doc_type") == "LLM")
+
+    def update(self, identifier: str, metrics: Dict[str, Any] | None) -> None:
+        """
+        :param identifier: File identifier.
+        :param metrics: New metrics of the file, or None to remove it (deleted, or too few docstrings).
+        :return: None.
+        """
+        previous = self.files.pop(identifier, None)
+        if previous is not None:
+            self._apply(previous, -1)
+        if metrics is not None:
+            self.files[identifier] = metrics
+            self._apply(metrics, 1)
+        if not self.files:  # start over exactly rather than keep rounding residue
+            self._lines, self._sums, self._llm_files = 0.0, np.zeros(len(METRICS_LIST)), 0
+
+    def project(self) -> Dict[str, Any] | None:
+        """
+        :return: Aggregated project metrics, see ScoreAggregator.aggregate_project_score, or
+            None while no file has lines.
+        """
+        if self._lines <= 0:
+            return None
+        num_files = len(self.files)
+        aggregated: Dict[str, Any] = {key: float(np.clip(value / self._lines, 0.0, 1.0))
+                                      for key, value in zip(METRICS_LIST, self._sums)}
+        aggregated.update({
+            "line_count": int(round(self._lines)),
+            "doc_type": "LLM" if self._llm_files == num_files else "Human" if self._llm_files == 0 else "Mixed",
+            "num_files": num_files,
+            "identifier": "Project Results",
+        })
+        return aggregated
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List
+
+# Set to a non-empty value other than "0" to record stage timings by default, see ProjectAnalyzer.main
+TIMING_ENV = "DOCUMETRICS_TIMING"
+
+_local = threading.local()
+_DISABLED = nullcontext()
+
+
+class _Stage:
+    """Context manager timing one stage call into a StageTimer."""
+    __slots__ = ("timer", "name", "counters", "start")
+
+    def __init__(self, timer: "StageTimer", name: str, counters: Dict[str, int]):
+        self.timer = timer
+        self.name = name
+        self.counters = counters
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.timer.record(self.name, time.perf_counter() - self.start, **self.counters)
+
+
+# =============================================================================
+# Stage Timing
+# =============================================================================
+class StageTimer:
+    """
+    Wall time and call counts per analysis stage, recorded for the file analyzed on the
+    current thread.
+
+    Instrumented code wraps each stage in ``with StageTimer.stage(name, **counters)``. Without
+    an active timer on the thread that is a thread-local lookup returning a shared no-op
+    context, so disabled instrumentation costs next to nothing. Stage names are dotted by
+    nesting (``conciseness.minilm_encode`` is part of ``conciseness``) and times are inclusive.
+    Counters such as ``items`` (batch size) and ``tokens`` are summed per stage.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def begin() -> "StageTimer":
+        """
+        Start recording on the current thread.
+
+        :return: The new active timer.
+        """
+        timer = StageTimer()
+        _local.timer = timer
+        return timer
+
+    def end(self) -> Dict[str, Dict[str, float]]:
+        """
+        Stop recording on the current thread.
+
+        :return: Recorded stages: ``{name: {"calls", "seconds", <counters>...}}``.
+        """
+        if getattr(_local, "timer", None) is self:
+            _local.timer = None
+        return self.stages
+
+    @staticmethod
+    def active() -> bool:
+        """
+        :return: True if a timer is recording on the current thread, e.g. to skip computing
+            counters that are only needed for timing.
+        """
+        return getattr(_local, "timer", None) is not None
+
+    @staticmethod
+    def stage(name: str, **counters: int):
+        """
+        :param name: Stage name.
+        :param counters: Counts to add to the stage, e.g. items=len(batch), tokens=n.
+        :return: Context manager timing the enclosed block (a no-op if no timer is active).
+        """
+        timer = getattr(_local, "timer", None)
+        if timer is None:
+            return _DISABLED
+        return _Stage(timer, name, counters)
+
+    def record(self, name: str, seconds: float, **counters: int) -> None:
+        """
+        Add one call of a stage.
+
+        :param name: Stage name.
+        :param seconds: Wall time of the call.
+        :param counters: Counts to add to the stage.
+        :return: None.
+        """
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {"calls": 0, "seconds": 0.0}
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        for key, value in counters.items():
+            entry[key] = entry.get(key, 0) + value
+
+    @staticmethod
+    def timings_file(output_file: str) -> str:
+        """
+        :param output_file: Results file of a run.
+        :return: Path of the run's timing report next to it, e.g. results.timings.json.
+        """
+        return os.path.splitext(output_file)[0] + ".timings.json"
+
+    @staticmethod
+    def write(path: str, summary: Dict[str, Any], files: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+        """
+        Write a timing report as JSON.
+
+        :param path: Destination file, see timings_file.
+        :param summary: Run summary, see summarize.
+        :param files: Stages of every file, keyed by identifier.
+        :return: None.
+        """
+        tmp_file = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "files": files}, f, indent=1)
+        os.replace(tmp_file, path)
+
+    @staticmethod
+    def summarize(file_timings: List[Dict[str, Dict[str, float]]]) -> Dict[str, Any]:
+        """
+        Aggregate per-file stage timings into a run summary.
+
+        Every stage gets its totals plus ``mean_ms`` per call and ``share`` of the total file
+        time; stages with items also get ``mean_items`` (the mean batch size) and stages with
+        tokens ``tokens_per_second``.
+
+        :param file_timings: Stages of every file, as returned by end.
+        :return: ``{"files", "seconds", "stages": {name: {...}}}``, stages ordered by time spent.
+        """
+        stages: Dict[str, Dict[str, float]] = {}
+        for timings in file_timings:
+            for name, entry in timings.items():
+                total = stages.setdefault(name, {})
+                for key, value in entry.items():
+                    total[key] = total.get(key, 0) + value
+
+        seconds = stages.get("total", {}).get("seconds", 0.0)
+        for entry in stages.values():
+            entry["mean_ms"] = entry["seconds"] / entry["calls"] * 1000
+            entry["share"] = entry["seconds"] / seconds if seconds else None
+            if "items" in entry:
+                entry["mean_items"] = entry["items"] / entry["calls"]
+            if "tokens" in entry and entry["seconds"]:
+                entry["tokens_per_second"] = entry["tokens"] / entry["seconds"]
+        ordered = dict(sorted(stages.items(), key=lambda item: -item[1]["seconds"]))
+        return {"files": len(file_timings), "seconds": seconds, "stages": ordered}
+
+    @staticmethod
+    def format_summary(summary: Dict[str, Any]) -> str:
+        """
+        :param summary: Output of summarize.
+        :return: Human-readable table of the stages.
+        """
+        lines = [f"Stage timings over {summary['files']} files ({summary['seconds']:.2f}s):",
+                 f"  {'stage':<36}{'calls':>8}{'seconds':>10}{'share':>8}{'mean ms':>10}{'items':>9}{'tokens':>10}"]
+        for name, entry in summary["stages"].items():
+            share = f"{entry['share']:.1%}" if entry["share"] is not None else "-"
+            lines.append(f"  {name:<36}{entry['calls']:>8}{entry['seconds']:>10.3f}{share:>8}"
+                         f"{entry['mean_ms']:>10.2f}{entry.get('items', ''):>9}{entry.get('tokens', ''):>10}")
+        return "\n".join(lines)
@@ -0,0 +1,236 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, List, Sequence, Set, Tuple
+
+from documetrics.FileLoader import FileLoader
+from documetrics.globals import debug
+
+# inotify event masks, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Saves land as a close after writing or as a rename onto the file; CREATE catches new directories
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+               | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal ctypes binding of the Linux inotify API, watching a directory tree."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories: Dict[int, str] = {}
+
+    def watch(self, directory: str) -> bool:
+        """
+        :param directory: Directory to watch (not recursively).
+        :return: True if the watch was added.
+        """
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            return False  # e.g. removed in the meantime, or out of watches
+        self.directories[wd] = directory
+        return True
+
+    def read(self) -> List[Tuple[str | None, int]]:
+        """
+        :return: Pending events as (path, mask); the path is None for a queue overflow.
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    events.append((None, mask))
+                    continue
+                directory = self.directories.get(wd)
+                if mask & IN_IGNORED:
+                    self.directories.pop(wd, None)
+                    continue
+                if directory is not None:
+                    events.append((os.path.join(directory, os.fsdecode(name)) if name else directory, mask))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+# =============================================================================
+# Tree Watching
+# =============================================================================
+class TreeWatcher:
+    """
+    Reports changed Python files below a root, in debounced batches.
+
+    On Linux the tree is watched with inotify (bound through ctypes, no extra dependency);
+    elsewhere, or if inotify is unavailable, the tree is polled for changed modification times
+    and sizes. Events arriving within ``debounce_ms`` of each other are merged, so an editor
+    writing several files, or one file in several steps, yields a single batch.
+
+    A batch holds the changed, created and deleted ``.py`` files matching the filters, plus
+    the directories that appeared or disappeared as a whole (their contents must be rescanned).
+    After an inotify queue overflow the batch holds the root itself.
+    """
+
+    def __init__(self, root: str, include: Sequence[str] | None = None, exclude: Sequence[str] | None = None,
+                 debounce_ms: float = 200.0, poll_interval: float = 0.5, polling: bool = False):
+        """
+        :param root: Directory, or single Python file, to watch.
+        :param include: Optional include globs relative to the root, see FileLoader.list_python_files.
+        :param exclude: Optional exclude globs relative to the root, see FileLoader.list_python_files.
+        :param debounce_ms: Quiet period that ends a batch of changes.
+        :param poll_interval: Seconds between scans when polling.
+        :param polling: If True, poll even where inotify is available.
+        """
+        root = os.path.abspath(root)
+        if os.path.isfile(root):
+            root, include = os.path.dirname(root), [os.path.basename(root)]
+        self.root = root
+        self.include = list(include) if include else None
+        self.exclude = list(exclude) if exclude else None
+        self.debounce = debounce_ms / 1000
+        self.poll_interval = poll_interval
+        self._inotify = None
+        if not polling and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                if debug: print(f"inotify unavailable, polling instead: {e}")
+        if self._inotify is not None:
+            self._watch_tree(root)
+        else:
+            self._snapshot = self._scan()
+        self.backend = "inotify" if self._inotify is not None else "polling"
+
+    def _relative(self, path: str) -> str:
+        relative = os.path.relpath(path, self.root).replace("\\", "/")
+        return "" if relative == "." else relative
+
+    def _excluded(self, path: str) -> bool:
+        relative = self._relative(path)
+        return bool(relative and self.exclude and FileLoader.matches(relative, self.exclude))
+
+    def _selected(self, path: str) -> bool:
+        """:return: True if the path is a Python file the filters select."""
+        if not path.endswith(".py") or self._excluded(path):
+            return False
+        return not self.include or FileLoader.matches(self._relative(path), self.include)
+
+    def _watch_tree(self, directory: str) -> None:
+        """Add watches for a directory and its non-excluded subdirectories."""
+        for current, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not self._excluded(os.path.join(current, d))]
+            self._inotify.watch(current)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """:return: Modification time and size of every selected file."""
+        snapshot = {}
+        for file_path in FileLoader.list_python_files(self.root, self.include, self.exclude):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _poll(self) -> Set[str]:
+        """:return: Files that changed, appeared or disappeared since the last scan."""
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        return {path for path in snapshot.keys() | previous.keys() if snapshot.get(path) != previous.get(path)}
+
+    def _collect(self, timeout: float) -> Set[str]:
+        """
+        :param timeout: Seconds to wait for the first event.
+        :return: Paths of the events that arrived, possibly none.
+        """
+        if self._inotify is None:
+            deadline = time.monotonic() + timeout
+            while True:
+                changed = self._poll()
+                remaining = deadline - time.monotonic()
+                if changed or remaining <= 0:
+                    return changed
+                time.sleep(min(self.poll_interval, remaining))
+
+        readable, _, _ = select.select([self._inotify.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        for path, mask in self._inotify.read():
+            if path is None:
+                changed.add(self.root)  # events were lost, everything must be rescanned
+            elif mask & IN_ISDIR:
+                if self._excluded(path):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path)  # files created before the watch existed are found by the rescan
+                changed.add(path)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if path == self.root:
+                    changed.add(path)
+            elif self._selected(path):
+                changed.add(path)
+        return changed
+
+    def changes(self, timeout: float | None = None) -> Set[str]:
+        """
+        Wait for the next batch of changes.
+
+        :param timeout: Seconds to wait for the first change; forever if None.
+        :return: Absolute paths of changed files and directories; empty on timeout.
+        """
+        changed = self._collect(timeout if timeout is not None else 3600.0)
+        while timeout is None and not changed:
+            changed = self._collect(3600.0)
+        if not changed:
+            return changed
+        # Keep collecting until the tree has been quiet for the debounce period
+        deadline = time.monotonic() + max(10 * self.debounce, 2.0)
+        while time.monotonic() < deadline:
+            if self._inotify is not None:
+                more = self._collect(self.debounce)
+            else:
+                time.sleep(self.debounce)
+                more = self._poll()
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self) -> None:
+        """
+        Stop watching.
+
+        :return: None.
+        """
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
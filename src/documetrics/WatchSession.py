@@ -0,0 +1,251 @@
+import ast
+import hashlib
+import os
+import time
+from typing import Any, Callable, Dict, List, Set
+
+from documetrics.CancellationToken import CancellationToken, AnalysisCancelled
+from documetrics.CodeMetrics import EmbeddingBatcher
+from documetrics.DocuMetrics import ProjectAnalyzer
+from documetrics.FileLoader import FileLoader
+from documetrics.FileResultCache import FileResultCache
+from documetrics.QuantileSketch import QuantileCollector
+from documetrics.RunStore import RunStore
+from documetrics.ScoreAggregator import ScoreAggregator, IncrementalProjectScore
+from documetrics.TreeWatcher import TreeWatcher
+from documetrics.globals import debug
+
+
+# =============================================================================
+# Watch Mode
+# =============================================================================
+class WatchSession:
+    """
+    Keeps the scores of a project current while its files are edited.
+
+    start() analyzes the whole tree once; run() then waits for debounced batches of changes
+    (see TreeWatcher) and re-analyzes only the files whose content changed, adjusting the
+    project aggregate incrementally (see IncrementalProjectScore). After every batch the
+    results file is rewritten atomically and ``on_update`` receives an update event::
+
+        {"type": "initial" | "update", "changed": [file rows], "removed": [identifiers],
+         "errors": {identifier: message}, "project": project row or None, "files": n,
+         "seconds": time spent on the batch, "timestamp": unix time}
+
+    Identifiers are relative to the watched directory. A file that fails to parse mid-edit
+    keeps its last score and is reported in ``errors`` until it parses again.
+
+    Without an output file the results go into a new RunStore run, published (and made the
+    latest run) with the first results and then rewritten in place.
+    """
+
+    def __init__(self, root: str, output_file: str | None = None, run_id: str | None = None,
+                 on_update: Callable[[Dict[str, Any]], None] | None = None,
+                 include: List[str] | None = None, exclude: List[str] | None = None,
+                 debounce_ms: float = 200.0, polling: bool = False,
+                 batcher: EmbeddingBatcher | None = None, cache: FileResultCache | None = None):
+        """
+        :param root: Directory, or single Python file, to watch.
+        :param output_file: Results file rewritten after every batch (any of OUTPUT_FORMATS
+            except standard output); a new run directory if None.
+        :param run_id: Id of the new run directory, see RunStore.begin_run.
+        :param on_update: Optional callable receiving every update event.
+        :param include: Optional include globs, see FileLoader.list_python_files.
+        :param exclude: Optional exclude globs, see FileLoader.list_python_files.
+        :param debounce_ms: Quiet period that ends a batch of changes, see TreeWatcher.
+        :param polling: If True, poll the tree instead of using inotify.
+        :param batcher: Optional shared embedding batcher, see CodeAnalyzer.analyze_code.
+        :param cache: Optional per-file result cache, see FileLoader.load_single_file.
+        """
+        self.watcher = TreeWatcher(root, include, exclude, debounce_ms=debounce_ms, polling=polling)
+        self.root = self.watcher.root
+        self._staging_dir = None
+        if output_file is None:
+            self._staging_dir = RunStore.begin_run(run_id)
+            output_file = os.path.join(self._staging_dir, RunStore.RESULTS_FILE)
+        self.output_file = output_file
+        self.on_update = on_update
+        self.batcher = batcher
+        self.cache = cache
+        self.scores = IncrementalProjectScore()
+        self.errors: Dict[str, str] = {}
+        self._digests: Dict[str, str] = {}
+
+    def _identifier(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.root).replace("\\", "/")
+
+    @staticmethod
+    def _read(file_path: str) -> bytes | None:
+        try:
+            with open(file_path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _digest(source: bytes | None) -> str | None:
+        return hashlib.sha256(source).hexdigest() if source is not None else None
+
+    def _list_files(self) -> List[str]:
+        return FileLoader.list_python_files(self.root, self.watcher.include, self.watcher.exclude)
+
+    def _expand(self, changed: Set[str]) -> Set[str]:
+        """
+        :param changed: Paths from TreeWatcher.changes.
+        :return: Files to re-check: the changed files, plus every known or current file below
+            a changed directory.
+        """
+        files = {path for path in changed if path.endswith(".py") and not os.path.isdir(path)}
+        directories = [path for path in changed if path not in files]
+        if directories:
+            current = self._list_files()
+            for directory in directories:
+                prefix = directory.rstrip(os.sep) + os.sep
+                files.update(path for path in current if path.startswith(prefix))
+                files.update(path for path in self._digests if path.startswith(prefix))
+        return files
+
+    def _emit(self, kind: str, changed: List[Dict[str, Any]], removed: List[str], start: float) -> Dict[str, Any]:
+        project = self.scores.project()
+        if project is not None:
+            self.write(self.output_file)
+            if self._staging_dir is not None:
+                run_dir = RunStore.commit_run(self._staging_dir)
+                self.output_file = os.path.join(run_dir, RunStore.RESULTS_FILE)
+                self._staging_dir = None
+        event = {
+            "type": kind,
+            "changed": changed,
+            "removed": removed,
+            "errors": dict(self.errors),
+            "project": project,
+            "files": len(self.scores.files),
+            "seconds": time.perf_counter() - start,
+            "timestamp": time.time(),
+        }
+        if self.on_update: self.on_update(event)
+        return event
+
+    def start(self, progress_callback: Callable[[Dict[str, Any]], None] | None = None,
+              cancel_token: CancellationToken | None = None) -> Dict[str, Any]:
+        """
+        Analyze the whole tree.
+
+        :param progress_callback: Optional per-file progress callback, see FileLoader.load_dataset.
+        :param cancel_token: Optional cancellation token, see FileLoader.load_dataset.
+        :return: The initial update event.
+        """
+        start = time.perf_counter()
+        for file_path in self._list_files():
+            self._digests[file_path] = self._digest(self._read(file_path))
+        results = FileLoader.load_dataset(self.root, progress_callback, cancel_token,
+                                          include=self.watcher.include, exclude=self.watcher.exclude,
+                                          batcher=self.batcher, cache=self.cache)
+        changed = []
+        for metrics in results:
+            metrics = {**metrics, "identifier": self._identifier(metrics["identifier"])}
+            self.scores.update(metrics["identifier"], metrics)
+            changed.append(metrics)
+        return self._emit("initial", changed, [], start)
+
+    def rescore(self, changed: Set[str], cancel_token: CancellationToken | None = None) -> Dict[str, Any] | None:
+        """
+        Re-analyze the files of one batch of changes.
+
+        :param changed: Paths from TreeWatcher.changes.
+        :param cancel_token: Optional cancellation token, see CodeAnalyzer.analyze_code.
+        :return: The update event, or None if no file content actually changed.
+        :raises AnalysisCancelled: If the token is cancelled during the analysis.
+        """
+        start = time.perf_counter()
+        errors = dict(self.errors)
+        updated, removed = [], []
+        for file_path in sorted(self._expand(changed)):
+            identifier = self._identifier(file_path)
+            source = self._read(file_path) if os.path.isfile(file_path) else None
+            digest = self._digest(source)
+            if digest is None:
+                if self._digests.pop(file_path, None) is not None or identifier in self.scores.files:
+                    self.scores.update(identifier, None)
+                    self.errors.pop(identifier, None)
+                    removed.append(identifier)
+                continue
+            if self._digests.get(file_path) == digest:
+                continue  # saved without changes, or touched
+            self._digests[file_path] = digest
+            try:
+                # The analysis drops unparsable files; a file being edited keeps its last score instead
+                ast.parse(source.decode("utf-8-sig"), file_path)
+            except (SyntaxError, ValueError) as e:
+                self.errors[identifier] = str(e)
+                continue
+            self.errors.pop(identifier, None)
+            metrics = FileLoader.load_single_file(file_path, False, cancel_token, self.batcher, self.cache)
+            if metrics is None:
+                if identifier in self.scores.files:
+                    self.scores.update(identifier, None)
+                    removed.append(identifier)
+                continue
+            metrics = {**metrics, "identifier": identifier}
+            self.scores.update(identifier, metrics)
+            updated.append(metrics)
+        if not updated and not removed and self.errors == errors:
+            return None
+        return self._emit("update", updated, removed, start)
+
+    def run(self, cancel_token: CancellationToken) -> None:
+        """
+        Re-score changes until the token is cancelled. Call start() first.
+
+        :param cancel_token: Stops the session; checked at least every half second.
+        :return: None.
+        """
+        try:
+            while not cancel_token.cancelled:
+                changed = self.watcher.changes(timeout=0.5)
+                if not changed or cancel_token.cancelled:
+                    continue
+                if debug: print(f"Watch: {len(changed)} changed paths")
+                try:
+                    self.rescore(changed, cancel_token)
+                except AnalysisCancelled:
+                    return
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stop watching, and discard the run directory if it never received results.
+
+        :return: None.
+        """
+        self.watcher.close()
+        if self._staging_dir is not None:
+            RunStore.abort_run(self._staging_dir)
+            self._staging_dir = None
+
+    def results(self) -> Dict[str, Any]:
+        """
+        :return: ``{"files", "directories", "project"}`` rows of the current scores, with
+            directory and project percentiles, as written by write.
+        """
+        file_results = [dict(metrics) for _, metrics in sorted(self.scores.files.items())]
+        project = self.scores.project()
+        directory_results = ScoreAggregator.aggregate_directories(file_results)
+        if project is not None:
+            quantiles = QuantileCollector()
+            for metrics in file_results:
+                quantiles.add(metrics)
+            quantiles.annotate(directory_results, project, "")
+        return {"files": file_results, "directories": directory_results, "project": project}
+
+    def write(self, output_file: str) -> None:
+        """
+        Export the current scores, see ProjectAnalyzer.export.
+
+        :param output_file: Destination file.
+        :return: None.
+        """
+        results = self.results()
+        ProjectAnalyzer.export(results["files"], results["project"], output_file,
+                               directory_results=results["directories"])
@@ -0,0 +1,418 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from documetrics import __version__
+from documetrics.CancellationToken import CancellationToken
+from documetrics.CodeMetrics import MAX_TOKEN_BUDGET, set_token_budget, EmbeddingBatcher
+from documetrics.Daemon import DaemonServer
+from documetrics.DaemonClient import DaemonClient
+from documetrics.DocuMetrics import ProjectAnalyzer, OUTPUT_FORMATS
+from documetrics.FileResultCache import FileResultCache
+from documetrics.Profiler import PROFILE_MODES
+from documetrics.ResourceManager import ResourceManager
+from documetrics.ResultsDatabase import ResultsDatabase
+from documetrics.ScoreAggregator import ScoreAggregator
+from documetrics.WatchSession import WatchSession
+from documetrics.globals import METRICS_LIST
+
+# Performance presets; explicit options override them. Batch size None analyzes each text on its own.
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # All cores, batched UniXcoder passes and shorter inputs: faster, scores differ slightly
+    "fast": {"jobs": None, "batch_size": 64, "token_budget": 256},
+    # The reference configuration: one file at a time, full-length inputs
+    "full": {"jobs": 1, "batch_size": None, "token_budget": MAX_TOKEN_BUDGET},
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of the ``documetrics`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="documetrics",
+        description="Evaluate the documentation quality of Python code. The subcommands reweight, watch, "
+                    "daemon and history are documented by 'documetrics SUBCOMMAND --help'.",
+    )
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="Python files or directories to analyze; several paths are analyzed as one project. "
+                             "A first PATH named like a subcommand runs that subcommand, so pass a directory "
+                             "called e.g. watch as ./watch.")
+    parser.add_argument("--include", action="append", default=None, metavar="GLOB",
+                        help="Only analyze files whose path relative to PATH matches GLOB (repeatable).")
+    parser.add_argument("--exclude", action="append", default=None, metavar="GLOB",
+                        help="Skip files and directories whose path relative to PATH matches GLOB (repeatable).")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output file, or '-' to stream JSON Lines to stdout. "
+                             "Defaults to a new run directory below the output root.")
+    parser.add_argument("-f", "--format", choices=list(OUTPUT_FORMATS), default=None,
+                        help="Output format; inferred from the output file extension if omitted.")
+    parser.add_argument("--preset", choices=list(PRESETS), default="full",
+                        help="fast: all cores, batch size 64, token budget 256; "
+                             "full: one file at a time, token budget 512 (default).")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Files analyzed concurrently (fast preset: all available cores).")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Maximum docstrings per UniXcoder forward pass.")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help=f"Maximum UniXcoder tokens per docstring or code snippet (8-{MAX_TOKEN_BUDGET}).")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse per-file results from this directory; unchanged files are not re-analyzed.")
+    parser.add_argument("--timing", action="store_true",
+                        help="Record per-stage timings, print a summary and write <output>.timings.json.")
+    parser.add_argument("--results-db", default=None,
+                        help="SQLite database the run is also recorded in (default: $DOCUMETRICS_RESULTS_DB).")
+    parser.add_argument("--profile", default=None, metavar="MODES",
+                        help=f"Profile the run with any of {', '.join(PROFILE_MODES)} (comma-separated); "
+                             "artifacts are written into the run's output directory.")
+    parser.add_argument("--profile-files", type=int, default=None, metavar="N",
+                        help="Profile at most N files (default: all selected files).")
+    parser.add_argument("--profile-match", default=None, metavar="GLOB",
+                        help="Only profile files whose path relative to PATH matches GLOB.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    return parser
+
+
+def build_reweight_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of the ``documetrics reweight`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="documetrics reweight",
+        description="Recompute overall scores of exported results for new weights, without re-analysis.",
+    )
+    parser.add_argument("results", help="Results file written by documetrics (csv, arrow, parquet or jsonl).")
+    parser.add_argument("-w", "--weights", required=True,
+                        help="New weights, e.g. comment_density=0.25,completeness=0.25,conciseness=0.25,accuracy=0.25")
+    parser.add_argument("-o", "--output", default=None, help="Output file (default: overwrite the input).")
+    return parser
+
+
+def reweight(argv: List[str]) -> int:
+    """
+    Run the ``documetrics reweight`` command.
+
+    :param argv: Arguments following ``reweight``.
+    :return: Process exit code: 0 on success, 1 on invalid weights.
+    """
+    args = build_reweight_parser().parse_args(argv)
+    try:
+        weights = ScoreAggregator.parse_weights(args.weights)
+        rows = ProjectAnalyzer.reweight_results(args.results, weights, args.output)
+    except ValueError as e:
+        print(f"documetrics reweight: {e}", file=sys.stderr)
+        return 1
+    print(f"Re-scored {rows} rows into {args.output or args.results}", file=sys.stderr)
+    return 0
+
+
+def build_history_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of the ``documetrics history`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="documetrics history",
+        description="Show the score trend of a project, or the files that regressed in a run, "
+                    "from the runs recorded with --results-db.",
+    )
+    parser.add_argument("path", help="Analyzed file or directory, as given when the runs were recorded.")
+    parser.add_argument("--results-db", default=None,
+                        help="SQLite database the runs were recorded in (default: $DOCUMETRICS_RESULTS_DB).")
+    parser.add_argument("--metric", choices=METRICS_LIST, default="overall_score", help="Metric to follow.")
+    parser.add_argument("--directory", default="",
+                        help="Only follow this directory, relative to PATH (default: the whole project).")
+    parser.add_argument("--days", type=float, default=90, help="Trend window in days (default: 90).")
+    parser.add_argument("--regressions", action="store_true",
+                        help="List the files whose score dropped instead of the trend.")
+    parser.add_argument("--run", default=None,
+                        help="Run to check for regressions (default: the latest complete run of PATH).")
+    parser.add_argument("--baseline-run", default=None,
+                        help="Run to compare with (default: the run of PATH recorded before --run).")
+    parser.add_argument("--min-drop", type=float, default=0.0, help="Only list larger drops (default: 0).")
+    parser.add_argument("--json", action="store_true", help="Print the rows as JSON.")
+    return parser
+
+
+def history(argv: List[str]) -> int:
+    """
+    Run the ``documetrics history`` command; see ResultsDatabase.directory_trend and
+    ResultsDatabase.regressions.
+
+    :param argv: Arguments following ``history``.
+    :return: Process exit code: 0 on success, 1 without a database or recorded run.
+    """
+    args = build_history_parser().parse_args(argv)
+    db_path = args.results_db or os.environ.get(ResultsDatabase.DB_ENV)
+    if not db_path or not os.path.exists(db_path):
+        print("documetrics history: No results database; record runs with --results-db or "
+              f"${ResultsDatabase.DB_ENV}.", file=sys.stderr)
+        return 1
+    database = ResultsDatabase(db_path)
+    try:
+        if not args.regressions:
+            rows = database.directory_trend(args.path, args.directory, args.metric, args.days)
+            lines = [f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created_at']))}  {row['run_id']}  "
+                     f"{row['score']:.3f}  ({row['num_files']} files)" for row in rows]
+        else:
+            run_id = args.run or database.latest_run(args.path)
+            if run_id is None:
+                print(f"documetrics history: No complete run of {args.path} recorded.", file=sys.stderr)
+                return 1
+            rows = database.regressions(run_id, args.metric, args.min_drop, args.baseline_run)
+            lines = [f"{row['path']}: {row['previous']:.3f} -> {row['current']:.3f} ({row['delta']:+.3f})"
+                     for row in rows]
+    finally:
+        database.close()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print("\n".join(lines) if lines else "No regressions." if args.regressions else "No runs in the window.")
+    return 0
+
+
+def build_watch_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of the ``documetrics watch`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="documetrics watch",
+        description="Analyze a project, then re-score files as they are saved until interrupted.",
+    )
+    parser.add_argument("path", help="Python file or directory to watch.")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Results file rewritten after every change. "
+                             "Defaults to a new run directory below the output root.")
+    parser.add_argument("--include", action="append", default=None, metavar="GLOB",
+                        help="Only watch files whose path relative to PATH matches GLOB (repeatable).")
+    parser.add_argument("--exclude", action="append", default=None, metavar="GLOB",
+                        help="Ignore files and directories whose path relative to PATH matches GLOB (repeatable).")
+    parser.add_argument("--debounce-ms", type=float, default=200.0,
+                        help="Quiet period that ends a burst of changes (default: 200).")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify.")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Maximum docstrings per UniXcoder forward pass.")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help=f"Maximum UniXcoder tokens per docstring or code snippet (8-{MAX_TOKEN_BUDGET}).")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse per-file results from this directory, see documetrics --cache-dir.")
+    return parser
+
+
+def watch(argv: List[str]) -> int:
+    """
+    Run the ``documetrics watch`` command. Every batch of changes prints the re-scored files
+    and the new project score, with their change, to stderr.
+
+    :param argv: Arguments following ``watch``.
+    :return: Process exit code: 0 when interrupted, 1 on invalid arguments.
+    """
+    args = build_watch_parser().parse_args(argv)
+    if not os.path.exists(args.path):
+        print(f"documetrics watch: Path does not exist: {args.path}", file=sys.stderr)
+        return 1
+    try:
+        if args.token_budget is not None: set_token_budget(args.token_budget)
+    except ValueError as e:
+        print(f"documetrics watch: {e}", file=sys.stderr)
+        return 1
+
+    previous: Dict[str, float] = {}
+    reported_errors: Dict[str, str] = {}
+
+    def report(event: Dict[str, Any]) -> None:
+        stamp = time.strftime("%H:%M:%S")
+        if event["type"] == "update":
+            for row in event["changed"]:
+                old = previous.get(row["identifier"])
+                change = f" ({row['overall_score'] - old:+.3f})" if old is not None else " (new)"
+                print(f"[{stamp}] {row['identifier']}: {row['overall_score']:.3f}{change}", file=sys.stderr)
+            for identifier in event["removed"]:
+                print(f"[{stamp}] {identifier}: removed", file=sys.stderr)
+            for identifier, message in event["errors"].items():
+                if reported_errors.get(identifier) != message:
+                    print(f"[{stamp}] {identifier}: keeping last score, {message}", file=sys.stderr)
+        reported_errors.clear()
+        reported_errors.update(event["errors"])
+        for row in event["changed"]:
+            previous[row["identifier"]] = row["overall_score"]
+        for identifier in event["removed"]:
+            previous.pop(identifier, None)
+        project = event["project"]
+        if project is not None:
+            old = previous.get(project["identifier"])
+            change = f" ({project['overall_score'] - old:+.3f})" if old is not None else ""
+            print(f"[{stamp}] Project: {project['overall_score']:.3f}{change} over {event['files']} files, "
+                  f"scored in {event['seconds']:.2f}s", file=sys.stderr)
+            previous[project["identifier"]] = project["overall_score"]
+
+    batcher = EmbeddingBatcher(window_ms=0.0, max_batch=args.batch_size) if args.batch_size else None
+    cache = FileResultCache(args.cache_dir, ProjectAnalyzer.config_fingerprint()) if args.cache_dir else None
+    cancel_token = CancellationToken()
+    session = None
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            session = WatchSession(args.path, args.output, None, report, args.include, args.exclude,
+                                   args.debounce_ms, args.poll, batcher, cache)
+            session.start(cancel_token=cancel_token)
+            if session.scores.project() is not None:
+                print(f"Results written to {session.output_file}", file=sys.stderr)
+            print(f"Watching {session.root} ({session.watcher.backend}); press Ctrl+C to stop.", file=sys.stderr)
+            session.run(cancel_token)
+    except KeyboardInterrupt:
+        cancel_token.cancel()
+    finally:
+        if session is not None: session.close()
+        if batcher is not None: batcher.close()
+    return 0
+
+
+def build_daemon_parser() -> argparse.ArgumentParser:
+    """
+    :return: Argument parser of the ``documetrics daemon`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="documetrics daemon",
+        description="Serve analyses over a Unix socket with warm models, see documetrics-client.",
+    )
+    parser.add_argument("--socket", default=None,
+                        help="Socket to listen on (default: $DOCUMETRICS_SOCKET, or a per-user socket).")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Also keep per-file results in this directory, across daemon restarts.")
+    parser.add_argument("--idle-timeout", type=float, default=3600.0,
+                        help="Exit after this many seconds without requests; 0 never exits (default: 3600).")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help=f"Maximum UniXcoder tokens per docstring or code snippet (8-{MAX_TOKEN_BUDGET}).")
+    return parser
+
+
+def daemon(argv: List[str]) -> int:
+    """
+    Run the ``documetrics daemon`` command in the foreground; documetrics-client starts it in the
+    background when needed.
+
+    :param argv: Arguments following ``daemon``.
+    :return: Process exit code: 0 when stopped, 1 on invalid arguments or if a daemon is already running.
+    """
+    args = build_daemon_parser().parse_args(argv)
+    try:
+        if args.token_budget is not None: set_token_budget(args.token_budget)
+        server = DaemonServer(args.socket or DaemonClient.default_socket(), args.cache_dir, args.idle_timeout or None)
+        server.serve()
+    except (ValueError, RuntimeError) as e:
+        print(f"documetrics daemon: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def resolve_paths(paths: List[str], include: List[str] | None,
+                  exclude: List[str] | None) -> Tuple[str, List[str] | None, List[str] | None]:
+    """
+    Map several analysis paths onto one root with include/exclude globs.
+
+    The root is the deepest common directory; each path becomes an include glob relative to it
+    (a file is included exactly), and the user's globs, which are relative to each path, are
+    prefixed with every directory path.
+
+    :param paths: Files and directories given on the command line.
+    :param include: User include globs.
+    :param exclude: User exclude globs.
+    :return: Root, include globs and exclude globs for ProjectAnalyzer.main.
+    :raises ValueError: If a path does not exist.
+    """
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise ValueError(f"Path does not exist: {missing[0]}")
+    if len(paths) == 1:
+        return paths[0], include, exclude
+    absolute = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath(absolute)
+    if os.path.isfile(root):  # The same file given several times
+        return root, None, None
+
+    root_include, root_exclude = [], []
+    for path in absolute:
+        relative = os.path.relpath(path, root).replace("\\", "/")
+        prefix = "" if relative == "." else relative + "/"
+        if os.path.isfile(path):
+            root_include.append(relative)
+            continue
+        root_include.extend(prefix + glob for glob in include or ["*"])
+        root_exclude.extend(prefix + glob for glob in exclude or [])
+    return root, root_include, root_exclude or None
+
+
+def performance_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    :param args: Parsed command-line arguments.
+    :return: jobs, batch_size and token_budget from the preset, overridden by explicit options.
+    :raises ValueError: If an option is out of range.
+    """
+    options = dict(PRESETS[args.preset])
+    for name in options:
+        if getattr(args, name) is not None:
+            options[name] = getattr(args, name)
+    if options["jobs"] is None:
+        options["jobs"] = ResourceManager.detect_core_budget()
+    if options["jobs"] < 1:
+        raise ValueError(f"--jobs must be at least 1, got {options['jobs']}.")
+    if options["batch_size"] is not None and options["batch_size"] < 1:
+        raise ValueError(f"--batch-size must be at least 1, got {options['batch_size']}.")
+    return options
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Entry point of the ``documetrics`` console script. Status messages go to stderr, so stdout
+    only carries results when streaming with ``-o -``.
+
+    ``documetrics reweight ...`` re-scores existing results, see reweight, and
+    ``documetrics watch ...`` keeps re-scoring a project while it is edited, see watch, and
+    ``documetrics daemon ...`` serves analyses to documetrics-client, see daemon, and
+    ``documetrics history ...`` queries the runs recorded with --results-db, see history. A directory
+    named like a subcommand is analyzed when passed as ``./watch`` and so on. Performance options
+    configure the process (threads, token budget) before the models are loaded.
+
+    :param argv: Command-line arguments; defaults to sys.argv[1:].
+    :return: Process exit code: 0 on success, 1 if the analysis failed.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["reweight"]:
+        return reweight(argv[1:])
+    if argv[:1] == ["watch"]:
+        return watch(argv[1:])
+    if argv[:1] == ["daemon"]:
+        return daemon(argv[1:])
+    if argv[:1] == ["history"]:
+        return history(argv[1:])
+    args = build_parser().parse_args(argv)
+    profile = None
+    if args.profile:
+        profile = {"modes": args.profile, "max_files": args.profile_files, "match": args.profile_match}
+    try:
+        path, include, exclude = resolve_paths(args.paths, args.include, args.exclude)
+        options = performance_options(args)
+        set_token_budget(options["token_budget"])
+        ResourceManager.configure(jobs=options["jobs"])
+        result = ProjectAnalyzer.main(path, args.output, results_db=args.results_db,
+                                      output_format=args.format, timing=args.timing or None, profile=profile,
+                                      include=include, exclude=exclude, jobs=options["jobs"],
+                                      batch_size=options["batch_size"], cache_dir=args.cache_dir)
+    except ValueError as e:
+        print(f"documetrics: {e}", file=sys.stderr)
+        return 1
+    print(result["message"], file=sys.stderr)
+    if result.get("output_file") and result["output_file"] != "-":
+        print(f"Results written to {result['output_file']}", file=sys.stderr)
+    if result.get("profile_dir"):
+        print(f"Profiling artifacts written to {result['profile_dir']}", file=sys.stderr)
+    return 0 if result["code"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
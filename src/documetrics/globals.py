@@ -1,4 +1,8 @@
 import re
+# Pretrained models used by the accuracy and conciseness metrics.
+UNIXCODER_MODEL = "microsoft/unixcoder-base"
+MINILM_MODEL = "all-MiniLM-L6-v2"
+
 # Global metric list used for aggregation and display.
 METRICS_LIST = [
     "comment_density",
@@ -8,6 +12,9 @@ METRICS_LIST = [
     "overall_score"
 ]
 
+# Metrics measured directly; overall_score is their weighted sum (see ScoreAggregator.WEIGHTS).
+COMPONENT_METRICS = [metric for metric in METRICS_LIST if metric != "overall_score"]
+
 DOC_TAG_PATTERN = re.compile(
     r"""
     ^\s*(